@@ -0,0 +1,111 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from repositories.factory import create_repository, create_async_repository
+from services.task_service import TaskService
+from services.async_task_service import AsyncTaskService
+from benchmarks.seed import seed_tasks
+from benchmarks.run_benchmarks import percentile
+
+def operations(rows: int):
+    """(name, sync call, async call) triples, each taking a service and a random generator."""
+    def task_id(rng):
+        return rng.randint(1, rows)
+    return [
+        ("get", lambda service, rng: service.get_task(task_id(rng))),
+        ("list:status", lambda service, rng: service.list_tasks({"status": "Pending"}, after_id=task_id(rng), limit=50)),
+        ("create", lambda service, rng: service.create_task("Async benchmark", "Created by bench_async", "2030-01-01", "Medium")),
+    ]
+
+def summarize(latencies, elapsed):
+    latencies.sort()
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput_ops": len(latencies) / elapsed,
+    }
+
+def run_sync(task_service, call, requests: int, concurrency: int, seed: int):
+    """Runs requests calls on a thread pool of the given size, one blocking call per thread at a time."""
+    def one(index):
+        rng = random.Random(seed + index)
+        started = time.perf_counter()
+        call(task_service, rng)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(one, range(requests)))
+    return summarize(latencies, time.perf_counter() - started)
+
+async def run_async(task_service, call, requests: int, concurrency: int, seed: int):
+    """Runs requests coroutines with at most concurrency of them in flight, like concurrent web requests."""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        rng = random.Random(seed + index)
+        async with gate:
+            started = time.perf_counter()
+            await call(task_service, rng)
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = list(await asyncio.gather(*(one(index) for index in range(requests))))
+    return summarize(latencies, time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sync and asyncio TaskService under concurrent load.")
+    parser.add_argument("--url", help="database URL, defaults to a temporary SQLite file")
+    parser.add_argument("--rows", type=int, default=10_000, help="number of tasks to seed (default 10000)")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per operation (default 2000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight (default 32)")
+    parser.add_argument("--pool-size", type=int, default=8, help="connections/threads available to both paths (default 8)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default 42)")
+    args = parser.parse_args()
+
+    directory = None
+    url = args.url
+    if url is None:
+        directory = tempfile.TemporaryDirectory(prefix="tasks-bench-")
+        url = "sqlite:///" + os.path.join(directory.name, "tasks.db")
+
+    repository = create_repository(url)
+    task_service = TaskService(repository)
+    rows = seed_tasks(task_service, args.rows, args.seed)["imported"]
+
+    async def run_all():
+        async_repository = await create_async_repository(url, args.pool_size)
+        async_service = AsyncTaskService(async_repository)
+        results = []
+        try:
+            for name, call in operations(rows):
+                sync_result = run_sync(task_service, call, args.requests, min(args.concurrency, args.pool_size), args.seed)
+                async_result = await run_async(async_service, call, args.requests, args.concurrency, args.seed)
+                results.append({"operation": name, "sync": sync_result, "async": async_result})
+                print(f"{name:<12} sync {sync_result['throughput_ops']:10.1f} ops/s p95={sync_result['p95_ms']:8.3f}ms | "
+                      f"async {async_result['throughput_ops']:10.1f} ops/s p95={async_result['p95_ms']:8.3f}ms", file=sys.stderr)
+        finally:
+            await async_repository.close()
+        return results
+
+    try:
+        results = asyncio.run(run_all())
+    finally:
+        repository.close()
+        if directory:
+            directory.cleanup()
+    print(json.dumps({"url": url.split("@")[-1], "rows": rows, "requests": args.requests,
+                      "concurrency": args.concurrency, "pool_size": args.pool_size, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
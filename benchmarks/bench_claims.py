@@ -0,0 +1,124 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import json
+import multiprocessing
+import tempfile
+import time
+from collections import Counter
+from repositories.factory import create_repository
+from services.task_service import TaskService
+from benchmarks.seed import seed_tasks
+from benchmarks.run_benchmarks import percentile
+
+def work(url: str, worker_id: str, batch: int, lease_seconds: float, start):
+    """
+    Worker process: claims batches until the queue is empty, completing each batch right away.
+    :return: Dictionary with the claimed ids, per-call latencies and the worker's start/end wall time.
+    """
+    repository = create_repository(url)
+    task_service = TaskService(repository)
+    claimed, claim_latencies, release_latencies = [], [], []
+    try:
+        start.wait()
+        started = time.time()
+        while True:
+            begin = time.perf_counter()
+            tasks = task_service.claim_tasks(worker_id, batch, lease_seconds=lease_seconds)
+            claim_latencies.append(time.perf_counter() - begin)
+            if not tasks:
+                break
+            ids = [task.task_id for task in tasks]
+            claimed += ids
+            begin = time.perf_counter()
+            task_service.release_claims(worker_id, ids)
+            release_latencies.append(time.perf_counter() - begin)
+        return {"claimed": claimed, "claim": claim_latencies, "release": release_latencies,
+                "started": started, "finished": time.time()}
+    finally:
+        repository.close()
+
+def run_round(url: str, workers: int, batch: int, lease_seconds: float):
+    """
+    Resets every task to Pending, then lets workers processes drain the queue concurrently.
+    :return: Result dictionary of the round.
+    """
+    repository = create_repository(url)
+    try:
+        task_service = TaskService(repository)
+        pending = task_service.update_status_bulk("Pending", filter_by={})
+    finally:
+        repository.close()
+
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager, context.Pool(workers) as pool:
+        start = manager.Event()
+        pending_results = [pool.apply_async(work, (url, f"worker-{number}", batch, lease_seconds, start))
+                           for number in range(workers)]
+        # Give the processes time to import and connect, so the round times claiming only.
+        time.sleep(1.0)
+        start.set()
+        results = [result.get() for result in pending_results]
+
+    counts = Counter(task_id for result in results for task_id in result["claimed"])
+    claim_latencies = sorted(latency for result in results for latency in result["claim"])
+    release_latencies = sorted(latency for result in results for latency in result["release"])
+    elapsed = max(result["finished"] for result in results) - min(result["started"] for result in results)
+    return {
+        "workers": workers,
+        "batch": batch,
+        "pending": pending,
+        "claimed": len(counts),
+        "claimed_twice": sum(1 for count in counts.values() if count > 1),
+        "missed": pending - len(counts),
+        "seconds": round(elapsed, 3),
+        "tasks_per_second": round(len(counts) / elapsed, 1) if elapsed else None,
+        "claim_p50_ms": round(percentile(claim_latencies, 0.50) * 1000, 3),
+        "claim_p95_ms": round(percentile(claim_latencies, 0.95) * 1000, 3),
+        "claim_p99_ms": round(percentile(claim_latencies, 0.99) * 1000, 3),
+        "release_p95_ms": round(percentile(release_latencies, 0.95) * 1000, 3),
+        "per_worker": [len(result["claimed"]) for result in results],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain the task queue with competing worker processes through claim_tasks.")
+    parser.add_argument("--url", help="database URL, defaults to a temporary SQLite file (memory:// cannot be shared)")
+    parser.add_argument("--rows", type=int, default=20_000, help="number of tasks to seed (default 20000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="worker process counts to run (default 1 4 8)")
+    parser.add_argument("--batch", type=int, default=10, help="tasks claimed per call (default 10)")
+    parser.add_argument("--lease", type=float, default=60.0, help="lease seconds of the claims (default 60)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default 42)")
+    args = parser.parse_args()
+
+    directory = None
+    url = args.url
+    if url is None:
+        directory = tempfile.TemporaryDirectory(prefix="tasks-bench-")
+        url = "sqlite:///" + os.path.join(directory.name, "tasks.db")
+    if url.startswith("memory:"):
+        parser.error("worker processes need a shared database, use a SQLite file or MySQL URL")
+
+    try:
+        repository = create_repository(url)
+        try:
+            rows = seed_tasks(TaskService(repository), args.rows, args.seed)["imported"]
+        finally:
+            repository.close()
+        results = []
+        for workers in args.workers:
+            result = run_round(url, workers, args.batch, args.lease)
+            results.append(result)
+            print(f"{workers:>3} workers {result['tasks_per_second']:10.1f} tasks/s claim p95={result['claim_p95_ms']:8.3f}ms "
+                  f"claimed twice={result['claimed_twice']} missed={result['missed']}", file=sys.stderr)
+    finally:
+        if directory:
+            directory.cleanup()
+    print(json.dumps({"url": url.split("@")[-1], "rows": rows, "results": results}, indent=2))
+    if any(result["claimed_twice"] or result["missed"] for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from models.task import Task, TASK_COLUMNS
+
+class LegacyTask:
+    """The Task model as it was before __slots__ and from_row, kept here as the baseline."""
+
+    def __init__(self, title, description, due_date, priority, status="Pending", task_id=None, creation_timestamp=None):
+        self._task_id = task_id
+        self._title = title
+        self._description = description
+        self._due_date = datetime.strptime(due_date, "%Y-%m-%d")
+        self._priority = priority
+        self._status = status
+        self._creation_timestamp = creation_timestamp if creation_timestamp else datetime.now()
+
+def make_rows(count: int):
+    """Builds database-like rows with native date/datetime values, as pymysql returns them."""
+    start = date(2025, 1, 1)
+    created = datetime(2024, 12, 1, 9, 30)
+    priorities = ("Low", "Medium", "High")
+    statuses = ("Pending", "In Progress", "Completed")
+    return [
+        {
+            "task_id": i,
+            "title": f"Task {i}",
+            "description": "Lorem ipsum dolor sit amet",
+            "due_date": start + timedelta(days=i % 365),
+            "priority": priorities[i % 3],
+            "status": statuses[i % 3],
+            "creation_timestamp": created,
+            "version": 1,
+        }
+        for i in range(1, count + 1)
+    ]
+
+def legacy_from_row(row):
+    return LegacyTask(row["title"], row["description"], row["due_date"].strftime("%Y-%m-%d"), row["priority"], row["status"], row["task_id"], row["creation_timestamp"])
+
+def measure(build, rows):
+    """
+    Times building one object per row and measures the memory the resulting objects hold.
+    :return: Tuple of (seconds, bytes allocated).
+    """
+    gc.collect()
+    started = time.perf_counter()
+    objects = [build(row) for row in rows]
+    elapsed = time.perf_counter() - started
+    del objects
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(row) for row in rows]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return elapsed, allocated
+
+def main():
+    parser = argparse.ArgumentParser(description="Task construction microbenchmark.")
+    parser.add_argument("--rows", type=int, default=100_000, help="number of rows to build (default 100000)")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    tuples = [tuple(row[column] for column in TASK_COLUMNS) for row in rows]
+    cases = [
+        ("legacy: strftime + strptime", legacy_from_row, rows),
+        ("Task.from_row", Task.from_row, rows),
+        ("Task.from_tuple", Task.from_tuple, tuples),
+    ]
+
+    print(f"Building {args.rows:,} tasks")
+    print(f"{'Path':<30} {'Total (s)':>10} {'per 100k (ms)':>14} {'Memory (MiB)':>13}")
+    for label, build, data in cases:
+        elapsed, allocated = measure(build, data)
+        per_100k = elapsed / args.rows * 100_000 * 1000
+        print(f"{label:<30} {elapsed:>10.3f} {per_100k:>14.1f} {allocated / 2**20:>13.1f}")
+
+if __name__ == "__main__":
+    main()
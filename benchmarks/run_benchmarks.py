@@ -0,0 +1,239 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import resource
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from db_config import get_database_url
+from repositories.factory import create_repository as create_repository_from_url
+from services.task_service import TaskService
+from models.task_query import TaskQuery, SUMMARY_COLUMNS
+from benchmarks.seed import seed_tasks
+
+FILTER_SHAPES = [(), ("status",), ("priority",), ("due_date",), ("status", "priority"),
+                 ("status", "due_date"), ("priority", "due_date"), ("status", "priority", "due_date")]
+
+def create_repository(backend: str, database: str = None):
+    """
+    Builds the repository under test.
+    :param backend: "sqlite" or "memory" for the embedded backends, "mysql" for the configured MySQL
+                    server, or any database URL accepted by repositories.factory.create_repository.
+    :param database: SQLite file path, a temporary file is used when omitted.
+    :return: Tuple of (repository, cleanup callable).
+    """
+    directory = None
+    if backend == "sqlite":
+        if database is None:
+            directory = tempfile.TemporaryDirectory(prefix="tasks-bench-")
+            database = os.path.join(directory.name, "tasks.db")
+        url = "sqlite:///" + database
+    elif backend == "memory":
+        url = "memory://"
+    elif backend == "mysql":
+        url = get_database_url()
+    else:
+        url = backend
+    repository = create_repository_from_url(url)
+
+    def cleanup():
+        repository.close()
+        if directory:
+            directory.cleanup()
+    return repository, cleanup
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+def percentile(sorted_values, fraction: float):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def build_operations(task_service: TaskService, rows: int, page_size: int):
+    """
+    Returns (name, callable(rng)) pairs for every TaskService operation, in run order.
+    Deletes come last and each takes a distinct id, counting down from the highest seeded one.
+    """
+    today = date.today()
+    sample = {"status": "Pending", "priority": "High"}
+    priorities = ("Low", "Medium", "High")
+    delete_ids = itertools.count(rows, -1)
+
+    def random_id(rng):
+        return rng.randint(1, rows)
+
+    def due(rng):
+        return (today + timedelta(days=rng.randint(-30, 30))).strftime("%Y-%m-%d")
+
+    def list_operation(shape):
+        def run(rng):
+            values = dict(sample, due_date=due(rng))
+            task_service.list_tasks({key: values[key] for key in shape}, limit=page_size)
+        return run
+
+    operations = [
+        ("create", lambda rng: task_service.create_task("Benchmark task", "Created by the benchmark", due(rng), rng.choice(priorities))),
+        ("get", lambda rng: task_service.get_task(random_id(rng))),
+    ]
+    operations += [("list:" + ("+".join(shape) or "all"), list_operation(shape)) for shape in FILTER_SHAPES]
+    operations += [
+        ("query:overdue+sorted", lambda rng: task_service.list_tasks(
+            TaskQuery(overdue=True, order_by=["-priority", "due_date"], limit=page_size, columns=SUMMARY_COLUMNS))),
+        ("query:due_range+in", lambda rng: task_service.list_tasks(
+            TaskQuery(status=["Pending", "In Progress"], due_from=due(rng), due_to=due(rng), limit=page_size))),
+        ("next", lambda rng: task_service.next_tasks(10)),
+        ("next:priority", lambda rng: task_service.next_tasks(10, {"priority": rng.choice(priorities)})),
+        ("update", lambda rng: task_service.update_task_details(random_id(rng), "Updated", "Updated by the benchmark", due(rng), rng.choice(priorities))),
+        ("mark_completed", lambda rng: task_service.mark_task_completed(random_id(rng))),
+        ("delete", lambda rng: task_service.delete_task(next(delete_ids))),
+    ]
+    return operations
+
+def run_operation(operation, iterations: int, concurrency: int, seed: int):
+    """
+    Runs one operation iterations times spread over concurrency threads.
+    :return: Dictionary with latency percentiles, throughput and peak RSS.
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(worker_id, count):
+        rng = random.Random(seed * 1000 + worker_id)
+        local = []
+        for _ in range(count):
+            started = time.perf_counter()
+            operation(rng)
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    shares = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+    started = time.perf_counter()
+    if concurrency == 1:
+        worker(0, iterations)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, range(concurrency), shares))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "count": len(latencies),
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput_ops": len(latencies) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def run(args):
+    repository, cleanup = create_repository(args.backend, args.database)
+    try:
+        task_service = TaskService(repository)
+        started = time.perf_counter()
+        summary = seed_tasks(task_service, args.rows, args.seed)
+        seed_seconds = time.perf_counter() - started
+        print(f"Seeded {summary['imported']:,} tasks in {seed_seconds:.1f}s", file=sys.stderr)
+
+        results = []
+        rows = summary["imported"]
+        for concurrency in args.concurrency:
+            for name, operation in build_operations(task_service, rows, args.page_size):
+                result = run_operation(operation, args.ops, concurrency, args.seed)
+                result.update({"operation": name, "concurrency": concurrency})
+                results.append(result)
+                print(f"{name:<30} c={concurrency:<3} p50={result['p50_ms']:8.3f}ms p95={result['p95_ms']:8.3f}ms "
+                      f"p99={result['p99_ms']:8.3f}ms {result['throughput_ops']:10.1f} ops/s", file=sys.stderr)
+            rows -= args.ops
+    finally:
+        cleanup()
+
+    report = {
+        "meta": {
+            "backend": args.backend,
+            "rows": args.rows,
+            "ops": args.ops,
+            "concurrency": args.concurrency,
+            "page_size": args.page_size,
+            "seed": args.seed,
+            "seed_seconds": seed_seconds,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            stream.write(output + "\n")
+    else:
+        print(output)
+
+def compare(args):
+    """
+    Compares two reports and flags operations whose p95 latency grew, or whose
+    throughput dropped, by more than the threshold. Exits with status 1 on regressions.
+    """
+    with open(args.baseline, encoding="utf-8") as stream:
+        baseline = {(r["operation"], r["concurrency"]): r for r in json.load(stream)["results"]}
+    with open(args.candidate, encoding="utf-8") as stream:
+        candidate = {(r["operation"], r["concurrency"]): r for r in json.load(stream)["results"]}
+
+    regressions = 0
+    print(f"{'Operation':<30} {'c':>3} {'p95 base':>10} {'p95 new':>10} {'Δp95':>8} {'ops/s base':>11} {'ops/s new':>10} {'Δops':>8}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        old, new = baseline[key], candidate[key]
+        p95_change = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+        throughput_change = (new["throughput_ops"] - old["throughput_ops"]) / old["throughput_ops"] if old["throughput_ops"] else 0.0
+        regressed = p95_change > args.threshold or throughput_change < -args.threshold
+        regressions += regressed
+        print(f"{key[0]:<30} {key[1]:>3} {old['p95_ms']:>10.3f} {new['p95_ms']:>10.3f} {p95_change:>+8.1%} "
+              f"{old['throughput_ops']:>11.1f} {new['throughput_ops']:>10.1f} {throughput_change:>+8.1%}"
+              f"{'  ❌ regression' if regressed else ''}")
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{key[0]:<30} {key[1]:>3} only in {'baseline' if key in baseline else 'candidate'}")
+    print(f"\n{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="TaskService benchmark and load generator.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subcommands.add_parser("run", help="seed a database and time every TaskService operation")
+    run_parser.add_argument("--backend", default="sqlite", help="sqlite (default, works offline), memory, mysql, or a database URL")
+    run_parser.add_argument("--database", help="SQLite database file, defaults to a temporary file")
+    run_parser.add_argument("--rows", type=int, default=10_000, help="number of tasks to seed, 1k to 10M (default 10000)")
+    run_parser.add_argument("--ops", type=int, default=1000, help="iterations per operation and concurrency level (default 1000)")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8], help="thread counts to run at (default 1 8)")
+    run_parser.add_argument("--page-size", type=int, default=50, help="limit used by the list operations (default 50)")
+    run_parser.add_argument("--seed", type=int, default=42, help="random seed for data and workload (default 42)")
+    run_parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subcommands.add_parser("compare", help="compare two JSON reports for regressions")
+    compare_parser.add_argument("baseline", help="JSON report of the reference run")
+    compare_parser.add_argument("candidate", help="JSON report of the run under test")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative change (default 0.10)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
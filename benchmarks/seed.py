@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+from datetime import date, datetime, timedelta
+from models.task import Task
+
+# Rough shape of production data: most tasks are open, Medium dominates, and due
+# dates cluster around today with a long tail in both directions.
+STATUS_WEIGHTS = {"Pending": 0.5, "In Progress": 0.2, "Completed": 0.3}
+PRIORITY_WEIGHTS = {"Low": 0.3, "Medium": 0.5, "High": 0.2}
+DUE_DATE_SPREAD_DAYS = 60
+
+WORDS = ("report", "review", "deploy", "migrate", "fix", "invoice", "customer", "release",
+         "design", "audit", "meeting", "backup", "refactor", "budget", "onboarding", "update")
+
+def random_task(rng: random.Random, today: date = None):
+    """
+    Builds one Task with realistically distributed status, priority and due date.
+    :param rng: Random generator, seeded by the caller for reproducible data sets.
+    :param today: Date the due dates are centred on, defaults to today.
+    :return: Task object without a task_id.
+    """
+    today = today or date.today()
+    status = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+    priority = rng.choices(list(PRIORITY_WEIGHTS), weights=list(PRIORITY_WEIGHTS.values()))[0]
+    due_date = today + timedelta(days=int(rng.gauss(0, DUE_DATE_SPREAD_DAYS)))
+    title = " ".join(rng.choice(WORDS) for _ in range(3)).capitalize()
+    description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 40)))
+    created = datetime.combine(due_date - timedelta(days=rng.randint(1, 90)), datetime.min.time())
+    return Task(title, description, due_date, priority, status, creation_timestamp=created)
+
+def generate_tasks(count: int, seed: int = 42):
+    """
+    Lazily generates count tasks, so even 10M rows never sit in memory at once.
+    :param count: Number of tasks.
+    :param seed: Random seed.
+    :return: Generator of Task objects.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    for _ in range(count):
+        yield random_task(rng, today)
+
+def seed_tasks(task_service, count: int, seed: int = 42, chunk_size: int = 5000):
+    """
+    Loads count generated tasks through the service's bulk import path.
+    :param task_service: TaskService to seed.
+    :param count: Number of tasks.
+    :param seed: Random seed.
+    :param chunk_size: Number of tasks per insert transaction.
+    :return: The import summary returned by TaskService.import_tasks.
+    """
+    return task_service.import_tasks(generate_tasks(count, seed), chunk_size=chunk_size)
@@ -7,6 +7,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from tabulate import tabulate
 from services.task_service import TaskService
+from repositories.errors import RepositoryError, TransientError, VersionConflictError
+from cli.table_renderer import StreamingTable
 
 def print_menu():
     """Displays the command-line menu options."""
@@ -19,6 +21,14 @@ def print_menu():
     print("5. Mark a task as completed")
     print("6. Delete a task")
     print("7. Exit")
+    print("8. Import tasks from a CSV/JSONL file")
+    print("9. Export tasks to a CSV/JSONL file")
+    print("10. Bulk update task status")
+    print("11. Bulk update task details")
+    print("12. Bulk delete tasks")
+    print("13. Search tasks")
+    print("14. Show summary dashboard")
+    print("15. Show what to work on next")
     print("=" * 40)
 
 def validate_date(date_str):
@@ -43,6 +53,10 @@ def validate_status(status):
     """Validates status input."""
     return status in ["Pending", "In Progress", "Completed"]
 
+def validate_format(fmt):
+    """Validates import/export file format input."""
+    return fmt in ["csv", "jsonl"]
+
 def validate_task_id(task_id):
     """Validates task ID as an integer."""
     return task_id.isdigit()
@@ -71,31 +85,49 @@ def add_task(task_service):
         print(f"\n❌ Error: {e}\n")
 
 def update_task(task_service):
-    """Updates an existing task's details."""
+    """
+    Updates an existing task's details. Blank answers keep the current value, only the
+    changed fields are written, and only if nobody else changed the task in the meantime.
+    """
     while True:
         task_id = input("Enter task ID to update: ")
         if validate_task_id(task_id):
             break
         print("❌ Invalid task ID. Please enter a valid number.")
-    
-    title = input("Enter new title: ")
-    description = input("Enter new description: ")
+
+    task = task_service.get_task(task_id)
+    if task is None:
+        print(f"\n❌ Error: Task {task_id} not found\n")
+        return
+    current = {"title": task.title, "description": task.description,
+               "due_date": task.due_date.strftime("%Y-%m-%d"), "priority": task.priority}
+
+    title = input(f"Enter new title [{current['title']}]: ")
+    description = input(f"Enter new description [{current['description']}]: ")
     
     while True:
-        due_date = input("Enter new due date (YYYY-MM-DD): ")
-        if validate_date(due_date):
+        due_date = input(f"Enter new due date (YYYY-MM-DD) [{current['due_date']}]: ")
+        if not due_date or validate_date(due_date):
             break
         print("❌ Invalid date format. Please enter in YYYY-MM-DD format.")
     
     while True:
-        priority = input("Enter new priority (Low, Medium, High): ")
-        if validate_priority(priority):
+        priority = input(f"Enter new priority (Low, Medium, High) [{current['priority']}]: ")
+        if not priority or validate_priority(priority):
             break
         print("❌ Invalid priority. Choose from Low, Medium, or High.")
-    
+
+    answers = {"title": title, "description": description, "due_date": due_date, "priority": priority}
+    changes = {field: value for field, value in answers.items() if value and value != current[field]}
+    if not changes:
+        print("⚠️ Nothing to update.")
+        return
+
     try:
-        task_service.update_task_details(task_id, title, description, due_date, priority)
+        task_service.update_task_fields(task_id, changes, task.version)
         print("\n✅ Task updated successfully!\n")
+    except VersionConflictError:
+        print("\n⚠️ Someone else changed this task while you were editing it. Nothing was saved, please try again.\n")
     except Exception as e:
         print(f"\n❌ Error: {e}\n")
 
@@ -127,21 +159,56 @@ def delete_task(task_service):
     except Exception as e:
         print(f"\n❌ Error: {e}\n")
 
-def list_tasks(task_service):
-    """Lists all tasks in a tabular format."""
-    tasks = task_service.list_tasks()
-    if not tasks:
-        print("⚠️ No tasks found")
-        return
-    
-    table_headers = ["ID", "Title", "Description", "Priority", "Status", "Due Date", "Created"]
-    table_data = [
-        [task.task_id, task.title, task.description, task.priority, task.status, task.due_date.strftime("%Y-%m-%d"), task.creation_timestamp.strftime("%Y-%m-%d %H:%M:%S")]
-        for task in tasks
-    ]
-    
-    print("📝 Task List")
-    print(tabulate(table_data, headers=table_headers, tablefmt="fancy_grid"))
+PAGE_SIZE = 50
+STREAM_PAGE_SIZE = 1000
+TABLE_HEADERS = ["ID", "Title", "Description", "Priority", "Status", "Due Date", "Created"]
+TABLE_MIN_WIDTHS = [8, 0, 0, 8, 11, 10, 19]
+
+def task_row(task):
+    """Converts a task into a table row."""
+    return [task.task_id, task.title, task.description, task.priority, task.status,
+            task.due_date.strftime("%Y-%m-%d"), task.creation_timestamp.strftime("%Y-%m-%d %H:%M:%S")]
+
+def list_tasks(task_service, filter_by=None, history=False):
+    """
+    Lists tasks in a tabular format.
+    A result that fits on one page is drawn with tabulate's fancy_grid. Larger results are
+    streamed page by page through a StreamingTable sized from the first page, so output
+    starts as soon as that page arrives. When stdout is not a terminal (e.g. piped into a
+    pager) the plain style is used and every page is written without prompting.
+    """
+    interactive = sys.stdout.isatty()
+    page_size = PAGE_SIZE if interactive else STREAM_PAGE_SIZE
+    after_id = None
+    table = None
+    while True:
+        tasks = task_service.list_tasks(filter_by, after_id=after_id, limit=page_size, history=history)
+        if not tasks and table is None:
+            print("⚠️ No tasks found")
+            return
+        rows = [task_row(task) for task in tasks]
+
+        if table is None:
+            if len(tasks) < page_size:
+                print("📝 Task List")
+                print(tabulate(rows, headers=TABLE_HEADERS, tablefmt="fancy_grid"))
+                return
+            print("📝 Task List")
+            table = StreamingTable.from_sample(TABLE_HEADERS, rows, style="grid" if interactive else "plain",
+                                               min_widths=TABLE_MIN_WIDTHS)
+        table.write_rows(rows)
+
+        if len(tasks) < page_size:
+            break
+        if interactive and page_size == PAGE_SIZE:
+            answer = input("Press Enter for the next page, 'a' for all, or 'q' to stop: ").strip().lower()
+            if answer == "q":
+                break
+            if answer == "a":
+                page_size = STREAM_PAGE_SIZE
+        after_id = tasks[-1].task_id
+    table.close()
+    print(f"{table.row_count} task(s) listed")
 
 def filter_tasks(task_service):
     """Filters tasks based on user input criteria."""
@@ -149,6 +216,7 @@ def filter_tasks(task_service):
     status = input("Filter by status (Pending, In Progress, Completed) or leave blank: ")
     priority = input("Filter by priority (Low, Medium, High) or leave blank: ")
     due_date = input("Filter by due date (YYYY-MM-DD) or leave blank: ")
+    history = input("Include archived tasks? (y/N): ").strip().lower() == "y"
     
     if status and validate_status(status):
         filter_by["status"] = status
@@ -157,8 +225,194 @@ def filter_tasks(task_service):
     if due_date and validate_date(due_date):
         filter_by["due_date"] = due_date
     
-    tasks = task_service.list_tasks(filter_by)
-    list_tasks(task_service)
+    list_tasks(task_service, filter_by, history)
+
+def search_tasks(task_service):
+    """Finds tasks by keyword, optionally narrowed down by status and priority."""
+    text = input("Enter search words: ").strip()
+    if not text:
+        print("❌ Search text cannot be empty.")
+        return
+    filter_by = {}
+    status = input("Filter by status (Pending, In Progress, Completed) or leave blank: ")
+    priority = input("Filter by priority (Low, Medium, High) or leave blank: ")
+    if status and validate_status(status):
+        filter_by["status"] = status
+    if priority and validate_priority(priority):
+        filter_by["priority"] = priority
+
+    try:
+        tasks = task_service.search_tasks(text, filter_by, limit=PAGE_SIZE)
+    except Exception as e:
+        print(f"\n❌ Error: {e}\n")
+        return
+    if not tasks:
+        print("⚠️ No matching tasks found")
+        return
+    print(f"🔎 {len(tasks)} best match(es) for '{text}'")
+    print(tabulate([task_row(task) for task in tasks], headers=TABLE_HEADERS, tablefmt="fancy_grid"))
+
+def next_tasks(task_service):
+    """Shows the open tasks to work on next: highest priority first, then earliest due date."""
+    count = input("How many tasks (default 10): ").strip()
+    if count and (not count.isdigit() or int(count) == 0):
+        print("❌ Please enter a positive number.")
+        return
+    filter_by = {}
+    status = input("Filter by status (Pending, In Progress) or leave blank for both: ")
+    priority = input("Filter by priority (Low, Medium, High) or leave blank: ")
+    if status and validate_status(status):
+        filter_by["status"] = status
+    if priority and validate_priority(priority):
+        filter_by["priority"] = priority
+
+    tasks = task_service.next_tasks(int(count or 10), filter_by)
+    if not tasks:
+        print("⚠️ Nothing left to do")
+        return
+    print(f"⏭️ Next {len(tasks)} task(s)")
+    print(tabulate([task_row(task) for task in tasks], headers=TABLE_HEADERS, tablefmt="fancy_grid"))
+
+def show_summary(task_service):
+    """Shows the task counts by status and priority and the due date histogram."""
+    stats = task_service.get_stats()
+    priorities = list(stats["by_priority"])
+    table_data = [[status] + [counts[priority] for priority in priorities] + [stats["by_status"][status]]
+                  for status, counts in stats["by_status_priority"].items()]
+    table_data.append(["Total"] + [stats["by_priority"][priority] for priority in priorities] + [stats["total"]])
+    print(f"📊 Summary as of {stats['as_of']}")
+    print(tabulate(table_data, headers=["Status"] + priorities + ["Total"], tablefmt="fancy_grid"))
+    due = stats["due"]
+    print(tabulate([[due["overdue"], due["today"], due["next_7_days"], due["next_30_days"], due["later"]]],
+                   headers=["⏰ Overdue", "Today", "Next 7 days", "Next 30 days", "Later"], tablefmt="fancy_grid"))
+
+def import_tasks(task_service):
+    """Imports tasks in bulk from a CSV or JSONL file."""
+    path = input("Enter file path to import: ")
+    while True:
+        fmt = input("Enter file format (csv, jsonl): ")
+        if validate_format(fmt):
+            break
+        print("❌ Invalid format. Choose from csv or jsonl.")
+
+    try:
+        with open(path, newline="", encoding="utf-8") as stream:
+            result = task_service.import_tasks(stream, fmt)
+        print(f"\n✅ Imported {result['imported']} task(s).")
+        for chunk in result["chunks"]:
+            if chunk["error"]:
+                print(f"❌ Chunk {chunk['chunk']} ({chunk['count']} tasks) failed: {chunk['error']}")
+        for row in result["invalid_rows"]:
+            print(f"⚠️ Skipped line {row['line']}: {row['error']}")
+        print()
+    except Exception as e:
+        print(f"\n❌ Error: {e}\n")
+
+def export_tasks(task_service):
+    """Exports tasks in bulk to a CSV or JSONL file."""
+    path = input("Enter file path to export to: ")
+    while True:
+        fmt = input("Enter file format (csv, jsonl): ")
+        if validate_format(fmt):
+            break
+        print("❌ Invalid format. Choose from csv or jsonl.")
+
+    try:
+        with open(path, "w", newline="", encoding="utf-8") as stream:
+            stream.writelines(task_service.export_tasks(fmt=fmt))
+        print(f"\n✅ Tasks exported to {path}\n")
+    except Exception as e:
+        print(f"\n❌ Error: {e}\n")
+
+def prompt_bulk_targets():
+    """
+    Asks for comma-separated task IDs, or for a filter when left blank.
+    :return: Tuple of (task_ids, filter_by), exactly one of them is not None; (None, None) if cancelled.
+    """
+    raw_ids = input("Enter comma-separated task IDs, or leave blank to select by filter: ").strip()
+    if raw_ids:
+        task_ids = [task_id.strip() for task_id in raw_ids.split(",") if task_id.strip()]
+        if not all(validate_task_id(task_id) for task_id in task_ids):
+            print("❌ Invalid task ID. Please enter valid numbers separated by commas.")
+            return None, None
+        return [int(task_id) for task_id in task_ids], None
+
+    filter_by = {}
+    status = input("Filter by status (Pending, In Progress, Completed) or leave blank: ")
+    priority = input("Filter by priority (Low, Medium, High) or leave blank: ")
+    due_date = input("Filter by due date (YYYY-MM-DD) or leave blank: ")
+    if status and validate_status(status):
+        filter_by["status"] = status
+    if priority and validate_priority(priority):
+        filter_by["priority"] = priority
+    if due_date and validate_date(due_date):
+        filter_by["due_date"] = due_date
+    if not filter_by and input("⚠️ No filter given, this applies to ALL tasks. Continue? (y/N): ").strip().lower() != "y":
+        return None, None
+    return None, filter_by
+
+def update_status_bulk(task_service):
+    """Sets the status of many tasks at once."""
+    task_ids, filter_by = prompt_bulk_targets()
+    if task_ids is None and filter_by is None:
+        return
+    while True:
+        status = input("Enter new status (Pending, In Progress, Completed): ")
+        if validate_status(status):
+            break
+        print("❌ Invalid status. Choose from Pending, In Progress, or Completed.")
+
+    try:
+        affected = task_service.update_status_bulk(status, task_ids, filter_by)
+        print(f"\n✅ {affected} task(s) set to {status}.\n")
+    except Exception as e:
+        print(f"\n❌ Error: {e}\n")
+
+def update_details_bulk(task_service):
+    """Applies the same detail changes to many tasks at once."""
+    task_ids, filter_by = prompt_bulk_targets()
+    if task_ids is None and filter_by is None:
+        return
+    changes = {}
+    title = input("Enter new title or leave blank to keep: ")
+    description = input("Enter new description or leave blank to keep: ")
+    due_date = input("Enter new due date (YYYY-MM-DD) or leave blank to keep: ")
+    priority = input("Enter new priority (Low, Medium, High) or leave blank to keep: ")
+    if title:
+        changes["title"] = title
+    if description:
+        changes["description"] = description
+    if due_date:
+        if not validate_date(due_date):
+            print("❌ Invalid date format. Please enter in YYYY-MM-DD format.")
+            return
+        changes["due_date"] = due_date
+    if priority:
+        if not validate_priority(priority):
+            print("❌ Invalid priority. Choose from Low, Medium, or High.")
+            return
+        changes["priority"] = priority
+    if not changes:
+        print("⚠️ Nothing to update.")
+        return
+
+    try:
+        affected = task_service.update_details_bulk(changes, task_ids, filter_by)
+        print(f"\n✅ {affected} task(s) updated.\n")
+    except Exception as e:
+        print(f"\n❌ Error: {e}\n")
+
+def delete_bulk(task_service):
+    """Deletes many tasks at once."""
+    task_ids, filter_by = prompt_bulk_targets()
+    if task_ids is None and filter_by is None:
+        return
+
+    try:
+        affected = task_service.delete_bulk(task_ids, filter_by)
+        print(f"\n🗑️ {affected} task(s) deleted.\n")
+    except Exception as e:
+        print(f"\n❌ Error: {e}\n")
 
 def main_menu(task_service: TaskService):
     """Main CLI loop."""
@@ -166,20 +420,42 @@ def main_menu(task_service: TaskService):
         print_menu()
         choice = input("Enter your choice: ")
 
-        if choice == "1":
-            add_task(task_service)
-        elif choice == "2":
-            list_tasks(task_service)
-        elif choice == "3":
-            filter_tasks(task_service)
-        elif choice == "4":
-            update_task(task_service)
-        elif choice == "5":
-            mark_task_completed(task_service)
-        elif choice == "6":
-            delete_task(task_service)
-        elif choice == "7":
-            print("\n👋 Exiting Task Management CLI. Goodbye!\n")
-            sys.exit()
-        else:
-            print("\n⚠️ Invalid choice. Please try again.\n")
+        try:
+            if choice == "1":
+                add_task(task_service)
+            elif choice == "2":
+                list_tasks(task_service)
+            elif choice == "3":
+                filter_tasks(task_service)
+            elif choice == "4":
+                update_task(task_service)
+            elif choice == "5":
+                mark_task_completed(task_service)
+            elif choice == "6":
+                delete_task(task_service)
+            elif choice == "8":
+                import_tasks(task_service)
+            elif choice == "9":
+                export_tasks(task_service)
+            elif choice == "10":
+                update_status_bulk(task_service)
+            elif choice == "11":
+                update_details_bulk(task_service)
+            elif choice == "12":
+                delete_bulk(task_service)
+            elif choice == "13":
+                search_tasks(task_service)
+            elif choice == "14":
+                show_summary(task_service)
+            elif choice == "15":
+                next_tasks(task_service)
+            elif choice in ("7", "0"):
+                # 7 is the historical Exit that piped scripts rely on; 0 is kept as an alias.
+                print("\n👋 Exiting Task Management CLI. Goodbye!\n")
+                sys.exit()
+            else:
+                print("\n⚠️ Invalid choice. Please try again.\n")
+        except TransientError as e:
+            print(f"\n⚠️ The database is busy, please try again. ({e})\n")
+        except RepositoryError as e:
+            print(f"\n❌ Error: {e}\n")
@@ -0,0 +1,558 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import csv
+import json
+import shlex
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+# Only the standard library is imported at module level: --help and argument errors
+# must never pay for the database driver or the repositories.
+
+OUTPUT_FORMATS = ("tsv", "csv", "json", "table", "plain")
+TABLE_SAMPLE_ROWS = 100
+TABLE_MIN_WIDTHS = {"task_id": 8, "priority": 8, "status": 11, "due_date": 10, "creation_timestamp": 19}
+PRIORITIES = ("Low", "Medium", "High")
+STATUSES = ("Pending", "In Progress", "Completed")
+FILE_FORMATS = ("csv", "jsonl")
+EXIT_TEMPORARY_FAILURE = 75  # EX_TEMPFAIL from sysexits.h
+
+class CommandError(Exception):
+    """A command failed for a reason worth reporting without a traceback."""
+
+class Session:
+    """
+    Holds the task service shared by the commands of one run.
+    The repository is only opened on first use, so --help and invalid arguments never
+    connect, and a batch run reuses one connection (pool) for all of its commands.
+    """
+
+    def __init__(self):
+        self.__repository = None
+        self.__task_service = None
+
+    @property
+    def task_service(self):
+        if self.__task_service is None:
+            from db_config import (get_database_url, get_cache_settings, get_summary_settings, get_next_index_settings,
+                                   get_metrics_settings)
+            from instrumentation import create_metrics
+            from repositories.factory import create_repository
+            from services.task_service import TaskService
+
+            metrics = create_metrics(get_metrics_settings())
+            self.__repository = create_repository(get_database_url(), metrics)
+            self.__task_service = TaskService(self.__repository, get_cache_settings(), get_summary_settings(),
+                                              get_next_index_settings())
+            if metrics is not None:
+                self.__task_service = metrics.instrument(self.__task_service, "service")
+        return self.__task_service
+
+    def close(self):
+        if self.__repository is not None:
+            self.__repository.close()
+        self.__repository = None
+        self.__task_service = None
+
+def due_date_arg(value: str):
+    """argparse type for a YYYY-MM-DD date."""
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+    return value
+
+def future_date_arg(value: str):
+    """argparse type for a YYYY-MM-DD date that is not in the past."""
+    due_date_arg(value)
+    if date.fromisoformat(value) < date.today():
+        raise argparse.ArgumentTypeError(f"due date {value} is in the past")
+    return value
+
+def task_id_arg(value: str):
+    """argparse type for a positive task ID."""
+    if not value.isdigit() or int(value) < 1:
+        raise argparse.ArgumentTypeError(f"invalid task ID '{value}'")
+    return int(value)
+
+def write_rows(rows, fieldnames, fmt: str, stream, many: bool = True):
+    """
+    Writes records in the requested output format, streaming where the format allows it.
+    :param rows: Iterable of dictionaries keyed by fieldnames.
+    :param fieldnames: Column order.
+    :param fmt: One of OUTPUT_FORMATS.
+    :param stream: Text stream to write to.
+    :param many: For json, write an array; otherwise the single record as an object.
+    """
+    if fmt in ("tsv", "csv"):
+        writer = csv.DictWriter(stream, fieldnames=fieldnames, delimiter="\t" if fmt == "tsv" else ",", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    elif fmt == "json":
+        if not many:
+            for row in rows:
+                stream.write(json.dumps(row) + "\n")
+            return
+        stream.write("[")
+        for number, row in enumerate(rows):
+            stream.write(("," if number else "") + "\n  " + json.dumps(row))
+        stream.write("\n]\n")
+    elif fmt in ("table", "plain"):
+        from cli.table_renderer import StreamingTable
+
+        cells = ([row[field] for field in fieldnames] for row in rows)
+        sample = list(islice(cells, TABLE_SAMPLE_ROWS))
+        with StreamingTable.from_sample(fieldnames, sample, style="grid" if fmt == "table" else "plain", stream=stream,
+                                        min_widths=[TABLE_MIN_WIDTHS.get(field, 0) for field in fieldnames]) as table:
+            table.write_rows(sample)
+            while True:
+                chunk = list(islice(cells, TABLE_SAMPLE_ROWS))
+                if not chunk:
+                    break
+                table.write_rows(chunk)
+    else:
+        raise ValueError(f"Unsupported output format '{fmt}'")
+
+def write_tasks(tasks, fmt: str, stream, many: bool = True, columns=None):
+    from services.task_io import EXPORT_FIELDS, task_to_record
+
+    fields = [field for field in EXPORT_FIELDS if columns is None or field in columns]
+    records = (task_to_record(task) for task in tasks)
+    if columns is not None:
+        records = ({field: record[field] for field in fields} for record in records)
+    write_rows(records, fields, fmt, stream, many)
+
+def write_result(result: dict, fmt: str, stream):
+    write_rows([result], list(result), fmt, stream, many=False)
+
+def filter_from_args(args):
+    filter_by = {}
+    for field in ("status", "priority", "due_date"):
+        if getattr(args, field, None) is not None:
+            filter_by[field] = getattr(args, field)
+    return filter_by
+
+def command_add(session: Session, args, stream):
+    task = session.task_service.create_task(args.title, args.description, args.due_date, args.priority)
+    write_tasks([session.task_service.get_task(task.task_id) or task], args.output, stream, many=False)
+
+def command_get(session: Session, args, stream):
+    task = session.task_service.get_task(args.task_id, args.history)
+    if task is None:
+        raise CommandError(f"task {args.task_id} not found")
+    write_tasks([task], args.output, stream, many=False)
+
+def split_list(value: str):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def command_list(session: Session, args, stream):
+    """
+    Plain equality filters use the streaming keyset listing; anything else (several values,
+    date ranges, overdue, text, sorting, projection, offset) is sent as a TaskQuery.
+    """
+    from models.task_query import TaskQuery
+
+    statuses, priorities = args.status or [], args.priority or []
+    rich = (len(statuses) > 1 or len(priorities) > 1 or args.due_from or args.due_to or args.overdue
+            or args.text or args.sort or args.columns or args.offset)
+    if args.command == "filter" and not (statuses or priorities or args.due_date or rich):
+        raise CommandError("filter needs at least one filter option")
+
+    if rich:
+        if args.history:
+            raise CommandError("--history only combines with --status, --priority, --due-date, --after-id and --limit")
+        query = TaskQuery(status=statuses or None, priority=priorities or None, due_date=args.due_date,
+                          due_from=args.due_from, due_to=args.due_to, overdue=args.overdue, text=args.text,
+                          order_by=split_list(args.sort or ""), limit=args.limit, offset=args.offset or 0,
+                          after_id=args.after_id, columns=split_list(args.columns) if args.columns else None)
+        write_tasks(session.task_service.list_tasks(query), args.output, stream, columns=query.columns)
+        return
+
+    filter_by = {"status": statuses[0] if statuses else None, "priority": priorities[0] if priorities else None,
+                 "due_date": args.due_date}
+    filter_by = {field: value for field, value in filter_by.items() if value is not None}
+    if args.limit is None and args.after_id is None:
+        tasks = session.task_service.iter_tasks(filter_by, args.history)
+    else:
+        tasks = session.task_service.list_tasks(filter_by, after_id=args.after_id, limit=args.limit, history=args.history)
+    write_tasks(tasks, args.output, stream)
+
+def command_search(session: Session, args, stream):
+    tasks = session.task_service.search_tasks(args.text, filter_from_args(args), args.limit)
+    write_tasks(tasks, args.output, stream)
+
+def command_next(session: Session, args, stream):
+    write_tasks(session.task_service.next_tasks(args.count, filter_from_args(args)), args.output, stream)
+
+def command_summary(session: Session, args, stream):
+    stats = session.task_service.get_stats()
+    if args.output == "json":
+        stream.write(json.dumps(stats) + "\n")
+        return
+    rows = [{"group": "total", "key": "", "count": stats["total"]}]
+    rows += [{"group": "status", "key": status, "count": count} for status, count in stats["by_status"].items()]
+    rows += [{"group": "priority", "key": priority, "count": count} for priority, count in stats["by_priority"].items()]
+    rows += [{"group": "status/priority", "key": f"{status}/{priority}", "count": count}
+             for status, counts in stats["by_status_priority"].items() for priority, count in counts.items()]
+    rows += [{"group": "due", "key": bucket, "count": count} for bucket, count in stats["due"].items()]
+    write_rows(rows, ["group", "key", "count"], args.output, stream)
+
+def write_bulk_result(key: str, affected: int, args, stream):
+    """Writes the count of a by-id write, failing the command when some of the ids did not exist."""
+    write_result({key: affected}, args.output, stream)
+    missing = len(set(args.task_ids)) - affected
+    if missing > 0:
+        raise CommandError(f"{missing} of the given task(s) not found")
+
+def command_update(session: Session, args, stream):
+    changes = {field: getattr(args, field) for field in ("title", "description", "due_date", "priority")
+               if getattr(args, field) is not None}
+    if not changes:
+        raise CommandError("nothing to update, pass at least one of --title, --description, --due-date or --priority")
+    if args.expected_version is not None:
+        if len(set(args.task_ids)) != 1:
+            raise CommandError("--expected-version applies to a single task")
+        session.task_service.update_task_fields(args.task_ids[0], changes, args.expected_version)
+        write_result({"updated": 1}, args.output, stream)
+        return
+    write_bulk_result("updated", session.task_service.update_details_bulk(changes, args.task_ids), args, stream)
+
+def command_complete(session: Session, args, stream):
+    write_bulk_result("completed", session.task_service.mark_tasks_completed(args.task_ids), args, stream)
+
+def command_delete(session: Session, args, stream):
+    write_bulk_result("deleted", session.task_service.delete_bulk(args.task_ids), args, stream)
+
+def file_format(path: str, fmt: str):
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension in FILE_FORMATS:
+        return extension
+    raise CommandError(f"cannot infer the format of '{path}', pass --format csv or --format jsonl")
+
+def command_import(session: Session, args, stream):
+    fmt = file_format(args.path, args.format)
+    if args.path == "-":
+        result = session.task_service.import_tasks(sys.stdin, fmt)
+    else:
+        with open(args.path, newline="", encoding="utf-8") as source:
+            result = session.task_service.import_tasks(source, fmt)
+    for chunk in result["chunks"]:
+        if chunk["error"]:
+            print(f"chunk {chunk['chunk']} ({chunk['count']} tasks) failed: {chunk['error']}", file=sys.stderr)
+    for row in result["invalid_rows"]:
+        print(f"skipped line {row['line']}: {row['error']}", file=sys.stderr)
+    write_result({"imported": result["imported"], "failed": result["failed"], "invalid": len(result["invalid_rows"])},
+                 args.output, stream)
+    if result["failed"] or result["invalid_rows"]:
+        raise CommandError("some tasks were not imported")
+
+def command_export(session: Session, args, stream):
+    if args.path == "-":
+        stream.writelines(session.task_service.export_tasks(filter_from_args(args), file_format(args.path, args.format or "jsonl")))
+        return
+    fmt = file_format(args.path, args.format)
+    with open(args.path, "w", newline="", encoding="utf-8") as target:
+        target.writelines(session.task_service.export_tasks(filter_from_args(args), fmt))
+
+def command_changes(session: Session, args, stream):
+    """
+    Prints the changes after --since, or with --follow keeps printing new changes as JSON
+    lines until interrupted, resuming from and saving to --checkpoint.
+    """
+    from services.task_io import CHANGE_FIELDS, change_to_record
+
+    if not args.follow:
+        if args.checkpoint:
+            raise CommandError("--checkpoint is only used with --follow")
+        changes = session.task_service.changes_since(args.since, args.limit)
+        write_rows((change_to_record(change) for change in changes), CHANGE_FIELDS, args.output, stream)
+        return
+
+    from services.change_subscriber import ChangeSubscriber
+
+    def print_changes(changes):
+        for change in changes:
+            stream.write(json.dumps(change_to_record(change)) + "\n")
+        stream.flush()
+
+    subscriber = ChangeSubscriber(session.task_service, print_changes, args.checkpoint, args.since, args.limit)
+    try:
+        subscriber.run()
+    except KeyboardInterrupt:
+        pass
+
+def command_claim(session: Session, args, stream):
+    tasks = session.task_service.claim_tasks(args.worker_id, args.count, not args.by_due_date, args.lease)
+    write_tasks(tasks, args.output, stream)
+
+def command_renew(session: Session, args, stream):
+    renewed = session.task_service.renew_claims(args.worker_id, args.task_ids or None, args.lease)
+    write_rows(({"task_id": task_id} for task_id in renewed), ["task_id"], args.output, stream)
+    lost = set(args.task_ids) - set(renewed)
+    if lost:
+        raise CommandError(f"{len(lost)} of the given task(s) are no longer claimed by {args.worker_id}")
+
+def command_release(session: Session, args, stream):
+    released = session.task_service.release_claims(args.worker_id, args.task_ids, args.status)
+    write_result({"released": len(released)}, args.output, stream)
+    missing = len(set(args.task_ids)) - len(released)
+    if missing > 0:
+        raise CommandError(f"{missing} of the given task(s) are not claimed by {args.worker_id}")
+
+def command_reap(session: Session, args, stream):
+    write_result({"reaped": len(session.task_service.reap_expired_claims(args.limit))}, args.output, stream)
+
+def command_archive(session: Session, args, stream):
+    from services.archiver import TaskArchiver
+
+    archiver = TaskArchiver(session.task_service, args.retention_days, args.batch_size, args.pause, max_batches=args.max_batches)
+    write_result({"archived": len(archiver.step())}, args.output, stream)
+
+def command_schedule(session: Session, args, stream):
+    """
+    Fires due-soon and overdue alerts until interrupted, writing each as it fires (tsv/csv
+    rows or JSON lines), or fires the due ones once with --once (e.g. from cron) and writes
+    them in any output format. Resumes from and saves to --checkpoint.
+    """
+    from services.scheduler import ALERT_FIELDS, DueDateScheduler, EscalateAlert, WebhookAlert, deadline_to_record
+
+    if args.once and not args.checkpoint:
+        raise CommandError("--once needs --checkpoint to know which alerts already fired")
+    if not args.once and args.output in ("table", "plain"):
+        raise CommandError(f"-o {args.output} needs --once, streamed alerts are written as tsv, csv or json")
+
+    callbacks = []
+    if not args.once:
+        writer = None
+        if args.output != "json":
+            writer = csv.DictWriter(stream, fieldnames=ALERT_FIELDS, delimiter="\t" if args.output == "tsv" else ",",
+                                    lineterminator="\n")
+            writer.writeheader()
+            stream.flush()
+
+        def print_alert(deadline):
+            if writer is None:
+                stream.write(json.dumps(deadline_to_record(deadline)) + "\n")
+            else:
+                writer.writerow(deadline_to_record(deadline))
+            stream.flush()
+
+        callbacks.append(print_alert)
+    if args.webhook:
+        callbacks.append(WebhookAlert(args.webhook))
+    if args.escalate:
+        callbacks.append(EscalateAlert(session.task_service))
+    alerts = {"due_soon": timedelta(days=-args.lead_days), "overdue": timedelta(days=1)}
+    scheduler = DueDateScheduler(session.task_service, callbacks, args.checkpoint, alerts, interval=args.interval)
+    if args.once:
+        write_rows((deadline_to_record(deadline) for deadline in scheduler.step()), ALERT_FIELDS, args.output, stream)
+        return
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        pass
+
+def command_batch(session: Session, args, stream):
+    """
+    Runs one command per stdin line over the session's single connection.
+    Blank lines and lines starting with # are skipped; a failing line is reported
+    on stderr and the batch carries on unless --stop-on-error is given.
+    """
+    from repositories.errors import RepositoryError
+
+    parser = build_parser()
+    failures = 0
+    for line_number, line in enumerate(sys.stdin, start=1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            line_args = parser.parse_args(shlex.split(line))
+            if line_args.command == "batch":
+                raise CommandError("batch cannot be nested")
+            line_args.output = line_args.output or args.output
+            line_args.handler(session, line_args, stream)
+        except SystemExit as e:
+            failed = e.code not in (0, None)
+            if failed:
+                print(f"line {line_number}: ❌ invalid command", file=sys.stderr)
+        except (CommandError, RepositoryError, ValueError, OSError) as e:
+            print(f"line {line_number}: ❌ {e}", file=sys.stderr)
+            failed = True
+        else:
+            failed = False
+        if failed:
+            failures += 1
+            if args.stop_on_error:
+                break
+    if failures:
+        raise CommandError(f"{failures} batch command(s) failed")
+
+def add_filter_arguments(parser):
+    parser.add_argument("--status", choices=STATUSES, help="only tasks with this status")
+    parser.add_argument("--priority", choices=PRIORITIES, help="only tasks with this priority")
+    parser.add_argument("--due-date", type=due_date_arg, help="only tasks due on this date (YYYY-MM-DD)")
+
+def build_parser():
+    """Builds the argparse parser for every subcommand."""
+    parser = argparse.ArgumentParser(prog="tasks", description="Task management from the command line. Run without arguments for the interactive menu.")
+    parser.add_argument("-o", "--output", choices=OUTPUT_FORMATS, help="output format (default tsv)")
+    subcommands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    add_parser = subcommands.add_parser("add", help="add a new task")
+    add_parser.add_argument("--title", required=True)
+    add_parser.add_argument("--description", default="")
+    add_parser.add_argument("--due-date", required=True, type=future_date_arg, help="YYYY-MM-DD, not in the past")
+    add_parser.add_argument("--priority", required=True, choices=PRIORITIES)
+    add_parser.set_defaults(handler=command_add)
+
+    get_parser = subcommands.add_parser("get", help="show one task")
+    get_parser.add_argument("task_id", type=task_id_arg)
+    get_parser.add_argument("--history", action="store_true", help="also look in the archive")
+    get_parser.set_defaults(handler=command_get)
+
+    for name, help_text in (("list", "list tasks"), ("filter", "list tasks matching at least one filter")):
+        list_parser = subcommands.add_parser(name, help=help_text)
+        list_parser.add_argument("--status", action="append", choices=STATUSES, help="only tasks with this status, repeat for several")
+        list_parser.add_argument("--priority", action="append", choices=PRIORITIES, help="only tasks with this priority, repeat for several")
+        list_parser.add_argument("--due-date", type=due_date_arg, help="only tasks due on this date (YYYY-MM-DD)")
+        list_parser.add_argument("--due-from", type=due_date_arg, help="only tasks due on or after this date")
+        list_parser.add_argument("--due-to", type=due_date_arg, help="only tasks due on or before this date")
+        list_parser.add_argument("--overdue", action="store_true", help="only tasks past their due date and not completed")
+        list_parser.add_argument("--text", help="only tasks whose title or description contains this text")
+        list_parser.add_argument("--sort", help="comma-separated fields, prefix with - for descending, e.g. -priority,due_date")
+        list_parser.add_argument("--columns", help="comma-separated fields to load, e.g. task_id,title,due_date")
+        list_parser.add_argument("--after-id", type=task_id_arg, help="start after this task ID (keyset pagination)")
+        list_parser.add_argument("--offset", type=int, help="skip this many tasks (for sorted listings)")
+        list_parser.add_argument("--limit", type=int, help="maximum number of tasks")
+        list_parser.add_argument("--history", action="store_true", help="include archived tasks")
+        list_parser.set_defaults(handler=command_list)
+
+    search_parser = subcommands.add_parser("search", help="full-text search over titles and descriptions")
+    search_parser.add_argument("text", help="search words, tasks containing any of them match")
+    add_filter_arguments(search_parser)
+    search_parser.add_argument("--limit", type=int, default=50, help="maximum number of tasks (default 50)")
+    search_parser.set_defaults(handler=command_search)
+
+    next_parser = subcommands.add_parser("next", help="the open tasks to work on next, by priority then due date")
+    add_filter_arguments(next_parser)
+    next_parser.add_argument("-k", "--count", type=int, default=10, help="maximum number of tasks (default 10)")
+    next_parser.set_defaults(handler=command_next)
+
+    summary_parser = subcommands.add_parser("summary", help="counts by status and priority, overdue and due date histogram")
+    summary_parser.set_defaults(handler=command_summary)
+
+    update_parser = subcommands.add_parser("update", help="update the details of one or more tasks")
+    update_parser.add_argument("task_ids", nargs="+", type=task_id_arg, metavar="task_id")
+    update_parser.add_argument("--title")
+    update_parser.add_argument("--description")
+    update_parser.add_argument("--due-date", type=future_date_arg, help="YYYY-MM-DD, not in the past")
+    update_parser.add_argument("--priority", choices=PRIORITIES)
+    update_parser.add_argument("--expected-version", type=int,
+                               help="only update a single task if it still has this version (see get), else fail")
+    update_parser.set_defaults(handler=command_update)
+
+    complete_parser = subcommands.add_parser("complete", help="mark one or more tasks as completed")
+    complete_parser.add_argument("task_ids", nargs="+", type=task_id_arg, metavar="task_id")
+    complete_parser.set_defaults(handler=command_complete)
+
+    delete_parser = subcommands.add_parser("delete", help="delete one or more tasks")
+    delete_parser.add_argument("task_ids", nargs="+", type=task_id_arg, metavar="task_id")
+    delete_parser.set_defaults(handler=command_delete)
+
+    import_parser = subcommands.add_parser("import", help="import tasks from a CSV/JSONL file")
+    import_parser.add_argument("path", help="file to read, - for stdin")
+    import_parser.add_argument("--format", choices=FILE_FORMATS, help="defaults to the file extension")
+    import_parser.set_defaults(handler=command_import)
+
+    export_parser = subcommands.add_parser("export", help="export tasks to a CSV/JSONL file")
+    export_parser.add_argument("path", help="file to write, - for stdout")
+    export_parser.add_argument("--format", choices=FILE_FORMATS, help="defaults to the file extension (jsonl for stdout)")
+    add_filter_arguments(export_parser)
+    export_parser.set_defaults(handler=command_export)
+
+    changes_parser = subcommands.add_parser("changes", help="show the task change log for incremental sync")
+    changes_parser.add_argument("--since", type=int, default=0, help="change_id of the last change already seen (default 0)")
+    changes_parser.add_argument("--limit", type=int, default=1000, help="maximum number of changes per read (default 1000)")
+    changes_parser.add_argument("--follow", action="store_true", help="keep printing new changes as JSON lines until interrupted")
+    changes_parser.add_argument("--checkpoint", help="with --follow, file the last printed change_id is resumed from and saved to")
+    changes_parser.set_defaults(handler=command_changes)
+
+    claim_parser = subcommands.add_parser("claim", help="claim the next pending tasks for a worker")
+    claim_parser.add_argument("worker_id")
+    claim_parser.add_argument("-n", "--count", type=int, default=1, help="maximum number of tasks (default 1)")
+    claim_parser.add_argument("--lease", type=float, default=300.0, help="seconds until the claims expire (default 300)")
+    claim_parser.add_argument("--by-due-date", action="store_true", help="claim by due date alone, ignoring priority")
+    claim_parser.set_defaults(handler=command_claim)
+
+    renew_parser = subcommands.add_parser("renew", help="extend the leases of a worker's claims")
+    renew_parser.add_argument("worker_id")
+    renew_parser.add_argument("task_ids", nargs="*", type=task_id_arg, metavar="task_id", help="default: every claim of the worker")
+    renew_parser.add_argument("--lease", type=float, default=300.0, help="seconds from now until the claims expire (default 300)")
+    renew_parser.set_defaults(handler=command_renew)
+
+    release_parser = subcommands.add_parser("release", help="end a worker's claims and complete (or hand back) the tasks")
+    release_parser.add_argument("worker_id")
+    release_parser.add_argument("task_ids", nargs="+", type=task_id_arg, metavar="task_id")
+    release_parser.add_argument("--status", choices=("Completed", "Pending"), default="Completed",
+                                help="new status of the tasks (default Completed)")
+    release_parser.set_defaults(handler=command_release)
+
+    reap_parser = subcommands.add_parser("reap", help="put the tasks of expired claims back to Pending")
+    reap_parser.add_argument("--limit", type=int, default=1000, help="maximum number of claims removed (default 1000)")
+    reap_parser.set_defaults(handler=command_reap)
+
+    archive_parser = subcommands.add_parser("archive", help="move old completed tasks to the archive, in throttled batches")
+    archive_parser.add_argument("--retention-days", type=int, default=90,
+                                help="archive completed tasks due at least this many days ago (default 90)")
+    archive_parser.add_argument("--batch-size", type=int, default=500, help="tasks moved per transaction (default 500)")
+    archive_parser.add_argument("--pause", type=float, default=0.1, help="seconds between batches (default 0.1)")
+    archive_parser.add_argument("--max-batches", type=int, help="stop after this many batches (default: until done)")
+    archive_parser.set_defaults(handler=command_archive)
+
+    schedule_parser = subcommands.add_parser("schedule", help="fire due-soon and overdue alerts of open tasks until interrupted")
+    schedule_parser.add_argument("--checkpoint", help="file the last fired alert is resumed from and saved to")
+    schedule_parser.add_argument("--lead-days", type=int, default=1, help="days before the due date the due-soon alert fires (default 1)")
+    schedule_parser.add_argument("--escalate", action="store_true", help="raise the priority of overdue tasks to High")
+    schedule_parser.add_argument("--webhook", help="URL each alert is also POSTed to as JSON")
+    schedule_parser.add_argument("--interval", type=float, default=60.0, help="seconds between passes (default 60)")
+    schedule_parser.add_argument("--once", action="store_true", help="fire the due alerts and exit")
+    schedule_parser.set_defaults(handler=command_schedule)
+
+    batch_parser = subcommands.add_parser("batch", help="run one command per stdin line over a single connection")
+    batch_parser.add_argument("--stop-on-error", action="store_true", help="stop at the first failing line")
+    batch_parser.set_defaults(handler=command_batch)
+    return parser
+
+def run(argv=None, stream=None):
+    """
+    Parses argv and runs the command.
+    :param argv: Arguments without the program name, defaults to sys.argv[1:].
+    :param stream: Where results are written, defaults to sys.stdout.
+    :return: Process exit status (0 success, 1 failure, 2 usage error, 75 temporary database
+             failure that is worth retrying later).
+    """
+    args = build_parser().parse_args(argv)
+    args.output = args.output or "tsv"
+    from repositories.errors import RepositoryError, TransientError
+
+    session = Session()
+    try:
+        args.handler(session, args, stream or sys.stdout)
+        return 0
+    except TransientError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_TEMPORARY_FAILURE
+    except (CommandError, RepositoryError, ValueError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    sys.exit(run())
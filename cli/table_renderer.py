@@ -0,0 +1,115 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+STYLES = ("grid", "plain")
+
+# Box-drawing characters matching tabulate's fancy_grid, as (left, fill, junction, right).
+GRID_TOP = ("╒", "═", "╤", "╕")
+GRID_HEADER_RULE = ("╞", "═", "╪", "╡")
+GRID_BOTTOM = ("╘", "═", "╧", "╛")
+
+def format_cell(value, width: int):
+    """
+    Renders one cell on a single line, truncated with an ellipsis to at most width characters.
+    :param value: Cell value, None renders as an empty cell.
+    :param width: Column width.
+    :return: The cell text, not padded.
+    """
+    text = "" if value is None else " ".join(str(value).split())
+    if len(text) > width:
+        return text[:width - 1] + "…"
+    return text
+
+class StreamingTable:
+    """
+    Renders a table row by row instead of measuring the whole result set first.
+    Column widths are fixed up front, from a sample of the rows or an explicit schema,
+    and cells that do not fit are truncated. The "grid" style mimics tabulate's
+    fancy_grid, "plain" prints space-aligned columns that page and grep well.
+    """
+
+    def __init__(self, headers, widths, style: str = "grid", stream=None):
+        """
+        :param headers: Column titles.
+        :param widths: Column widths in characters, one per header.
+        :param style: "grid" or "plain".
+        :param stream: Text stream to write to, defaults to sys.stdout.
+        """
+        if style not in STYLES:
+            raise ValueError(f"Unsupported table style '{style}'. Choose from {', '.join(STYLES)}.")
+        if len(widths) != len(headers):
+            raise ValueError("Need exactly one width per header")
+        self.__headers = list(headers)
+        self.__widths = [max(1, width) for width in widths]
+        self.__style = style
+        self.__stream = stream or sys.stdout
+        self.__started = False
+        self.__rows = 0
+
+    @classmethod
+    def from_sample(cls, headers, sample_rows, max_width: int = 40, style: str = "grid", stream=None, min_widths=None):
+        """
+        Sizes each column to fit its header and the cells of a sample of rows, capped at max_width.
+        :param headers: Column titles.
+        :param sample_rows: The first rows of the result, e.g. the first page.
+        :param max_width: Widest any column may get.
+        :param min_widths: Optional per-column minimum widths, for columns whose later values
+                           can outgrow the sample (ids, fixed-format dates).
+        :return: StreamingTable instance.
+        """
+        widths = [len(str(header)) for header in headers]
+        if min_widths:
+            widths = [max(width, minimum) for width, minimum in zip(widths, min_widths)]
+        for row in sample_rows:
+            for position, value in enumerate(row):
+                widths[position] = max(widths[position], len(format_cell(value, max_width)))
+        return cls(headers, [min(width, max_width) for width in widths], style, stream)
+
+    @property
+    def row_count(self):
+        return self.__rows
+
+    def __line(self, cells):
+        cells = [format_cell(value, width).ljust(width) for value, width in zip(cells, self.__widths)]
+        if self.__style == "grid":
+            return "│ " + " │ ".join(cells) + " │\n"
+        return "  ".join(cells).rstrip() + "\n"
+
+    def __rule(self, characters):
+        left, fill, junction, right = characters
+        return left + junction.join(fill * (width + 2) for width in self.__widths) + right + "\n"
+
+    def __start(self):
+        self.__started = True
+        if self.__style == "grid":
+            self.__stream.write(self.__rule(GRID_TOP) + self.__line(self.__headers) + self.__rule(GRID_HEADER_RULE))
+        else:
+            self.__stream.write(self.__line(self.__headers) + "  ".join("-" * width for width in self.__widths) + "\n")
+
+    def write_rows(self, rows):
+        """
+        Writes rows as they come and flushes, so output appears before the result is complete.
+        :param rows: Iterable of sequences, one value per column.
+        """
+        if not self.__started:
+            self.__start()
+        for row in rows:
+            self.__stream.write(self.__line(row))
+            self.__rows += 1
+        self.__stream.flush()
+
+    def close(self):
+        """Writes the header if no row was written, and the bottom border."""
+        if not self.__started:
+            self.__start()
+        if self.__style == "grid":
+            self.__stream.write(self.__rule(GRID_BOTTOM))
+        self.__stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+class PoolClosedError(Exception):
+    """Raised when a connection is requested from a closed pool."""
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of database connections.
+    Connections are created lazily up to max_size, handed out most-recently-used first,
+    health checked with ping(reconnect=True) when they sat idle for longer than
+    health_check_interval, and closed when they sat idle for longer than max_idle.
+    """
+
+    def __init__(self, connect, max_size: int = 10, max_idle: float = 300.0,
+                 timeout: float = 30.0, health_check_interval: float = 5.0, wait_observer=None):
+        """
+        Initializes the pool. No connection is opened until the first checkout.
+        :param connect: Callable returning a new DB-API connection.
+        :param max_size: Maximum number of open connections, idle and in use.
+        :param max_idle: Seconds after which an idle connection is closed instead of reused.
+        :param timeout: Seconds to wait for a free connection before raising PoolTimeoutError.
+        :param health_check_interval: Idle seconds after which a connection is pinged before reuse.
+        :param wait_observer: Optional callable receiving the seconds each checkout waited, e.g.
+                              Metrics.observe_pool_wait.
+        """
+        self.__connect = connect
+        self.__max_size = max_size
+        self.__max_idle = max_idle
+        self.__timeout = timeout
+        self.__health_check_interval = health_check_interval
+        self.__wait_observer = wait_observer
+        self.__idle = deque()
+        self.__size = 0
+        self.__closed = False
+        self.__condition = threading.Condition()
+        self.__stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "returns": 0,
+            "discarded": 0,
+            "health_checks": 0,
+            "idle_expired": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def acquire(self):
+        """
+        Checks a connection out of the pool, opening a new one if the pool is not full.
+        :return: A live connection. It must be handed back with release().
+        """
+        started = time.monotonic()
+        deadline = started + self.__timeout
+        entry = None
+        with self.__condition:
+            while True:
+                if self.__closed:
+                    raise PoolClosedError("Connection pool is closed")
+                if self.__idle:
+                    entry = self.__idle.pop()
+                    break
+                if self.__size < self.__max_size:
+                    self.__size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.__stats["timeouts"] += 1
+                    raise PoolTimeoutError(f"No connection available within {self.__timeout} seconds")
+                self.__stats["waits"] += 1
+                self.__condition.wait(remaining)
+            self.__stats["checkouts"] += 1
+            now = time.monotonic()
+            waited = now - started
+            self.__stats["wait_seconds"] += waited
+            idle_for = now - entry[1] if entry is not None else 0.0
+            expired = idle_for > self.__max_idle
+            check = not expired and idle_for > self.__health_check_interval
+            if expired:
+                self.__stats["idle_expired"] += 1
+            elif check:
+                self.__stats["health_checks"] += 1
+        if self.__wait_observer is not None:
+            self.__wait_observer(waited)
+
+        try:
+            if entry is None:
+                return self.__open()
+            connection = entry[0]
+            if expired:
+                self.__close_quietly(connection)
+                return self.__open()
+            if check:
+                try:
+                    connection.ping(reconnect=True)
+                except BaseException:
+                    self.__close_quietly(connection)
+                    raise
+            return connection
+        except BaseException:
+            with self.__condition:
+                self.__size -= 1
+                self.__condition.notify()
+            raise
+
+    def release(self, connection, discard: bool = False):
+        """
+        Returns a connection to the pool.
+        :param connection: Connection obtained from acquire().
+        :param discard: Close the connection instead of reusing it, e.g. after a fatal error.
+        """
+        if not discard and not getattr(connection, "open", True):
+            discard = True
+        with self.__condition:
+            self.__stats["returns"] += 1
+            if discard or self.__closed:
+                self.__size -= 1
+                self.__stats["discarded"] += 1
+            else:
+                self.__idle.append((connection, time.monotonic()))
+                connection = None
+            self.__condition.notify()
+        if connection is not None:
+            self.__close_quietly(connection)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection for the duration of a with block.
+        Any open transaction is rolled back if the block raises.
+        """
+        connection = self.acquire()
+        discard = False
+        try:
+            yield connection
+        except BaseException:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.release(connection, discard)
+
+    def stats(self):
+        """
+        Returns a snapshot of the pool statistics.
+        :return: Dictionary with size, idle and in-use counts and checkout/return accounting.
+        """
+        with self.__condition:
+            snapshot = dict(self.__stats)
+            snapshot["size"] = self.__size
+            snapshot["idle"] = len(self.__idle)
+            snapshot["in_use"] = self.__size - len(self.__idle)
+            snapshot["max_size"] = self.__max_size
+        return snapshot
+
+    def close(self):
+        """Closes all idle connections. Connections still checked out are closed when returned."""
+        with self.__condition:
+            self.__closed = True
+            idle = [connection for connection, _ in self.__idle]
+            self.__idle.clear()
+            self.__size -= len(idle)
+            self.__condition.notify_all()
+        for connection in idle:
+            self.__close_quietly(connection)
+
+    def __open(self):
+        connection = self.__connect()
+        with self.__condition:
+            self.__stats["created"] += 1
+        return connection
+
+    def __close_quietly(self, connection):
+        with self.__condition:
+            self.__stats["closed"] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
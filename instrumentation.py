@@ -0,0 +1,425 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import types
+from bisect import bisect_left
+from datetime import datetime
+
+# Upper bounds in seconds of the latency histogram buckets, an implicit +Inf bucket follows.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metric name: (type, label names, help text).
+METRICS = {
+    "tasks_operation_seconds": ("histogram", ("layer", "operation"), "Latency of repository and service calls."),
+    "tasks_operation_errors_total": ("counter", ("layer", "operation"), "Calls that raised an exception."),
+    "tasks_rows_total": ("counter", ("layer", "operation"), "Tasks returned, or rows affected by bulk writes."),
+    "tasks_sql_seconds": ("histogram", ("statement",), "Latency of SQL statements by leading keyword."),
+    "tasks_sql_rows_total": ("counter", ("statement",), "Rows returned or affected as reported by the driver."),
+    "tasks_slow_queries_total": ("counter", (), "SQL statements slower than the slow query threshold."),
+    "tasks_pool_wait_seconds": ("histogram", (), "Time spent waiting for a pooled connection."),
+}
+
+METRICS_FORMATS = ("json", "prometheus")
+QUANTILES = (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+
+class Histogram:
+    """Fixed-bucket latency histogram. Not thread-safe on its own, Metrics serializes access."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def copy(self):
+        histogram = Histogram(self.bounds)
+        histogram.counts, histogram.count, histogram.sum = list(self.counts), self.count, self.sum
+        return histogram
+
+    def quantile(self, q: float):
+        """
+        Estimates a quantile as the upper bound of the bucket it falls into.
+        :return: Seconds, None when empty, infinity when it falls past the last bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class Metrics:
+    """
+    Process-wide registry of latency histograms and counters for the task storage hot path:
+    per-method timings and row counts of the repository and service layers, SQL statement
+    timings and counts, and connection pool wait time. Statements slower than the threshold
+    are written to the slow query log as JSON lines with their SQL and parameters.
+    Nothing in the application refers to this class unless metrics are enabled, so the
+    disabled switch costs nothing on the hot path.
+    """
+
+    def __init__(self, slow_query_seconds: float = None, slow_query_log: str = None):
+        """
+        :param slow_query_seconds: Statements taking at least this long are logged, None to log none.
+        :param slow_query_log: Path of the slow query log, None for stderr.
+        """
+        self.__slow_query_seconds = slow_query_seconds
+        self.__slow_query_log = slow_query_log
+        self.__slow_query_stream = None
+        self.__lock = threading.Lock()
+        self.__series = {name: {} for name in METRICS}
+        self.__started_at = time.time()
+        self.__reporter = None
+        self.__stop = threading.Event()
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        """
+        Records a value in a histogram.
+        :param name: Histogram name from METRICS.
+        :param labels: Label values, in the order of the METRICS label names.
+        """
+        with self.__lock:
+            histogram = self.__series[name].get(labels)
+            if histogram is None:
+                histogram = self.__series[name][labels] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, labels: tuple = ()):
+        """Adds to a counter from METRICS."""
+        with self.__lock:
+            series = self.__series[name]
+            series[labels] = series.get(labels, 0) + amount
+
+    def call(self, layer: str, operation: str, function, *args, **kwargs):
+        """
+        Calls function and records its latency, errors and the number of rows it returned.
+        Generators are timed across their whole iteration, excluding the consumer's time.
+        """
+        labels = (layer, operation)
+        started = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException:
+            self.observe("tasks_operation_seconds", time.perf_counter() - started, labels)
+            self.increment("tasks_operation_errors_total", 1, labels)
+            raise
+        elapsed = time.perf_counter() - started
+        if isinstance(result, types.GeneratorType):
+            return self.__iterate(labels, result, elapsed)
+        self.observe("tasks_operation_seconds", elapsed, labels)
+        rows = _row_count(result)
+        if rows:
+            self.increment("tasks_rows_total", rows, labels)
+        return result
+
+    def __iterate(self, labels, iterator, elapsed):
+        rows = 0
+        failed = False
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                except BaseException:
+                    failed = True
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - started
+                rows += 1
+                yield item
+        finally:
+            iterator.close()
+            self.observe("tasks_operation_seconds", elapsed, labels)
+            if failed:
+                self.increment("tasks_operation_errors_total", 1, labels)
+            if rows:
+                self.increment("tasks_rows_total", rows, labels)
+
+    def observe_statement(self, sql: str, params, seconds: float, rows: int = None, many: bool = False):
+        """
+        Records one executed SQL statement and logs it when it was slow.
+        :param params: Parameters as passed to execute, or the parameter rows of executemany.
+        :param rows: Row count reported by the driver, None or negative when unknown.
+        :param many: Whether the statement ran through executemany.
+        """
+        keyword = (sql.split(None, 1) or ("",))[0].upper()
+        labels = (keyword,)
+        self.observe("tasks_sql_seconds", seconds, labels)
+        if rows is not None and rows > 0:
+            self.increment("tasks_sql_rows_total", rows, labels)
+        if self.__slow_query_seconds is not None and seconds >= self.__slow_query_seconds:
+            self.increment("tasks_slow_queries_total")
+            entry = {"time": datetime.now().isoformat(timespec="milliseconds"), "seconds": round(seconds, 6),
+                     "sql": " ".join(sql.split())}
+            if many:
+                params = list(params) if not isinstance(params, (list, tuple)) else params
+                entry["rows"] = len(params)
+                entry["params"] = params[:1]
+            else:
+                entry["params"] = params
+            self.__log_slow_query(json.dumps(entry, default=str))
+
+    def observe_pool_wait(self, seconds: float):
+        """Records the time a checkout waited for a pooled connection, see ConnectionPool."""
+        self.observe("tasks_pool_wait_seconds", seconds)
+
+    def __log_slow_query(self, line: str):
+        with self.__lock:
+            if self.__slow_query_stream is None:
+                self.__slow_query_stream = (open(self.__slow_query_log, "a", encoding="utf-8")
+                                            if self.__slow_query_log else sys.stderr)
+            self.__slow_query_stream.write(line + "\n")
+            self.__slow_query_stream.flush()
+
+    def wrap_connection(self, connection):
+        """Returns connection with every statement it executes recorded, see InstrumentedConnection."""
+        return InstrumentedConnection(connection, self)
+
+    def instrument(self, target, layer: str):
+        """
+        Returns a proxy of target whose public methods are timed under the given layer label,
+        e.g. instrument(task_service, "service").
+        """
+        return InstrumentedProxy(target, self, layer)
+
+    def snapshot(self):
+        """
+        Returns the current values of every metric.
+        :return: Dictionary with uptime_seconds and, per metric, a list of series with their labels.
+                 Histogram series carry count, sum, mean, p50/p95/p99 estimates and bucket counts.
+        """
+        with self.__lock:
+            series = {name: {labels: value.copy() if isinstance(value, Histogram) else value
+                             for labels, value in values.items()}
+                      for name, values in self.__series.items()}
+        result = {"generated_at": datetime.now().isoformat(timespec="seconds"),
+                  "uptime_seconds": round(time.time() - self.__started_at, 3), "metrics": {}}
+        for name, (kind, label_names, _) in METRICS.items():
+            entries = []
+            for labels, value in sorted(series[name].items()):
+                entry = {"labels": dict(zip(label_names, labels))}
+                if kind == "histogram":
+                    entry.update(count=value.count, sum=round(value.sum, 6), mean=round(value.sum / value.count, 6),
+                                 **{name: _json_number(value.quantile(q)) for name, q in QUANTILES},
+                                 buckets=dict(zip([str(bound) for bound in value.bounds] + ["+Inf"], value.counts)))
+                else:
+                    entry["value"] = value
+                entries.append(entry)
+            result["metrics"][name] = entries
+        return result
+
+    def to_json(self):
+        """Renders snapshot() as a JSON document."""
+        return json.dumps(self.snapshot(), indent=2, default=str)
+
+    def to_prometheus(self):
+        """Renders the metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, entries in self.snapshot()["metrics"].items():
+            kind, _, help_text = METRICS[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for entry in entries:
+                labels = entry["labels"]
+                if kind == "histogram":
+                    cumulative = 0
+                    for bound, count in entry["buckets"].items():
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels, le=bound)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {entry['sum']}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {entry['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {entry['value']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str = None, fmt: str = "json"):
+        """
+        Writes the metrics to a file, replacing it atomically so readers never see a partial dump.
+        :param path: Target file, None for stderr.
+        :param fmt: "json" or "prometheus".
+        """
+        if fmt not in METRICS_FORMATS:
+            raise ValueError(f"Unsupported metrics format '{fmt}'. Choose from {', '.join(METRICS_FORMATS)}.")
+        text = self.to_prometheus() if fmt == "prometheus" else self.to_json() + "\n"
+        if path is None:
+            sys.stderr.write(text)
+            return
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temporary, path)
+
+    def start_reporter(self, interval: float, path: str = None, fmt: str = "json"):
+        """Dumps the metrics every interval seconds from a daemon thread until stop_reporter()."""
+        def report():
+            while not self.__stop.wait(interval):
+                try:
+                    self.dump(path, fmt)
+                except OSError as e:
+                    print(f"Metrics dump failed: {e}", file=sys.stderr)
+
+        self.__reporter = threading.Thread(target=report, name="metrics-reporter", daemon=True)
+        self.__reporter.start()
+
+    def stop_reporter(self):
+        self.__stop.set()
+        if self.__reporter is not None:
+            self.__reporter.join()
+            self.__reporter = None
+
+class InstrumentedCursor:
+    """DB-API cursor proxy timing execute and executemany."""
+
+    def __init__(self, cursor, metrics: Metrics):
+        self.__cursor = cursor
+        self.__metrics = metrics
+
+    def execute(self, sql, params=None):
+        started = time.perf_counter()
+        result = self.__cursor.execute(sql, params)
+        self.__metrics.observe_statement(sql, params, time.perf_counter() - started,
+                                         result if isinstance(result, int) else self.__cursor.rowcount)
+        return result
+
+    def executemany(self, sql, params):
+        params = list(params)
+        started = time.perf_counter()
+        result = self.__cursor.executemany(sql, params)
+        self.__metrics.observe_statement(sql, params, time.perf_counter() - started,
+                                         result if isinstance(result, int) else self.__cursor.rowcount, many=True)
+        return result
+
+    def __iter__(self):
+        return iter(self.__cursor)
+
+    def __enter__(self):
+        self.__cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.__cursor.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self.__cursor, name)
+
+class InstrumentedConnection:
+    """
+    DB-API connection proxy recording every statement run through its cursors, or through
+    the execute/executemany shortcuts of sqlite3 connections. Everything else is forwarded.
+    """
+
+    def __init__(self, connection, metrics: Metrics):
+        self.__connection = connection
+        self.__metrics = metrics
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self.__connection.cursor(*args, **kwargs), self.__metrics)
+
+    def execute(self, sql, params=()):
+        started = time.perf_counter()
+        cursor = self.__connection.execute(sql, params)
+        self.__metrics.observe_statement(sql, params, time.perf_counter() - started, cursor.rowcount)
+        return cursor
+
+    def executemany(self, sql, params):
+        params = list(params)
+        started = time.perf_counter()
+        cursor = self.__connection.executemany(sql, params)
+        self.__metrics.observe_statement(sql, params, time.perf_counter() - started, cursor.rowcount, many=True)
+        return cursor
+
+    def __enter__(self):
+        self.__connection.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.__connection.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self.__connection, name)
+
+class InstrumentedProxy:
+    """Proxy timing every public method of the wrapped object through Metrics.call."""
+
+    def __init__(self, target, metrics: Metrics, layer: str):
+        self.__target = target
+        self.__metrics = metrics
+        self.__layer = layer
+
+    def __getattr__(self, name):
+        attribute = getattr(self.__target, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+        metrics, layer = self.__metrics, self.__layer
+
+        def timed(*args, **kwargs):
+            return metrics.call(layer, name, attribute, *args, **kwargs)
+
+        # Cached on the proxy, so __getattr__ only runs on the first call of each method.
+        self.__dict__[name] = timed
+        return timed
+
+def _row_count(result):
+    """Tasks returned by a call, or rows written by a bulk call (counts and add_tasks/import reports)."""
+    if isinstance(result, bool) or result is None:
+        return 0
+    if isinstance(result, int):
+        return result
+    if isinstance(result, dict):
+        return result.get("imported", 0)
+    if isinstance(result, (list, tuple)):
+        if result and isinstance(result[0], dict):
+            return sum(report.get("inserted") or 0 for report in result)
+        return len(result)
+    return 1 if hasattr(result, "task_id") else 0
+
+def _json_number(value):
+    return "+Inf" if value == float("inf") else value
+
+def _format_labels(labels: dict, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+def create_metrics(settings: dict):
+    """
+    Builds the metrics registry described by db_config.get_metrics_settings, and arranges
+    for it to be dumped every interval seconds and when the process exits.
+    :return: Metrics instance, or None when metrics are disabled.
+    """
+    if not settings or not settings.get("enabled"):
+        return None
+    if settings["fmt"] not in METRICS_FORMATS:
+        raise ValueError(f"Unsupported metrics format '{settings['fmt']}'. Choose from {', '.join(METRICS_FORMATS)}.")
+    slow_query_ms = settings.get("slow_query_ms")
+    metrics = Metrics(slow_query_ms / 1000 if slow_query_ms and slow_query_ms > 0 else None,
+                      settings.get("slow_query_log"))
+    if settings.get("interval"):
+        metrics.start_reporter(settings["interval"], settings.get("output"), settings["fmt"])
+
+    def dump_on_exit():
+        metrics.stop_reporter()
+        try:
+            metrics.dump(settings.get("output"), settings["fmt"])
+        except OSError as e:
+            print(f"Metrics dump failed: {e}", file=sys.stderr)
+
+    atexit.register(dump_on_exit)
+    return metrics
@@ -0,0 +1,94 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from abc import ABC, abstractmethod
+from models.task import Task
+
+class IAsyncTaskRepository(ABC):
+    """
+    Asyncio counterpart of ITaskRepository. Every method is a coroutine, iter_tasks is an async generator.
+    """
+    @abstractmethod
+    async def add_task(self, task: Task):
+        """
+        Adds a new task to the repository and assigns its task_id.
+        :param task: Task object to be added.
+        """
+        pass
+
+    @abstractmethod
+    async def add_tasks(self, tasks, chunk_size: int = 1000):
+        """
+        Adds many tasks at once, inserting them in chunks with one transaction per chunk.
+        :param tasks: Iterable of Task objects to be added.
+        :param chunk_size: Number of tasks inserted per statement batch.
+        :return: List of per-chunk reports (chunk, count, inserted, error).
+        """
+        pass
+
+    @abstractmethod
+    async def get_task(self, task_id: int):
+        """
+        Retrieves a task by its ID.
+        :param task_id: Unique identifier of the task.
+        :return: Task object if found, otherwise None.
+        """
+        pass
+
+    @abstractmethod
+    async def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        """
+        Lists tasks with optional filtering, ordered by task_id and paginated by keyset.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param after_id: task_id of the last task of the previous page, None for the first page.
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :return: List of Task objects.
+        """
+        pass
+
+    @abstractmethod
+    def iter_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        """
+        Streams tasks with optional filtering, ordered by task_id.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param chunk_size: Number of rows fetched from the database at a time.
+        :return: Async generator of Task objects.
+        """
+        pass
+
+    @abstractmethod
+    async def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str):
+        """
+        Updates the details of an existing task.
+        :param task_id: Unique identifier of the task.
+        :param title: New title of the task.
+        :param description: New description of the task.
+        :param due_date: New due date of the task.
+        :param priority: New priority level of the task.
+        """
+        pass
+
+    @abstractmethod
+    async def update_task_status(self, task_id: int, new_status: str):
+        """
+        Updates the status of a task.
+        :param task_id: Unique identifier of the task.
+        :param new_status: New status (Pending, In Progress, Completed).
+        """
+        pass
+
+    @abstractmethod
+    async def delete_task(self, task_id: int):
+        """
+        Deletes a task from the repository.
+        :param task_id: Unique identifier of the task to be deleted.
+        """
+        pass
+
+    async def close(self):
+        """
+        Releases connections or other resources held by the repository.
+        """
+        pass
@@ -0,0 +1,88 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from abc import ABC, abstractmethod
+
+class IAsyncTaskService(ABC):
+    """
+    Asyncio counterpart of ITaskService.
+    """
+
+    @abstractmethod
+    async def create_task(self, title: str, description: str, due_date: str, priority: str):
+        """
+        Creates a new task and saves it to the repository.
+        :param title: The title of the task.
+        :param description: The description of the task.
+        :param due_date: The due date of the task in YYYY-MM-DD format.
+        :param priority: The priority level of the task (Low, Medium, High).
+        """
+        pass
+
+    @abstractmethod
+    async def get_task(self, task_id: str):
+        """
+        Retrieves a task by its ID.
+        :param task_id: Unique identifier of the task.
+        :return: Task object if found, otherwise None.
+        """
+        pass
+
+    @abstractmethod
+    async def get_tasks(self, task_ids):
+        """
+        Retrieves many tasks concurrently.
+        :param task_ids: Iterable of task IDs.
+        :return: List of Task objects (or None for missing ids) in the order of task_ids.
+        """
+        pass
+
+    @abstractmethod
+    async def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        """
+        Lists tasks with optional filtering by status, priority, or due date, one page at a time.
+        :param filter_by: Dictionary containing filter conditions.
+        :param after_id: task_id of the last task of the previous page, None for the first page.
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :return: List of Task objects.
+        """
+        pass
+
+    @abstractmethod
+    def iter_tasks(self, filter_by: dict = None):
+        """
+        Streams all matching tasks without loading them into memory at once.
+        :param filter_by: Dictionary containing filter conditions.
+        :return: Async generator of Task objects.
+        """
+        pass
+
+    @abstractmethod
+    async def update_task_details(self, task_id: str, title: str, description: str, due_date: str, priority: str):
+        """
+        Updates the details of an existing task.
+        :param task_id: Unique identifier of the task.
+        :param title: New title of the task.
+        :param description: New description of the task.
+        :param due_date: New due date of the task.
+        :param priority: New priority level of the task.
+        """
+        pass
+
+    @abstractmethod
+    async def mark_task_completed(self, task_id: str):
+        """
+        Marks a task as completed.
+        :param task_id: Unique identifier of the task.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_task(self, task_id: str):
+        """
+        Deletes a task from the repository.
+        :param task_id: Unique identifier of the task to be deleted.
+        """
+        pass
@@ -9,6 +9,8 @@ from models.task import Task
 class ITaskRepository(ABC):
     """
     Interface for task repository, defining methods for CRUD operations.
+    Failures are raised as repositories.errors.RepositoryError subclasses: NotFoundError,
+    ConflictError, and TransientError once retrying did not help.
     """
     @abstractmethod
     def add_task(self, task: Task):
@@ -18,6 +20,16 @@ class ITaskRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def add_tasks(self, tasks, chunk_size: int = 1000):
+        """
+        Adds many tasks at once, inserting them in chunks with one transaction per chunk.
+        :param tasks: Iterable of Task objects to be added.
+        :param chunk_size: Number of tasks inserted per statement batch.
+        :return: List of per-chunk reports (chunk, count, inserted, error).
+        """
+        pass
+
     @abstractmethod
     def get_task(self, task_id: int):
         """
@@ -28,16 +40,91 @@ class ITaskRepository(ABC):
         pass
 
     @abstractmethod
-    def list_tasks(self, filter_by: dict = None):
+    def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
         """
-        Lists tasks with optional filtering.
+        Lists tasks with optional filtering, ordered by task_id and paginated by keyset.
         :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param after_id: task_id of the last task of the previous page, None for the first page.
+        :param limit: Maximum number of tasks returned, None for no limit.
         :return: List of Task objects.
         """
         pass
 
     @abstractmethod
-    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str):
+    def query_tasks(self, query):
+        """
+        Lists the tasks selected by a query spec: ranges, IN lists, ordering, paging and projection.
+        :param query: TaskQuery instance.
+        :return: List of Task objects, with only the query's columns loaded.
+        """
+        pass
+
+    @abstractmethod
+    def search_tasks(self, text: str, filter_by: dict = None, limit: int = None):
+        """
+        Full-text search over title and description, most relevant first.
+        :param text: Search words, a task matches if it contains any of them.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :return: List of Task objects ordered by relevance, then task_id.
+        """
+        pass
+
+    @abstractmethod
+    def get_stats(self, today=None):
+        """
+        Counts tasks by status and priority and buckets the open ones by due date, on the server.
+        :param today: Reference date for overdue and the due buckets, defaults to date.today().
+        :return: Dictionary as built by task_stats.build_stats.
+        """
+        pass
+
+    @abstractmethod
+    def next_tasks(self, k: int = 10, filter_by: dict = None):
+        """
+        Returns what to work on next: the top k open (Pending and In Progress) tasks, highest
+        priority first, then by earliest due date, then by task_id.
+        :param k: Maximum number of tasks returned.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date); a status
+                          filter may also select Completed tasks.
+        :return: List of Task objects in that order.
+        """
+        pass
+
+    @abstractmethod
+    def iter_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        """
+        Streams tasks with optional filtering, ordered by task_id, without materializing them all.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param chunk_size: Number of rows fetched from the database at a time.
+        :return: Generator of Task objects.
+        """
+        pass
+
+    @abstractmethod
+    def export_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        """
+        Streams tasks out of the repository in task_id order.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param chunk_size: Number of rows fetched from the database at a time.
+        :return: Generator of Task objects.
+        """
+        pass
+
+    @abstractmethod
+    def changes_since(self, cursor: int = 0, limit: int = 1000):
+        """
+        Reads the append-only log of task mutations. Every add, update, status change and delete
+        (bulk ones included) is logged in the same transaction as the write itself.
+        :param cursor: change_id of the last change already processed, 0 to start from the beginning.
+        :param limit: Maximum number of changes returned.
+        :return: List of TaskChange objects ordered by change_id.
+        """
+        pass
+
+    @abstractmethod
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
         """
         Updates the details of an existing task.
         :param task_id: Unique identifier of the task.
@@ -45,6 +132,22 @@ class ITaskRepository(ABC):
         :param description: New description of the task.
         :param due_date: New due date of the task.
         :param priority: New priority level of the task.
+        :param expected_version: Only update the task if it still has this version.
+        :raises NotFoundError: If the task does not exist.
+        :raises VersionConflictError: If the task no longer has expected_version.
+        """
+        pass
+
+    @abstractmethod
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        """
+        Writes only the given detail fields of a task. Every write increments the task's version;
+        with expected_version the update only applies to that version (optimistic concurrency).
+        :param task_id: Unique identifier of the task.
+        :param changes: Mapping of field (title, description, due_date, priority) to new value.
+        :param expected_version: Version the change was based on, None to update unconditionally.
+        :raises NotFoundError: If the task does not exist.
+        :raises VersionConflictError: If the task no longer has expected_version.
         """
         pass
 
@@ -54,6 +157,7 @@ class ITaskRepository(ABC):
         Updates the status of a task.
         :param task_id: Unique identifier of the task.
         :param new_status: New status (Pending, In Progress, Completed).
+        :raises NotFoundError: If the task does not exist.
         """
         pass
 
@@ -62,5 +166,137 @@ class ITaskRepository(ABC):
         """
         Deletes a task from the repository.
         :param task_id: Unique identifier of the task to be deleted.
+        :raises NotFoundError: If the task does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
         """
-        pass
\ No newline at end of file
+        Sets the status of many tasks in one transaction.
+        :param new_status: New status (Pending, In Progress, Completed).
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary with filter conditions, an empty dictionary targets every task.
+        :param chunk_size: Maximum number of ids per IN (...) statement.
+        :return: Number of affected tasks.
+        """
+        pass
+
+    @abstractmethod
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        """
+        Applies the same detail changes to many tasks in one transaction.
+        :param changes: Mapping of field (title, description, due_date, priority) to new value.
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary with filter conditions, an empty dictionary targets every task.
+        :param chunk_size: Maximum number of ids per IN (...) statement.
+        :return: Number of affected tasks.
+        """
+        pass
+
+    @abstractmethod
+    def delete_bulk(self, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        """
+        Deletes many tasks in one transaction.
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary with filter conditions, an empty dictionary targets every task.
+        :param chunk_size: Maximum number of ids per IN (...) statement.
+        :return: Number of deleted tasks.
+        """
+        pass
+
+    @abstractmethod
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        """
+        Atomically claims up to n Pending tasks for a worker: they are set In Progress and
+        recorded as held by worker_id until the lease expires. Concurrent callers never get
+        the same task, and a caller skips tasks another one is claiming instead of waiting.
+        :param worker_id: Identifier of the claiming worker.
+        :param n: Maximum number of tasks claimed.
+        :param priority_order: Claim by priority (High first) then due date, otherwise by due date alone.
+        :param lease_seconds: Seconds until the claim expires unless renewed.
+        :return: List of the claimed Task objects, in claim order.
+        """
+        pass
+
+    @abstractmethod
+    def renew_claims(self, worker_id: str, task_ids=None, lease_seconds: float = 300.0):
+        """
+        Heartbeat of a worker: extends the leases of the claims it still holds.
+        :param worker_id: Identifier of the worker.
+        :param task_ids: Iterable of task ids to renew, None for every claim of the worker.
+        :param lease_seconds: Seconds from now until the claims expire.
+        :return: Sorted list of the renewed task ids; a missing id was reaped or released.
+        """
+        pass
+
+    @abstractmethod
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        """
+        Ends claims held by a worker, setting the status of their tasks.
+        :param worker_id: Identifier of the worker.
+        :param task_ids: Iterable of task ids.
+        :param status: New status of the released tasks, Completed or Pending to hand them back.
+        :return: Sorted list of the released task ids; ids the worker no longer held are left alone.
+        """
+        pass
+
+    @abstractmethod
+    def reap_expired_claims(self, limit: int = 1000):
+        """
+        Removes up to limit claims whose lease expired and puts their tasks, if still
+        In Progress, back to Pending so another worker can claim them.
+        :param limit: Maximum number of claims removed.
+        :return: Sorted list of the task ids whose claims were removed.
+        """
+        pass
+
+    @abstractmethod
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        """
+        Moves up to limit Completed tasks due before a date from tasks to tasks_archive, oldest
+        due date first, in one short transaction. Archived tasks leave every other method
+        (listings, search, stats, the change log records a delete) except the archive reads.
+        :param completed_before: date or YYYY-MM-DD, only Completed tasks due before it are moved.
+        :param limit: Maximum number of tasks moved.
+        :return: Sorted list of the archived task ids.
+        """
+        pass
+
+    @abstractmethod
+    def get_archived_task(self, task_id: int):
+        """
+        Retrieves an archived task by its ID.
+        :param task_id: Unique identifier of the task.
+        :return: Task object if it is archived, otherwise None.
+        """
+        pass
+
+    @abstractmethod
+    def list_archived_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        """
+        Lists archived tasks like list_tasks: optional filtering, task_id order, keyset pages.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param after_id: task_id of the last task of the previous page, None for the first page.
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :return: List of Task objects.
+        """
+        pass
+
+    @abstractmethod
+    def transaction(self):
+        """
+        Groups the operations of a with block into one unit of work: their changes are
+        committed together when the block ends and rolled back if it raises. A nested block
+        is a savepoint, so its failure only undoes its own changes. The unit of work belongs
+        to the calling thread; every other method works unchanged inside it.
+        :return: Context manager.
+        """
+        pass
+
+    def close(self):
+        """
+        Releases connections or other resources held by the repository.
+        Backends without such resources keep this default no-op.
+        """
+        pass
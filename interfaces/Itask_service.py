@@ -8,6 +8,7 @@ from abc import ABC, abstractmethod
 class ITaskService(ABC):
     """
     Interface for task service, defining methods for managing tasks.
+    Storage failures surface as repositories.errors.RepositoryError subclasses.
     """
     
     @abstractmethod
@@ -22,25 +23,102 @@ class ITaskService(ABC):
         pass
 
     @abstractmethod
-    def get_task(self, task_id: str):
+    def import_tasks(self, source, fmt: str = None, chunk_size: int = 1000):
+        """
+        Imports many tasks at once.
+        :param source: Iterable of Task objects, or a text stream when fmt is given.
+        :param fmt: None for an iterable of tasks, otherwise "csv" or "jsonl".
+        :param chunk_size: Number of tasks inserted per transaction.
+        :return: Dictionary summarizing imported, failed and invalid rows.
+        """
+        pass
+
+    @abstractmethod
+    def export_tasks(self, filter_by: dict = None, fmt: str = None, chunk_size: int = 1000):
+        """
+        Streams tasks out of the repository.
+        :param filter_by: Dictionary containing filter conditions.
+        :param fmt: None to yield Task objects, otherwise "csv" or "jsonl" to yield text lines.
+        :param chunk_size: Number of rows fetched from the database at a time.
+        :return: Generator of Task objects or formatted lines.
+        """
+        pass
+
+    @abstractmethod
+    def changes_since(self, cursor: int = 0, limit: int = 1000):
+        """
+        Returns the task changes made after a cursor, in order, for incremental sync.
+        :param cursor: change_id of the last change already processed, 0 for the whole log.
+        :param limit: Maximum number of changes returned.
+        :return: List of TaskChange objects.
+        """
+        pass
+
+    @abstractmethod
+    def get_task(self, task_id: str, history: bool = False):
         """
         Retrieves a task by its ID.
         :param task_id: Unique identifier of the task.
+        :param history: Also look in the archive of old Completed tasks.
         :return: Task object if found, otherwise None.
         """
         pass
 
     @abstractmethod
-    def list_tasks(self, filter_by: dict = None):
+    def list_tasks(self, query=None, after_id: int = None, limit: int = None, history: bool = False):
         """
-        Lists all tasks with optional filtering by status, priority, or due date.
-        :param filter_by: Dictionary containing filter conditions.
+        Lists tasks with optional filtering, ordering and projection, one page at a time.
+        :param query: TaskQuery, or a dictionary containing filter conditions (status, priority, due date).
+        :param after_id: task_id of the last task of the previous page, None for the first page.
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :param history: Include archived tasks; only with a filter dictionary.
         :return: List of Task objects.
         """
         pass
 
     @abstractmethod
-    def update_task_details(self, task_id: str, title: str, description: str, due_date: str, priority: str):
+    def search_tasks(self, text: str, filter_by: dict = None, limit: int = 50):
+        """
+        Finds tasks by keyword in their title or description, most relevant first.
+        :param text: Search words.
+        :param filter_by: Dictionary containing filter conditions (status, priority, due date).
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :return: List of Task objects ordered by relevance.
+        """
+        pass
+
+    @abstractmethod
+    def get_stats(self):
+        """
+        Returns the dashboard statistics: counts by status and priority, the overdue count
+        and a histogram of the open tasks by due date.
+        :return: Dictionary of statistics.
+        """
+        pass
+
+    @abstractmethod
+    def next_tasks(self, k: int = 10, filter_by: dict = None):
+        """
+        Lists what to work on next: the open tasks by priority (High first), then due date.
+        :param k: Maximum number of tasks returned.
+        :param filter_by: Dictionary containing filter conditions (status, priority, due date).
+        :return: List of Task objects.
+        """
+        pass
+
+    @abstractmethod
+    def iter_tasks(self, filter_by: dict = None, history: bool = False):
+        """
+        Streams all matching tasks without loading them into memory at once.
+        :param filter_by: Dictionary containing filter conditions.
+        :param history: Include archived tasks.
+        :return: Generator of Task objects.
+        """
+        pass
+
+    @abstractmethod
+    def update_task_details(self, task_id: str, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
         """
         Updates the details of an existing task.
         :param task_id: Unique identifier of the task.
@@ -48,6 +126,21 @@ class ITaskService(ABC):
         :param description: New description of the task.
         :param due_date: New due date of the task.
         :param priority: New priority level of the task.
+        :param expected_version: Only update the task if it still has this version.
+        :raises NotFoundError: If the task does not exist.
+        :raises VersionConflictError: If the task no longer has expected_version.
+        """
+        pass
+
+    @abstractmethod
+    def update_task_fields(self, task_id: str, changes: dict, expected_version: int = None):
+        """
+        Updates only the given details of a task, optionally only if it still has the version it was read with.
+        :param task_id: Unique identifier of the task.
+        :param changes: Mapping of field (title, description, due_date, priority) to new value.
+        :param expected_version: Version of the task the changes are based on.
+        :raises NotFoundError: If the task does not exist.
+        :raises VersionConflictError: If someone else changed the task since.
         """
         pass
 
@@ -56,6 +149,7 @@ class ITaskService(ABC):
         """
         Marks a task as completed.
         :param task_id: Unique identifier of the task.
+        :raises NotFoundError: If the task does not exist.
         """
         pass
 
@@ -64,5 +158,100 @@ class ITaskService(ABC):
         """
         Deletes a task from the repository.
         :param task_id: Unique identifier of the task to be deleted.
+        :raises NotFoundError: If the task does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None):
+        """
+        Sets the status of many tasks at once.
+        :param new_status: New status (Pending, In Progress, Completed).
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary containing filter conditions.
+        :return: Number of affected tasks.
+        """
+        pass
+
+    @abstractmethod
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None):
+        """
+        Applies the same detail changes to many tasks at once.
+        :param changes: Mapping of field (title, description, due_date, priority) to new value.
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary containing filter conditions.
+        :return: Number of affected tasks.
+        """
+        pass
+
+    @abstractmethod
+    def delete_bulk(self, task_ids=None, filter_by: dict = None):
+        """
+        Deletes many tasks at once.
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary containing filter conditions.
+        :return: Number of deleted tasks.
+        """
+        pass
+
+    @abstractmethod
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        """
+        Atomically claims up to n Pending tasks for a worker, most urgent first, with a lease.
+        :param worker_id: Identifier of the claiming worker.
+        :param n: Maximum number of tasks claimed.
+        :param priority_order: Order by priority then due date, otherwise by due date alone.
+        :param lease_seconds: Seconds until the claims expire unless renewed.
+        :return: List of the claimed Task objects.
         """
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def renew_claims(self, worker_id: str, task_ids=None, lease_seconds: float = 300.0):
+        """
+        Extends the leases of the claims a worker still holds.
+        :param worker_id: Identifier of the worker.
+        :param task_ids: Iterable of task ids, None for every claim of the worker.
+        :param lease_seconds: Seconds from now until the claims expire.
+        :return: Sorted list of the renewed task ids.
+        """
+        pass
+
+    @abstractmethod
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        """
+        Ends a worker's claims and sets the status of their tasks.
+        :param worker_id: Identifier of the worker.
+        :param task_ids: Iterable of task ids.
+        :param status: Completed, or Pending to hand the tasks back.
+        :return: Sorted list of the released task ids.
+        """
+        pass
+
+    @abstractmethod
+    def reap_expired_claims(self, limit: int = 1000):
+        """
+        Puts the tasks of expired claims back to Pending.
+        :param limit: Maximum number of claims removed.
+        :return: Sorted list of the task ids whose claims were removed.
+        """
+        pass
+
+    @abstractmethod
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        """
+        Moves one batch of Completed tasks due before a date to the archive.
+        :param completed_before: date or YYYY-MM-DD.
+        :param limit: Maximum number of tasks moved.
+        :return: Sorted list of the archived task ids.
+        """
+        pass
+
+    @abstractmethod
+    def transaction(self):
+        """
+        Runs the operations of a with block as one unit of work, committed at the end of the
+        block and rolled back if it raises. Nested blocks are savepoints.
+        :return: Context manager.
+        """
+        pass
@@ -1,13 +1,32 @@
-from db_config import get_db_connection
-from repositories.task_manager import TaskManager
-from services.task_service import TaskService
-from cli.cli import main_menu
+import sys
 
-def main():
-    connection = get_db_connection()
-    task_repository = TaskManager(connection)
-    task_service = TaskService(task_repository)
-    main_menu(task_service)
+def main(argv=None):
+    """
+    Runs a single command when arguments are given (see cli/commands.py), otherwise the
+    interactive menu. Imports are deferred so scripted runs only load what they use.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from cli.commands import run
+        return run(argv)
+
+    from db_config import (get_database_url, get_cache_settings, get_summary_settings, get_next_index_settings,
+                           get_metrics_settings)
+    from instrumentation import create_metrics
+    from repositories.factory import create_repository
+    from services.task_service import TaskService
+    from cli.cli import main_menu
+
+    metrics = create_metrics(get_metrics_settings())
+    task_repository = create_repository(get_database_url(), metrics)
+    try:
+        task_service = TaskService(task_repository, get_cache_settings(), get_summary_settings(), get_next_index_settings())
+        if metrics is not None:
+            task_service = metrics.instrument(task_service, "service")
+        main_menu(task_service)
+    finally:
+        task_repository.close()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
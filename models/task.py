@@ -5,16 +5,74 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from datetime import datetime
 
+# Column order expected by Task.from_tuple, also used for explicit SELECT lists.
+TASK_COLUMNS = ("task_id", "title", "description", "due_date", "priority", "status", "creation_timestamp", "version")
+
 class Task:
+    __slots__ = ("_task_id", "_title", "_description", "_due_date", "_priority", "_status", "_creation_timestamp", "_version")
+
     def __init__(self, title: str, description: str, due_date: str, priority: str,
-                 status: str = "Pending", task_id: int = None, creation_timestamp: datetime = None):
+                 status: str = "Pending", task_id: int = None, creation_timestamp: datetime = None,
+                 version: int = None):
+        """
+        Creates a task from user input. due_date is validated by parsing it as YYYY-MM-DD,
+        an already parsed date is accepted as is. Rows loaded from the database should
+        use from_row or from_tuple, which skip parsing. version stays None until the
+        task is stored; every write to the stored task increments it.
+        """
         self._task_id = task_id
         self._title = title
         self._description = description
-        self._due_date = datetime.strptime(due_date, "%Y-%m-%d")
+        self._due_date = datetime.strptime(due_date, "%Y-%m-%d").date() if isinstance(due_date, str) else due_date
         self._priority = priority
         self._status = status
         self._creation_timestamp = creation_timestamp if creation_timestamp else datetime.now()
+        self._version = version
+
+    @classmethod
+    def from_row(cls, row: dict):
+        """
+        Builds a task from a database row mapping holding native date/datetime values.
+        :param row: Mapping keyed by the names in TASK_COLUMNS.
+        :return: Task object.
+        """
+        task = cls.__new__(cls)
+        task._task_id = row["task_id"]
+        task._title = row["title"]
+        task._description = row["description"]
+        task._due_date = row["due_date"]
+        task._priority = row["priority"]
+        task._status = row["status"]
+        task._creation_timestamp = row["creation_timestamp"]
+        task._version = row["version"]
+        return task
+
+    @classmethod
+    def from_tuple(cls, values):
+        """
+        Builds a task from a database row tuple in TASK_COLUMNS order.
+        :param values: Sequence of (task_id, title, description, due_date, priority, status, creation_timestamp, version).
+        :return: Task object.
+        """
+        task = cls.__new__(cls)
+        (task._task_id, task._title, task._description, task._due_date,
+         task._priority, task._status, task._creation_timestamp, task._version) = values[:8]
+        return task
+
+    @classmethod
+    def from_columns(cls, columns, values):
+        """
+        Builds a partially loaded task from a projected row. Fields outside columns are None.
+        :param columns: Names from TASK_COLUMNS, in the order of values.
+        :param values: Sequence of column values.
+        :return: Task object.
+        """
+        task = cls.__new__(cls)
+        for slot in cls.__slots__:
+            setattr(task, slot, None)
+        for column, value in zip(columns, values):
+            setattr(task, "_" + column, value)
+        return task
 
     @property
     def task_id(self):
@@ -42,4 +100,8 @@ class Task:
 
     @property
     def creation_timestamp(self):
-        return self._creation_timestamp
\ No newline at end of file
+        return self._creation_timestamp
+
+    @property
+    def version(self):
+        return self._version
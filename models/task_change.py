@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.task import Task, TASK_COLUMNS
+
+CHANGE_OPERATIONS = ("insert", "update", "delete")
+
+# Column order expected by TaskChange.from_tuple: the change itself, then the task snapshot.
+CHANGE_COLUMNS = ("change_id", "operation", "changed_at") + TASK_COLUMNS
+
+class TaskChange:
+    """
+    One entry of the append-only change log: a task was inserted, updated or deleted.
+    task is the state of the task after the change, or its last state for a delete, so a
+    mirror can apply the change without reading the tasks table. change_id increases in
+    the order the changes were written and is the cursor of TaskService.changes_since.
+    """
+
+    __slots__ = ("_change_id", "_operation", "_changed_at", "_task")
+
+    def __init__(self, change_id: int, operation: str, changed_at, task: Task):
+        self._change_id = change_id
+        self._operation = operation
+        self._changed_at = changed_at
+        self._task = task
+
+    @classmethod
+    def from_tuple(cls, values):
+        """
+        Builds a change from a database row tuple in CHANGE_COLUMNS order.
+        :param values: Sequence of (change_id, operation, changed_at, *TASK_COLUMNS).
+        :return: TaskChange object.
+        """
+        return cls(values[0], values[1], values[2], Task.from_tuple(values[3:]))
+
+    @property
+    def change_id(self):
+        return self._change_id
+
+    @property
+    def operation(self):
+        return self._operation
+
+    @property
+    def changed_at(self):
+        return self._changed_at
+
+    @property
+    def task_id(self):
+        return self._task.task_id
+
+    @property
+    def task(self):
+        return self._task
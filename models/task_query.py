@@ -0,0 +1,167 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import date
+from models.task import TASK_COLUMNS
+
+PRIORITY_RANKS = {"Low": 1, "Medium": 2, "High": 3}
+STATUS_RANKS = {"Pending": 1, "In Progress": 2, "Completed": 3}
+SORTABLE_FIELDS = ("task_id", "title", "due_date", "priority", "status", "creation_timestamp")
+
+# Every column except the description TEXT, for listings that do not show it.
+SUMMARY_COLUMNS = tuple(column for column in TASK_COLUMNS if column != "description")
+
+def _as_tuple(value, allowed, name):
+    if value is None:
+        return None
+    values = (value,) if isinstance(value, str) else tuple(value)
+    unknown = [item for item in values if item not in allowed]
+    if unknown:
+        raise ValueError(f"Invalid {name} '{unknown[0]}'")
+    return values
+
+def _as_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+class TaskQuery:
+    """
+    Backend-independent description of a task listing: filters, ordering, paging and projection.
+    SQL backends compile it with query_builder.build_query, the in-memory backend answers it
+    from its indexes. Instances are immutable, use replace() to derive a variant.
+    """
+
+    __slots__ = ("status", "priority", "due_date", "due_from", "due_to", "overdue", "text",
+                 "order_by", "limit", "offset", "after_id", "columns")
+
+    def __init__(self, status=None, priority=None, due_date=None, due_from=None, due_to=None,
+                 overdue: bool = False, text: str = None, order_by=None, limit: int = None,
+                 offset: int = 0, after_id: int = None, columns=None):
+        """
+        :param status: A status or an iterable of statuses (IN list).
+        :param priority: A priority or an iterable of priorities (IN list).
+        :param due_date: Exact due date, YYYY-MM-DD or date.
+        :param due_from: Earliest due date, inclusive.
+        :param due_to: Latest due date, inclusive.
+        :param overdue: Only tasks past their due date that are not completed.
+        :param text: Case-insensitive substring of the title or description.
+        :param order_by: Iterable of field names, prefixed with "-" for descending. task_id is
+                         always appended as tiebreak so the order is stable across pages.
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :param offset: Number of matching tasks skipped.
+        :param after_id: Keyset cursor, only valid when ordering by task_id alone.
+        :param columns: Fields to load, None for all. task_id is always loaded; fields left out
+                        (typically description) are None on the returned tasks.
+        """
+        set_ = object.__setattr__
+        set_(self, "status", _as_tuple(status, STATUS_RANKS, "status"))
+        set_(self, "priority", _as_tuple(priority, PRIORITY_RANKS, "priority"))
+        set_(self, "due_date", _as_date(due_date))
+        set_(self, "due_from", _as_date(due_from))
+        set_(self, "due_to", _as_date(due_to))
+        set_(self, "overdue", bool(overdue))
+        set_(self, "text", text or None)
+
+        order = []
+        for field in order_by or ():
+            descending = field.startswith("-")
+            name = field.lstrip("+-")
+            if name not in SORTABLE_FIELDS:
+                raise ValueError(f"Cannot sort by '{name}'. Choose from {', '.join(SORTABLE_FIELDS)}.")
+            if name not in (existing for existing, _ in order):
+                order.append((name, descending))
+        if "task_id" not in (name for name, _ in order):
+            order.append(("task_id", False))
+        set_(self, "order_by", tuple(order))
+
+        if limit is not None and limit < 0:
+            raise ValueError("limit must not be negative")
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        if after_id is not None and self.order_by != (("task_id", False),):
+            raise ValueError("after_id requires ordering by task_id, use offset for other orders")
+        set_(self, "limit", limit)
+        set_(self, "offset", offset)
+        set_(self, "after_id", after_id)
+
+        if columns is None:
+            columns = TASK_COLUMNS
+        unknown = [column for column in columns if column not in TASK_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown column '{unknown[0]}'")
+        set_(self, "columns", tuple(column for column in TASK_COLUMNS if column == "task_id" or column in columns))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TaskQuery is immutable, use replace()")
+
+    @classmethod
+    def from_filter(cls, filter_by: dict = None, after_id: int = None, limit: int = None):
+        """
+        Builds the query equivalent to a legacy list_tasks(filter_by, after_id, limit) call.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :return: TaskQuery instance.
+        """
+        filter_by = filter_by or {}
+        return cls(status=filter_by.get("status") or None, priority=filter_by.get("priority") or None,
+                   due_date=filter_by.get("due_date") or None, after_id=after_id, limit=limit)
+
+    def replace(self, **changes):
+        """Returns a copy with the given constructor arguments changed."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values["order_by"] = [("-" if descending else "") + name for name, descending in self.order_by]
+        values.update(changes)
+        return TaskQuery(**values)
+
+    @property
+    def ordered_by_id(self):
+        """Whether the result is in plain task_id order, which keyset pagination relies on."""
+        return self.order_by == (("task_id", False),)
+
+    def matches(self, task, today: date = None):
+        """
+        Evaluates the filters against a task, for backends that filter in Python.
+        :param task: Task object with every filtered field loaded.
+        :param today: Reference date for overdue, defaults to date.today().
+        :return: True if the task satisfies every condition.
+        """
+        if self.status and task.status not in self.status:
+            return False
+        if self.priority and task.priority not in self.priority:
+            return False
+        if self.due_date is not None and task.due_date != self.due_date:
+            return False
+        if self.due_from is not None and task.due_date < self.due_from:
+            return False
+        if self.due_to is not None and task.due_date > self.due_to:
+            return False
+        if self.overdue and (task.status == "Completed" or task.due_date >= (today or date.today())):
+            return False
+        if self.text:
+            needle = self.text.casefold()
+            if needle not in (task.title or "").casefold() and needle not in (task.description or "").casefold():
+                return False
+        if self.after_id is not None and task.task_id <= self.after_id:
+            return False
+        return True
+
+    def sort_key(self, field: str):
+        """Returns a function mapping a task to its sortable value for field, ranking enums by severity."""
+        if field == "priority":
+            return lambda task: PRIORITY_RANKS[task.priority]
+        if field == "status":
+            return lambda task: STATUS_RANKS[task.status]
+        return lambda task: getattr(task, field)
+
+    def __eq__(self, other):
+        return isinstance(other, TaskQuery) and all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__
+                           if getattr(self, name) not in (None, False, 0, ()))
+        return f"TaskQuery({fields})"
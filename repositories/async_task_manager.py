@@ -0,0 +1,236 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from contextlib import asynccontextmanager
+from itertools import islice
+import aiomysql
+from models.task import Task
+from interfaces.Iasync_task_repository import IAsyncTaskRepository
+from repositories.errors import RepositoryError, NotFoundError
+from repositories.retry import RetryPolicy
+from repositories.query_builder import SELECT_TASKS, build_filter_clause
+from repositories.task_manager import translate_mysql_error
+
+INSERT_TASK = """INSERT INTO tasks (title, description, due_date, priority, status, creation_timestamp)
+                 VALUES (%s, %s, %s, %s, %s, %s)"""
+
+class AsyncTaskManager(IAsyncTaskRepository):
+    """
+    MySQL implementation of IAsyncTaskRepository on top of an aiomysql pool.
+    Concurrent calls are pipelined over the pooled connections, a semaphore bounds how
+    many statements are in flight. A connection whose operation is cancelled mid-query
+    is closed instead of returned to the pool, because its protocol state is unknown.
+    Errors are raised as RepositoryError subclasses, as by TaskManager: aiomysql raises the
+    pymysql exceptions, so translate_mysql_error and RetryPolicy apply unchanged.
+    """
+
+    def __init__(self, pool, max_concurrency: int = None, retry_policy: RetryPolicy = None):
+        """
+        :param pool: aiomysql pool created with autocommit=True.
+        :param max_concurrency: Maximum number of operations in flight, defaults to the pool's maxsize.
+        :param retry_policy: Retry policy for transient errors, defaults to RetryPolicy().
+        """
+        self.__pool = pool
+        self.__semaphore = asyncio.Semaphore(max_concurrency or pool.maxsize)
+        self.__retry = retry_policy or RetryPolicy()
+
+    @classmethod
+    async def create(cls, settings: dict, max_size: int = 10, max_concurrency: int = None, pool_recycle: float = 300):
+        """
+        Opens an aiomysql pool for the given settings. Their client_flag (CLIENT.FOUND_ROWS) is kept,
+        so an UPDATE that re-applies a value is not mistaken for a missing task.
+        :param settings: Connection settings as returned by db_config.get_db_settings.
+        :param max_size: Maximum number of pooled connections.
+        :param max_concurrency: Maximum number of operations in flight.
+        :param pool_recycle: Seconds after which an idle connection is replaced.
+        :return: AsyncTaskManager instance.
+        """
+        pool = await aiomysql.create_pool(host=settings["host"], port=settings["port"], user=settings["user"],
+                                          password=settings["password"], db=settings["database"],
+                                          minsize=1, maxsize=max_size, autocommit=True, pool_recycle=pool_recycle,
+                                          client_flag=settings.get("client_flag", 0))
+        return cls(pool, max_concurrency)
+
+    async def close(self):
+        """Closes the pool once every borrowed connection has been returned."""
+        self.__pool.close()
+        await self.__pool.wait_closed()
+
+    @asynccontextmanager
+    async def __connection(self):
+        async with self.__semaphore:
+            connection = await self.__pool.acquire()
+            try:
+                yield connection
+            except asyncio.CancelledError:
+                connection.close()
+                raise
+            finally:
+                await asyncio.shield(self.__pool.release(connection))
+
+    @staticmethod
+    async def __finish(statement):
+        """
+        Awaits a COMMIT or ROLLBACK to completion even if the caller is cancelled meanwhile, so the
+        connection is never closed with it in flight and its outcome is known; the cancellation
+        is re-raised once the statement has finished.
+        """
+        task = asyncio.ensure_future(statement)
+        cancelled = False
+        while not task.done():
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if task.cancelled():
+                    raise
+                cancelled = True
+        task.result()
+        if cancelled:
+            raise asyncio.CancelledError()
+
+    @asynccontextmanager
+    async def __transaction(self):
+        """
+        Runs the block in a transaction. A cancellation arriving during COMMIT or ROLLBACK waits
+        for it to finish before propagating, so the transaction is never left half finished;
+        a cancellation inside the block closes the connection, which rolls back server side.
+        """
+        async with self.__connection() as connection:
+            await connection.begin()
+            try:
+                yield connection
+            except asyncio.CancelledError:
+                raise
+            except BaseException:
+                await self.__finish(connection.rollback())
+                raise
+            await self.__finish(connection.commit())
+
+    async def __run(self, work, idempotent: bool = True, transaction: bool = False, cursor_class=None):
+        """
+        Awaits work(cursor, uncertain) on a pooled connection under the retry policy, sleeping
+        between attempts without blocking the event loop. Errors are translated like TaskManager's.
+        :param idempotent: Whether the work may be repeated after an attempt with an unknown outcome.
+        :param transaction: Run the work inside BEGIN/COMMIT.
+        :param cursor_class: aiomysql cursor class, None for the connection default.
+        """
+        attempt = 1
+        uncertain = False
+        while True:
+            try:
+                if transaction:
+                    async with self.__transaction() as connection, connection.cursor(cursor_class) as cursor:
+                        return await work(cursor, uncertain)
+                async with self.__connection() as connection, connection.cursor(cursor_class) as cursor:
+                    return await work(cursor, uncertain)
+            except Exception as e:
+                seconds, applied = self.__retry.next_attempt(e, translate_mysql_error, attempt, idempotent)
+                uncertain = applied or uncertain
+                await asyncio.sleep(seconds)
+                attempt += 1
+
+    async def add_task(self, task: Task):
+        """Inserts a task and assigns its new task_id, retried only after errors that guarantee it was not applied."""
+        async def insert(cursor, uncertain):
+            await cursor.execute(INSERT_TASK, (task.title, task.description, task.due_date, task.priority, task.status, task.creation_timestamp))
+            task._task_id = cursor.lastrowid
+            task._version = 1
+
+        await self.__run(insert, idempotent=False)
+
+    async def add_tasks(self, tasks, chunk_size: int = 1000):
+        reports = []
+        iterator = iter(tasks)
+        chunk_number = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            chunk_number += 1
+            report = {"chunk": chunk_number, "count": len(chunk), "inserted": 0, "error": None}
+            rows = [(task.title, task.description, task.due_date, task.priority, task.status, task.creation_timestamp) for task in chunk]
+
+            async def insert(cursor, uncertain):
+                await cursor.executemany(INSERT_TASK, rows)
+
+            try:
+                await self.__run(insert, idempotent=False, transaction=True)
+                report["inserted"] = len(chunk)
+            except RepositoryError as e:
+                report["error"] = str(e)
+            reports.append(report)
+        return reports
+
+    async def get_task(self, task_id: int):
+        async def select(cursor, uncertain):
+            await cursor.execute(SELECT_TASKS + " WHERE task_id = %s", (task_id,))
+            row = await cursor.fetchone()
+            return Task.from_tuple(row) if row else None
+
+        return await self.__run(select)
+
+    async def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        where, values = build_filter_clause(filter_by, after_id)
+        sql = SELECT_TASKS + where + " ORDER BY task_id"
+        if limit is not None:
+            sql += " LIMIT %s"
+            values.append(limit)
+
+        async def select(cursor, uncertain):
+            await cursor.execute(sql, tuple(values))
+            return [Task.from_tuple(row) for row in await cursor.fetchall()]
+
+        return await self.__run(select)
+
+    async def iter_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        """
+        Streams tasks in task_id order through an unbuffered SSCursor. A transient error
+        mid-stream resumes after the last task yielded, like TaskManager.iter_tasks.
+        """
+        last_id = None
+        attempt = 1
+        while True:
+            where, values = build_filter_clause(filter_by, last_id)
+            resumed_from = last_id
+            try:
+                async with self.__connection() as connection, connection.cursor(aiomysql.SSCursor) as cursor:
+                    await cursor.execute(SELECT_TASKS + where + " ORDER BY task_id", tuple(values))
+                    while True:
+                        rows = await cursor.fetchmany(chunk_size)
+                        if not rows:
+                            return
+                        for row in rows:
+                            task = Task.from_tuple(row)
+                            last_id = task.task_id
+                            yield task
+            except Exception as e:
+                attempt = 1 if last_id != resumed_from else attempt
+                seconds, _ = self.__retry.next_attempt(e, translate_mysql_error, attempt)
+                await asyncio.sleep(seconds)
+                attempt += 1
+
+    async def __write_task(self, task_id: int, sql: str, values: tuple):
+        """Runs a single-task write, raising NotFoundError when no row matched."""
+        async def write(cursor, uncertain):
+            # A repeated DELETE finds nothing if the lost attempt was applied after all.
+            if await cursor.execute(sql, values) or uncertain:
+                return
+            raise NotFoundError(f"Task {task_id} not found")
+
+        await self.__run(write)
+
+    async def update_task_status(self, task_id: int, new_status: str):
+        await self.__write_task(task_id, "UPDATE tasks SET status = %s, version = version + 1 WHERE task_id = %s",
+                                (new_status, task_id))
+
+    async def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str):
+        await self.__write_task(task_id,
+                                "UPDATE tasks SET title = %s, description = %s, due_date = %s, priority = %s, version = version + 1"
+                                " WHERE task_id = %s",
+                                (title, description, due_date, priority, task_id))
+
+    async def delete_task(self, task_id: int):
+        await self.__write_task(task_id, "DELETE FROM tasks WHERE task_id = %s", (task_id,))
@@ -0,0 +1,347 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from models.task import Task
+from interfaces.Itask_repository import ITaskRepository
+from repositories.task_repository_decorator import TaskRepositoryDecorator
+
+FILTER_KEYS = ("status", "priority", "due_date")
+
+def normalize_filter(filter_by: dict = None):
+    """
+    Turns a filter_by dictionary into a hashable, order-independent cache key.
+    Unknown keys and empty values are dropped, exactly like TaskManager ignores them.
+    :param filter_by: Dictionary with filter conditions (status, priority, due date).
+    :return: Sorted tuple of (key, value) pairs.
+    """
+    if not filter_by:
+        return ()
+    return tuple(sorted((key, str(value)) for key, value in filter_by.items() if key in FILTER_KEYS and value))
+
+def _task_values(task_id: int, status: str, priority: str, due_date):
+    due_date = due_date if isinstance(due_date, str) else due_date.strftime("%Y-%m-%d")
+    return {"task_id": task_id, "status": status, "priority": priority, "due_date": due_date}
+
+class LRUCache:
+    """
+    Size-bounded least-recently-used cache whose entries also expire after a TTL.
+    Not thread-safe on its own, CachedTaskRepository serializes access.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        :param max_size: Maximum number of entries kept.
+        :param ttl: Seconds an entry stays valid, 0 or None for no expiry.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.__entries = OrderedDict()
+
+    def get(self, key):
+        """Returns (True, value) on a hit and (False, None) on a miss."""
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.__entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return False, None
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def peek(self, key):
+        """Returns a live value without touching recency or counters, or None."""
+        entry = self.__entries.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+            return None
+        return entry[0]
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self.__entries[key] = (value, expires_at)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key):
+        if self.__entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def items(self):
+        return list(self.__entries.items())
+
+    def clear(self):
+        self.invalidations += len(self.__entries)
+        self.__entries.clear()
+
+    def stats(self):
+        return {
+            "size": len(self.__entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+class CachedTaskRepository(TaskRepositoryDecorator):
+    """
+    Read-through cache in front of another ITaskRepository.
+    get_task results are kept in an LRU+TTL cache keyed by task_id, list_tasks pages in a
+    second one keyed by the normalized filter, after_id and limit. Writes go straight to the
+    wrapped repository and then drop only the entries they can affect.
+    The cache is per process, other writers to the same database are only picked up after the TTL.
+    Inside a transaction the thread reads past the cache, which is cleared when the
+    transaction ends, so uncommitted or rolled back rows are never served from it.
+    """
+
+    def __init__(self, task_repository: ITaskRepository, max_tasks: int = 10000,
+                 max_queries: int = 1000, ttl: float = 30.0):
+        """
+        :param task_repository: The repository being wrapped.
+        :param max_tasks: Maximum number of tasks cached by id.
+        :param max_queries: Maximum number of list_tasks results cached.
+        :param ttl: Seconds a cached entry stays valid.
+        """
+        super().__init__(task_repository)
+        self.__tasks = LRUCache(max_tasks, ttl)
+        self.__queries = LRUCache(max_queries, ttl)
+        self.__lock = threading.RLock()
+        self.__generation = 0
+        self.__local = threading.local()
+
+    @contextmanager
+    def transaction(self):
+        self.__local.depth = getattr(self.__local, "depth", 0) + 1
+        try:
+            with self._inner.transaction():
+                yield
+        finally:
+            self.__local.depth -= 1
+            if not self.__local.depth:
+                self.clear_cache()
+
+    def __in_transaction(self):
+        return getattr(self.__local, "depth", 0) > 0
+
+    def get_task(self, task_id: int):
+        key = int(task_id)
+        if self.__in_transaction():
+            return self._inner.get_task(key)
+        with self.__lock:
+            hit, task = self.__tasks.get(key)
+            generation = self.__generation
+        if hit:
+            return task
+        task = self._inner.get_task(key)
+        if task is not None:
+            with self.__lock:
+                if generation == self.__generation:
+                    self.__tasks.put(key, task)
+        return task
+
+    def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        if self.__in_transaction():
+            return self._inner.list_tasks(filter_by, after_id, limit)
+        key = (normalize_filter(filter_by), after_id, limit)
+        with self.__lock:
+            hit, entry = self.__queries.get(key)
+            generation = self.__generation
+        if hit:
+            return list(entry[0])
+        tasks = self._inner.list_tasks(filter_by, after_id, limit)
+        with self.__lock:
+            if generation == self.__generation:
+                self.__queries.put(key, (tuple(tasks), frozenset(task.task_id for task in tasks)))
+        return tasks
+
+    def add_task(self, task: Task):
+        result = self._inner.add_task(task)
+        if task.task_id is not None:
+            after = _task_values(task.task_id, task.status, task.priority, task.due_date)
+            self.__invalidate(after["task_id"], after)
+        return result
+
+    def add_tasks(self, tasks, chunk_size: int = 1000):
+        try:
+            return self._inner.add_tasks(tasks, chunk_size)
+        finally:
+            with self.__lock:
+                self.__generation += 1
+                self.__queries.clear()
+
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
+        task_id = int(task_id)
+        before = self.__current_values(task_id)
+        try:
+            return self._inner.update_task_details(task_id, title, description, due_date, priority, expected_version)
+        finally:
+            after = _task_values(task_id, before["status"], priority, due_date) if before else None
+            self.__invalidate(task_id, after)
+
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        task_id = int(task_id)
+        before = self.__current_values(task_id)
+        try:
+            return self._inner.update_task_fields(task_id, changes, expected_version)
+        finally:
+            after = None
+            if before:
+                after = _task_values(task_id, before["status"], changes.get("priority", before["priority"]),
+                                     changes.get("due_date", before["due_date"]))
+            self.__invalidate(task_id, after)
+
+    def update_task_status(self, task_id: int, new_status: str):
+        task_id = int(task_id)
+        before = self.__current_values(task_id)
+        try:
+            return self._inner.update_task_status(task_id, new_status)
+        finally:
+            after = _task_values(task_id, new_status, before["priority"], before["due_date"]) if before else None
+            self.__invalidate(task_id, after)
+
+    def delete_task(self, task_id: int):
+        task_id = int(task_id)
+        try:
+            return self._inner.delete_task(task_id)
+        finally:
+            self.__invalidate(task_id, None)
+
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        task_ids = list(task_ids) if task_ids is not None else None
+        try:
+            return self._inner.update_status_bulk(new_status, task_ids, filter_by, chunk_size)
+        finally:
+            self.__invalidate_bulk(task_ids)
+
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        task_ids = list(task_ids) if task_ids is not None else None
+        try:
+            return self._inner.update_details_bulk(changes, task_ids, filter_by, chunk_size)
+        finally:
+            self.__invalidate_bulk(task_ids)
+
+    def delete_bulk(self, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        task_ids = list(task_ids) if task_ids is not None else None
+        try:
+            return self._inner.delete_bulk(task_ids, filter_by, chunk_size)
+        finally:
+            self.__invalidate_bulk(task_ids)
+
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        claimed = None
+        try:
+            claimed = self._inner.claim_tasks(worker_id, n, priority_order, lease_seconds)
+            return claimed
+        finally:
+            self.__invalidate_claims(None if claimed is None else [task.task_id for task in claimed])
+
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        task_ids = list(task_ids)
+        released = None
+        try:
+            released = self._inner.release_claims(worker_id, task_ids, status)
+            return released
+        finally:
+            self.__invalidate_claims(task_ids if released is None else released)
+
+    def reap_expired_claims(self, limit: int = 1000):
+        reaped = None
+        try:
+            reaped = self._inner.reap_expired_claims(limit)
+            return reaped
+        finally:
+            self.__invalidate_claims(reaped)
+
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        archived = None
+        try:
+            archived = self._inner.archive_tasks(completed_before, limit)
+            return archived
+        finally:
+            self.__invalidate_claims(archived)
+
+    def cache_stats(self):
+        """
+        Returns hit/miss/eviction counters for both caches.
+        :return: Dictionary with "tasks" and "queries" statistics.
+        """
+        with self.__lock:
+            return {"tasks": self.__tasks.stats(), "queries": self.__queries.stats()}
+
+    def clear_cache(self):
+        """Drops every cached entry."""
+        with self.__lock:
+            self.__generation += 1
+            self.__tasks.clear()
+            self.__queries.clear()
+
+    def __current_values(self, task_id: int):
+        task = None
+        if not self.__in_transaction():
+            with self.__lock:
+                task = self.__tasks.peek(task_id)
+        if task is None:
+            task = self._inner.get_task(task_id)
+        if task is None:
+            return None
+        return _task_values(task_id, task.status, task.priority, task.due_date)
+
+    def __invalidate_bulk(self, task_ids):
+        """
+        Drops the cached tasks touched by a set-based write and every cached page.
+        Writes by filter do not say which tasks they hit, so the task cache is cleared too.
+        """
+        with self.__lock:
+            self.__generation += 1
+            self.__queries.clear()
+            if task_ids is None:
+                self.__tasks.clear()
+            else:
+                for task_id in task_ids:
+                    self.__tasks.pop(int(task_id))
+
+    def __invalidate_claims(self, task_ids):
+        """Drops what a claim or archive write changed: the given tasks, or everything when the write failed without saying."""
+        if task_ids != []:
+            self.__invalidate_bulk(task_ids)
+
+    def __invalidate(self, task_id: int, after: dict):
+        """
+        Drops the cached task and every cached page that contained it or would contain it now.
+        Pages are ordered by task_id, so a matching task only lands on a page whose id range covers it.
+        """
+        with self.__lock:
+            self.__generation += 1
+            self.__tasks.pop(task_id)
+            for key, (value, _) in self.__queries.items():
+                filter_key, after_id, limit = key
+                tasks, task_ids = value
+                if task_id in task_ids:
+                    self.__queries.pop(key)
+                    continue
+                if after is None or any(after[name] != expected for name, expected in filter_key):
+                    continue
+                if after_id is not None and task_id <= after_id:
+                    continue
+                if limit is not None and len(tasks) >= limit and (not tasks or task_id > tasks[-1].task_id):
+                    continue
+                self.__queries.pop(key)
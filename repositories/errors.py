@@ -0,0 +1,33 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+class RepositoryError(Exception):
+    """A storage operation failed. Base class of the errors raised by every ITaskRepository."""
+
+class NotFoundError(RepositoryError):
+    """The task targeted by an update or delete does not exist."""
+
+class ConflictError(RepositoryError):
+    """The write violates a constraint of the stored data, retrying it unchanged fails again."""
+
+class VersionConflictError(ConflictError):
+    """
+    A conditional update expected another version of the task: someone else changed it since
+    it was read. Read the task again and reapply the change to the new version.
+    """
+
+    def __init__(self, task_id: int, expected_version: int, current_version: int):
+        super().__init__(f"Task {task_id} was changed by someone else "
+                         f"(expected version {expected_version}, current version {current_version})")
+        self.task_id = task_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+class TransientError(RepositoryError):
+    """
+    The database was temporarily unable to complete the operation (deadlock, lock wait timeout,
+    lost connection, pool exhausted). Raised once the retry policy gave up; the same call may
+    succeed later.
+    """
@@ -0,0 +1,106 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.task import Task
+from interfaces.Itask_repository import ITaskRepository
+from repositories.task_repository_decorator import TaskRepositoryDecorator
+
+class InstrumentedTaskRepository(TaskRepositoryDecorator):
+    """
+    Records the latency, errors and returned rows of every call to the wrapped repository
+    in a Metrics registry (see instrumentation.py). repositories.factory puts it directly
+    around the backend when metrics are enabled, so caches and summaries above it show up
+    as calls that never reach it.
+    """
+
+    def __init__(self, task_repository: ITaskRepository, metrics, layer: str = "repository"):
+        """
+        :param task_repository: The repository being wrapped.
+        :param metrics: instrumentation.Metrics registry.
+        :param layer: Value of the layer label of the recorded metrics.
+        """
+        super().__init__(task_repository)
+        self.__metrics = metrics
+        self.__layer = layer
+
+    def __call(self, operation: str, function, *args):
+        return self.__metrics.call(self.__layer, operation, function, *args)
+
+    def add_task(self, task: Task):
+        return self.__call("add_task", self._inner.add_task, task)
+
+    def add_tasks(self, tasks, chunk_size: int = 1000):
+        return self.__call("add_tasks", self._inner.add_tasks, tasks, chunk_size)
+
+    def get_task(self, task_id: int):
+        return self.__call("get_task", self._inner.get_task, task_id)
+
+    def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        return self.__call("list_tasks", self._inner.list_tasks, filter_by, after_id, limit)
+
+    def query_tasks(self, query):
+        return self.__call("query_tasks", self._inner.query_tasks, query)
+
+    def search_tasks(self, text: str, filter_by: dict = None, limit: int = None):
+        return self.__call("search_tasks", self._inner.search_tasks, text, filter_by, limit)
+
+    def get_stats(self, today=None):
+        return self.__call("get_stats", self._inner.get_stats, today)
+
+    def next_tasks(self, k: int = 10, filter_by: dict = None):
+        return self.__call("next_tasks", self._inner.next_tasks, k, filter_by)
+
+    def iter_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__call("iter_tasks", self._inner.iter_tasks, filter_by, chunk_size)
+
+    def export_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__call("export_tasks", self._inner.export_tasks, filter_by, chunk_size)
+
+    def changes_since(self, cursor: int = 0, limit: int = 1000):
+        return self.__call("changes_since", self._inner.changes_since, cursor, limit)
+
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
+        return self.__call("update_task_details", self._inner.update_task_details,
+                           task_id, title, description, due_date, priority, expected_version)
+
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        return self.__call("update_task_fields", self._inner.update_task_fields, task_id, changes, expected_version)
+
+    def update_task_status(self, task_id: int, new_status: str):
+        return self.__call("update_task_status", self._inner.update_task_status, task_id, new_status)
+
+    def delete_task(self, task_id: int):
+        return self.__call("delete_task", self._inner.delete_task, task_id)
+
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__call("update_status_bulk", self._inner.update_status_bulk, new_status, task_ids, filter_by, chunk_size)
+
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__call("update_details_bulk", self._inner.update_details_bulk, changes, task_ids, filter_by, chunk_size)
+
+    def delete_bulk(self, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__call("delete_bulk", self._inner.delete_bulk, task_ids, filter_by, chunk_size)
+
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        return self.__call("claim_tasks", self._inner.claim_tasks, worker_id, n, priority_order, lease_seconds)
+
+    def renew_claims(self, worker_id: str, task_ids=None, lease_seconds: float = 300.0):
+        return self.__call("renew_claims", self._inner.renew_claims, worker_id, task_ids, lease_seconds)
+
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        return self.__call("release_claims", self._inner.release_claims, worker_id, task_ids, status)
+
+    def reap_expired_claims(self, limit: int = 1000):
+        return self.__call("reap_expired_claims", self._inner.reap_expired_claims, limit)
+
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        return self.__call("archive_tasks", self._inner.archive_tasks, completed_before, limit)
+
+    def get_archived_task(self, task_id: int):
+        return self.__call("get_archived_task", self._inner.get_archived_task, task_id)
+
+    def list_archived_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        return self.__call("list_archived_tasks", self._inner.list_archived_tasks, filter_by, after_id, limit)
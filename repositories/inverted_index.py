@@ -0,0 +1,90 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import math
+import re
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str):
+    """
+    Splits text into lowercase word tokens, the same way for indexed documents and queries.
+    :param text: Any text, None is treated as empty.
+    :return: List of tokens.
+    """
+    return TOKEN_PATTERN.findall(text.casefold()) if text else []
+
+class InvertedIndex:
+    """
+    In-process full-text index mapping each token to the documents containing it, with
+    BM25 relevance ranking. Documents are added, replaced and removed one at a time, so
+    the index follows every write instead of being rebuilt. Not thread-safe on its own,
+    the owning repository serializes access.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        :param k1: BM25 term frequency saturation.
+        :param b: BM25 document length normalization.
+        """
+        self.__k1 = k1
+        self.__b = b
+        self.__postings = {}
+        self.__lengths = {}
+        self.__tokens = {}
+        self.__total_length = 0
+
+    def __len__(self):
+        return len(self.__lengths)
+
+    def add(self, document_id: int, *texts):
+        """
+        Indexes a document, replacing any previous version of it.
+        :param document_id: Unique document key, e.g. the task_id.
+        :param texts: Text fields of the document, e.g. title and description.
+        """
+        self.remove(document_id)
+        counts = Counter(token for text in texts for token in tokenize(text))
+        for token, count in counts.items():
+            self.__postings.setdefault(token, {})[document_id] = count
+        length = sum(counts.values())
+        self.__lengths[document_id] = length
+        self.__tokens[document_id] = tuple(counts)
+        self.__total_length += length
+
+    def remove(self, document_id: int):
+        """Drops a document from the index, a no-op if it is not indexed."""
+        length = self.__lengths.pop(document_id, None)
+        if length is None:
+            return
+        self.__total_length -= length
+        for token in self.__tokens.pop(document_id):
+            documents = self.__postings[token]
+            del documents[document_id]
+            if not documents:
+                del self.__postings[token]
+
+    def scores(self, query: str):
+        """
+        Scores every document containing at least one query token (OR semantics).
+        :param query: Search text.
+        :return: Dictionary of document_id to BM25 score.
+        """
+        tokens = set(tokenize(query))
+        if not tokens or not self.__lengths:
+            return {}
+        document_count = len(self.__lengths)
+        average_length = self.__total_length / document_count or 1
+        scores = {}
+        for token in tokens:
+            documents = self.__postings.get(token)
+            if not documents:
+                continue
+            idf = math.log(1 + (document_count - len(documents) + 0.5) / (len(documents) + 0.5))
+            for document_id, count in documents.items():
+                norm = self.__k1 * (1 - self.__b + self.__b * self.__lengths[document_id] / average_length)
+                scores[document_id] = scores.get(document_id, 0.0) + idf * count * (self.__k1 + 1) / (count + norm)
+        return scores
@@ -0,0 +1,475 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+from heapq import merge, nsmallest
+from itertools import islice
+from models.task import Task
+from models.task_change import TaskChange
+from models.task_query import STATUS_RANKS
+from interfaces.Itask_repository import ITaskRepository
+from repositories.query_builder import build_set_clause, claim_query, next_queries
+from repositories.rank_index import RankIndex, top_ranked
+from repositories.inverted_index import InvertedIndex
+from repositories.task_stats import build_stats, due_bucket
+from repositories.errors import NotFoundError, VersionConflictError
+
+INDEXED_FIELDS = ("status", "priority", "due_date")
+
+def _index_value(field: str, value):
+    if field == "due_date" and isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+def _filter_conditions(filter_by: dict):
+    """
+    Returns the equality conditions of a filter dictionary on the indexed fields, or None when
+    a malformed due date matches no task, as it does when the SQL backends compare it.
+    """
+    conditions = {}
+    for field in INDEXED_FIELDS:
+        if filter_by and field in filter_by:
+            try:
+                conditions[field] = _index_value(field, filter_by[field])
+            except ValueError:
+                return None
+    return conditions
+
+def _composite_sort_key(query):
+    """
+    Folds a query's ordering into a single tuple key, so the top of a sorted page can be
+    selected with a heap. Returns None when a descending text column makes that impossible.
+    """
+    parts = []
+    for field, descending in query.order_by:
+        key = query.sort_key(field)
+        if not descending:
+            parts.append(key)
+        elif field in ("task_id", "priority", "status"):
+            parts.append(lambda task, key=key: -key(task))
+        elif field == "due_date":
+            parts.append(lambda task: -task.due_date.toordinal())
+        elif field == "creation_timestamp":
+            parts.append(lambda task: -task.creation_timestamp.timestamp())
+        else:
+            return None
+    return lambda task: tuple(part(task) for part in parts)
+
+class MemoryTaskRepository(ITaskRepository):
+    """
+    Pure in-memory implementation of ITaskRepository for tests and single-process use.
+    Tasks live in a dict keyed by task_id. Secondary indexes map each status, priority and
+    due_date value to a sorted list of task ids, so filtered, keyset-paginated listings
+    start from the smallest matching id list and bisect straight to the page. The distinct
+    due dates are also kept sorted, so due date ranges are answered by bisection.
+    Titles and descriptions feed an inverted index that is updated on every write,
+    which answers search_tasks with BM25 ranking. Every write is appended to a change log
+    read by changes_since. The open tasks are also kept in a RankIndex, which answers
+    next_tasks and priority ordered claims without sorting. Claims map task_id to
+    (worker_id, lease expiry). Archived tasks move to a dict of their own. Nothing is persisted.
+    A transaction holds the lock for the whole block and records the previous version of
+    every task it touches in an undo log, which restores them (and drops the changes
+    logged since, the claims made and the tasks archived) if a scope raises.
+    """
+
+    def __init__(self):
+        self.__tasks = {}
+        self.__ids = []
+        self.__indexes = {field: {} for field in INDEXED_FIELDS}
+        self.__due_dates = []
+        self.__text_index = InvertedIndex()
+        self.__rank_index = RankIndex()
+        self.__next_id = 1
+        self.__lock = threading.RLock()
+        self.__undo = []
+        self.__changes = []
+        self.__claims = {}
+        self.__archive = {}
+        self.__archive_ids = []
+
+    @contextmanager
+    def transaction(self):
+        with self.__lock:
+            self.__undo.append(({}, len(self.__changes), dict(self.__claims), []))
+            try:
+                yield
+            except BaseException:
+                previous_tasks, logged, claims, archived = self.__undo.pop()
+                for task_id in archived:
+                    del self.__archive[task_id]
+                    del self.__archive_ids[bisect_left(self.__archive_ids, task_id)]
+                self.__restore(previous_tasks)
+                del self.__changes[logged:]
+                self.__claims = claims
+                raise
+            previous_tasks, _, _, archived = self.__undo.pop()
+            if self.__undo:
+                for task_id, previous in previous_tasks.items():
+                    self.__undo[-1][0].setdefault(task_id, previous)
+                self.__undo[-1][3].extend(archived)
+
+    def __remember(self, task_id: int, previous):
+        """Records the version of a task before the open transaction scope first touched it, None if it did not exist."""
+        if self.__undo:
+            self.__undo[-1][0].setdefault(task_id, previous)
+
+    def __log(self, operation: str, task: Task):
+        self.__changes.append(TaskChange(len(self.__changes) + 1, operation, datetime.now(), task))
+
+    def __restore(self, changes: dict):
+        """Puts back the recorded versions of the tasks changed by a rolled back scope. Ids are not reused."""
+        for task_id, previous in changes.items():
+            current = self.__tasks.pop(task_id, None)
+            if current is not None:
+                self.__unindex(current)
+                self.__text_index.remove(task_id)
+                del self.__ids[bisect_left(self.__ids, task_id)]
+            if previous is not None:
+                self.__tasks[task_id] = previous
+                insort(self.__ids, task_id)
+                self.__index(previous)
+                self.__text_index.add(task_id, previous.title, previous.description)
+
+    def __index(self, task: Task):
+        if task.due_date not in self.__indexes["due_date"]:
+            insort(self.__due_dates, task.due_date)
+        for field in INDEXED_FIELDS:
+            insort(self.__indexes[field].setdefault(getattr(task, field), []), task.task_id)
+        self.__rank_index.add(task)
+
+    def __unindex(self, task: Task):
+        for field in INDEXED_FIELDS:
+            ids = self.__indexes[field][getattr(task, field)]
+            del ids[bisect_left(ids, task.task_id)]
+            if not ids:
+                del self.__indexes[field][getattr(task, field)]
+                if field == "due_date":
+                    del self.__due_dates[bisect_left(self.__due_dates, task.due_date)]
+        self.__rank_index.remove(task.task_id)
+
+    def __store(self, task: Task):
+        task._task_id = self.__next_id
+        task._version = 1
+        self.__next_id += 1
+        self.__remember(task.task_id, None)
+        self.__tasks[task.task_id] = task
+        self.__ids.append(task.task_id)
+        self.__index(task)
+        self.__text_index.add(task.task_id, task.title, task.description)
+        self.__log("insert", task)
+
+    def __replace(self, task_id: int, expected_version: int = None, **changes):
+        current = self.__tasks.get(task_id)
+        if current is None:
+            raise NotFoundError(f"Task {task_id} not found")
+        if expected_version is not None and current.version != expected_version:
+            raise VersionConflictError(task_id, expected_version, current.version)
+        self.__remember(task_id, current)
+        values = {
+            "task_id": task_id,
+            "title": current.title,
+            "description": current.description,
+            "due_date": current.due_date,
+            "priority": current.priority,
+            "status": current.status,
+            "creation_timestamp": current.creation_timestamp,
+            "version": current.version + 1,
+        }
+        values.update(changes)
+        self.__unindex(current)
+        task = Task.from_row(values)
+        self.__tasks[task_id] = task
+        self.__index(task)
+        if task.title != current.title or task.description != current.description:
+            self.__text_index.add(task_id, task.title, task.description)
+        self.__log("update", task)
+
+    def add_task(self, task: Task):
+        if task.creation_timestamp is None:
+            task._creation_timestamp = datetime.now()
+        with self.__lock:
+            self.__store(task)
+
+    def add_tasks(self, tasks, chunk_size: int = 1000):
+        reports = []
+        iterator = iter(tasks)
+        chunk_number = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            chunk_number += 1
+            with self.__lock:
+                for task in chunk:
+                    self.__store(task)
+            reports.append({"chunk": chunk_number, "count": len(chunk), "inserted": len(chunk), "error": None})
+        return reports
+
+    def get_task(self, task_id: int):
+        with self.__lock:
+            return self.__tasks.get(int(task_id))
+
+    def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        conditions = _filter_conditions(filter_by)
+        if conditions is None:
+            return []
+        result = []
+        with self.__lock:
+            candidates = [self.__indexes[field].get(value, []) for field, value in conditions.items()]
+            ids = min(candidates, key=len) if candidates else self.__ids
+            start = bisect_right(ids, after_id) if after_id is not None else 0
+            for position in range(start, len(ids)):
+                task = self.__tasks[ids[position]]
+                if all(getattr(task, field) == value for field, value in conditions.items()):
+                    result.append(task)
+                    if limit is not None and len(result) >= limit:
+                        break
+        return result
+
+    def __candidates(self, query):
+        """
+        Returns the smallest sorted id list the indexes can narrow the query down to.
+        IN lists and due date ranges merge the id lists of every selected value.
+        """
+        candidates = []
+        statuses = query.status
+        if query.overdue:
+            statuses = tuple(status for status in (statuses or STATUS_RANKS) if status != "Completed")
+        for field, selected in (("status", statuses), ("priority", query.priority)):
+            if selected is not None:
+                candidates.append([self.__indexes[field].get(value, []) for value in selected])
+        if query.due_date is not None:
+            candidates.append([self.__indexes["due_date"].get(query.due_date, [])])
+        elif query.due_from is not None or query.due_to is not None or query.overdue:
+            start = bisect_left(self.__due_dates, query.due_from) if query.due_from is not None else 0
+            if query.overdue:
+                end = bisect_left(self.__due_dates, date.today())
+                if query.due_to is not None:
+                    end = min(end, bisect_right(self.__due_dates, query.due_to))
+            else:
+                end = bisect_right(self.__due_dates, query.due_to) if query.due_to is not None else len(self.__due_dates)
+            candidates.append([self.__indexes["due_date"][value] for value in self.__due_dates[start:end]])
+        if not candidates:
+            return self.__ids
+        lists = min(candidates, key=lambda id_lists: sum(len(ids) for ids in id_lists))
+        return lists[0] if len(lists) == 1 else list(merge(*lists))
+
+    def query_tasks(self, query):
+        with self.__lock:
+            ids = self.__candidates(query)
+            start = bisect_right(ids, query.after_id) if query.after_id is not None else 0
+            stop = None
+            if query.ordered_by_id and query.limit is not None:
+                stop = query.offset + query.limit
+            matched = []
+            today = date.today()
+            for position in range(start, len(ids)):
+                task = self.__tasks[ids[position]]
+                if query.matches(task, today):
+                    matched.append(task)
+                    if stop is not None and len(matched) >= stop:
+                        break
+        composite_key = _composite_sort_key(query) if not query.ordered_by_id else None
+        if composite_key is not None and query.limit is not None:
+            matched = nsmallest(query.offset + query.limit, matched, key=composite_key)
+        else:
+            for field, descending in reversed(query.order_by):
+                if field != "task_id" or descending:
+                    matched.sort(key=query.sort_key(field), reverse=descending)
+        end = None if query.limit is None else query.offset + query.limit
+        values = [[getattr(task, column) for column in query.columns] for task in matched[query.offset:end]]
+        return [Task.from_columns(query.columns, row) for row in values]
+
+    def search_tasks(self, text: str, filter_by: dict = None, limit: int = None):
+        conditions = _filter_conditions(filter_by)
+        if conditions is None:
+            return []
+        with self.__lock:
+            ranked = [(-score, task_id) for task_id, score in self.__text_index.scores(text).items()
+                      if all(getattr(self.__tasks[task_id], field) == value for field, value in conditions.items())]
+            ranked = sorted(ranked) if limit is None else nsmallest(limit, ranked)
+            return [self.__tasks[task_id] for _, task_id in ranked]
+
+    def get_stats(self, today=None):
+        today = today or date.today()
+        with self.__lock:
+            grid = Counter((task.status, task.priority) for task in self.__tasks.values())
+            buckets = {}
+            for due_date in self.__due_dates:
+                open_count = sum(1 for task_id in self.__indexes["due_date"][due_date]
+                                 if self.__tasks[task_id].status != "Completed")
+                bucket = due_bucket(due_date, today)
+                buckets[bucket] = buckets.get(bucket, 0) + open_count
+        return build_stats(((status, priority, count) for (status, priority), count in grid.items()), buckets.items(), today)
+
+    def iter_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        after_id = None
+        while True:
+            page = self.list_tasks(filter_by, after_id, chunk_size)
+            yield from page
+            if len(page) < chunk_size:
+                return
+            after_id = page[-1].task_id
+
+    def next_tasks(self, k: int = 10, filter_by: dict = None):
+        filter_by = filter_by or {}
+        if filter_by.get("status") == "Completed":
+            return top_ranked([self.query_tasks(query.replace(limit=k)) for query in next_queries(filter_by)], k)
+        statuses = (filter_by["status"],) if filter_by.get("status") else None
+        with self.__lock:
+            return self.__rank_index.top(k, statuses, filter_by.get("priority") or None, filter_by.get("due_date") or None)
+
+    def changes_since(self, cursor: int = 0, limit: int = 1000):
+        with self.__lock:
+            # change_id n is stored at position n - 1.
+            return self.__changes[cursor:cursor + limit]
+
+    def export_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        return self.iter_tasks(filter_by, chunk_size)
+
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        claimed = []
+        with self.__lock:
+            expires = datetime.now() + timedelta(seconds=lease_seconds)
+            if priority_order:
+                candidates = self.__rank_index.top(n, ("Pending",))
+            else:
+                candidates = self.query_tasks(claim_query(False).replace(limit=n, columns=("task_id",)))
+            for task in candidates:
+                self.__replace(task.task_id, status="In Progress")
+                self.__claims[task.task_id] = (worker_id, expires)
+                claimed.append(self.__tasks[task.task_id])
+        return claimed
+
+    def renew_claims(self, worker_id: str, task_ids=None, lease_seconds: float = 300.0):
+        with self.__lock:
+            expires = datetime.now() + timedelta(seconds=lease_seconds)
+            targets = self.__claims if task_ids is None else {int(task_id) for task_id in task_ids}
+            renewed = sorted(task_id for task_id in targets if self.__claims.get(task_id, (None,))[0] == worker_id)
+            for task_id in renewed:
+                self.__claims[task_id] = (worker_id, expires)
+            return renewed
+
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        with self.__lock:
+            held = sorted(task_id for task_id in {int(task_id) for task_id in task_ids}
+                          if self.__claims.get(task_id, (None,))[0] == worker_id)
+            for task_id in held:
+                del self.__claims[task_id]
+                if task_id in self.__tasks:
+                    self.__replace(task_id, status=status)
+            return held
+
+    def reap_expired_claims(self, limit: int = 1000):
+        with self.__lock:
+            now = datetime.now()
+            expired = nsmallest(limit, ((expires, task_id) for task_id, (_, expires) in self.__claims.items() if expires < now))
+            for _, task_id in expired:
+                del self.__claims[task_id]
+                task = self.__tasks.get(task_id)
+                if task is not None and task.status == "In Progress":
+                    self.__replace(task_id, status="Pending")
+            return sorted(task_id for _, task_id in expired)
+
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        completed_before = _index_value("due_date", completed_before)
+        with self.__lock:
+            due_dates = self.__due_dates[:bisect_left(self.__due_dates, completed_before)]
+            candidates = (task_id for due_date in due_dates for task_id in self.__indexes["due_date"][due_date]
+                          if self.__tasks[task_id].status == "Completed")
+            archived = sorted(islice(candidates, limit))
+            for task_id in archived:
+                task = self.__tasks[task_id]
+                self.delete_task(task_id)
+                self.__archive[task_id] = task
+                insort(self.__archive_ids, task_id)
+                if self.__undo:
+                    self.__undo[-1][3].append(task_id)
+            return archived
+
+    def get_archived_task(self, task_id: int):
+        with self.__lock:
+            return self.__archive.get(int(task_id))
+
+    def list_archived_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        conditions = _filter_conditions(filter_by)
+        if conditions is None:
+            return []
+        result = []
+        with self.__lock:
+            start = bisect_right(self.__archive_ids, after_id) if after_id is not None else 0
+            for position in range(start, len(self.__archive_ids)):
+                task = self.__archive[self.__archive_ids[position]]
+                if all(getattr(task, field) == value for field, value in conditions.items()):
+                    result.append(task)
+                    if limit is not None and len(result) >= limit:
+                        break
+        return result
+
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
+        self.update_task_fields(task_id, {"title": title, "description": description, "due_date": due_date,
+                                          "priority": priority}, expected_version)
+
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        build_set_clause(changes)  # validates the field names
+        changes = dict(changes)
+        if "due_date" in changes:
+            changes["due_date"] = _index_value("due_date", changes["due_date"])
+        with self.__lock:
+            self.__replace(int(task_id), expected_version, **changes)
+
+    def update_task_status(self, task_id: int, new_status: str):
+        with self.__lock:
+            self.__replace(int(task_id), status=new_status)
+
+    def delete_task(self, task_id: int):
+        with self.__lock:
+            task = self.__tasks.pop(int(task_id), None)
+            if task is None:
+                raise NotFoundError(f"Task {task_id} not found")
+            # A claim never outlives its task, like ON DELETE CASCADE on the SQL backends.
+            self.__claims.pop(task.task_id, None)
+            self.__remember(task.task_id, task)
+            self.__unindex(task)
+            self.__text_index.remove(task.task_id)
+            del self.__ids[bisect_left(self.__ids, task.task_id)]
+            self.__log("delete", task)
+
+    def __targets(self, task_ids, filter_by: dict):
+        if (task_ids is None) == (filter_by is None):
+            raise ValueError("Pass either task_ids or filter_by")
+        if filter_by is not None:
+            return [task.task_id for task in self.list_tasks(filter_by)]
+        return [task_id for task_id in {int(task_id) for task_id in task_ids} if task_id in self.__tasks]
+
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        with self.__lock:
+            targets = self.__targets(task_ids, filter_by)
+            for task_id in targets:
+                self.__replace(task_id, status=new_status)
+            return len(targets)
+
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        build_set_clause(changes)  # validates the field names
+        changes = dict(changes)
+        if "due_date" in changes:
+            changes["due_date"] = _index_value("due_date", changes["due_date"])
+        with self.__lock:
+            targets = self.__targets(task_ids, filter_by)
+            for task_id in targets:
+                self.__replace(task_id, **changes)
+            return len(targets)
+
+    def delete_bulk(self, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        with self.__lock:
+            targets = self.__targets(task_ids, filter_by)
+            for task_id in targets:
+                self.delete_task(task_id)
+            return len(targets)
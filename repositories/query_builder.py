@@ -0,0 +1,247 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import date
+from models.task import TASK_COLUMNS
+from models.task_change import CHANGE_COLUMNS
+from models.task_query import TaskQuery
+
+SELECT_TASKS = "SELECT " + ", ".join(TASK_COLUMNS) + " FROM tasks"
+SELECT_CHANGES = "SELECT " + ", ".join(CHANGE_COLUMNS) + " FROM task_changes"
+
+# tasks_archive holds the Completed tasks moved out of tasks by archive_tasks, with the same
+# columns plus archived_at. Moving a task deletes it from tasks, so the change log records a delete.
+SELECT_ARCHIVED_TASKS = "SELECT " + ", ".join(TASK_COLUMNS) + " FROM tasks_archive"
+ARCHIVE_TASKS = "INSERT INTO tasks_archive (" + ", ".join(TASK_COLUMNS) + ") " + SELECT_TASKS
+
+def _log_change(operation: str, row: str):
+    return (f"INSERT INTO task_changes (operation, {', '.join(TASK_COLUMNS)}) "
+            f"VALUES ('{operation}', {', '.join(row + '.' + column for column in TASK_COLUMNS)})")
+
+# Row triggers that append every write to the tasks table to the task_changes log, as
+# (name, event, statement). They run inside the writing statement, so a change is logged
+# in the same transaction as the write itself, for bulk and async writes alike.
+CHANGE_LOG_TRIGGERS = [
+    ("tasks_changes_insert", "INSERT", _log_change("insert", "NEW")),
+    ("tasks_changes_update", "UPDATE", _log_change("update", "NEW")),
+    ("tasks_changes_delete", "DELETE", _log_change("delete", "OLD")),
+]
+
+# Seeds an empty change log with an insert per existing task, so a consumer reading from
+# cursor 0 rebuilds the whole table.
+BACKFILL_CHANGES = (f"INSERT INTO task_changes (operation, {', '.join(TASK_COLUMNS)}) "
+                    f"SELECT 'insert', {', '.join(TASK_COLUMNS)} FROM tasks ORDER BY task_id")
+
+def build_filter_clause(filter_by: dict = None, after_id: int = None, placeholder: str = "%s"):
+    """
+    Builds the WHERE clause shared by every SQL backend for list_tasks, iter_tasks and export_tasks.
+    :param filter_by: Dictionary with filter conditions (status, priority, due date).
+    :param after_id: Keyset cursor, only tasks with a greater task_id are matched.
+    :param placeholder: Parameter marker of the driver, "%s" for pymysql and "?" for sqlite3.
+    :return: Tuple of (sql fragment, list of values).
+    """
+    conditions, values = build_filter_conditions(filter_by, after_id, placeholder)
+    if conditions:
+        return " WHERE " + " AND ".join(conditions), values
+    return "", values
+
+def build_filter_conditions(filter_by: dict = None, after_id: int = None, placeholder: str = "%s"):
+    """
+    Builds the individual conditions of build_filter_clause, for queries that add their own.
+    :return: Tuple of (list of sql conditions, list of values).
+    """
+    conditions = []
+    values = []
+
+    if filter_by:
+        if "status" in filter_by:
+            conditions.append(f"status = {placeholder}")
+            values.append(filter_by["status"])
+        if "priority" in filter_by:
+            conditions.append(f"priority = {placeholder}")
+            values.append(filter_by["priority"])
+        if "due_date" in filter_by:
+            conditions.append(f"due_date = {placeholder}")
+            values.append(filter_by["due_date"])
+    if after_id is not None:
+        conditions.append(f"task_id > {placeholder}")
+        values.append(after_id)
+    return conditions, values
+
+DETAIL_FIELDS = ("title", "description", "due_date", "priority")
+
+def build_set_clause(changes: dict, placeholder: str = "%s"):
+    """
+    Builds the SET clause of a details update from a dictionary of changed fields.
+    Only the given fields are written, and the row version is incremented.
+    :param changes: Mapping of field name to new value, limited to DETAIL_FIELDS.
+    :param placeholder: Parameter marker of the driver.
+    :return: Tuple of (sql fragment, list of values).
+    """
+    unknown = set(changes) - set(DETAIL_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot update field(s): {', '.join(sorted(unknown))}")
+    if not changes:
+        raise ValueError("No fields to update")
+    fields = [field for field in DETAIL_FIELDS if field in changes]
+    assignments = [f"{field} = {placeholder}" for field in fields] + ["version = version + 1"]
+    return " SET " + ", ".join(assignments), [changes[field] for field in fields]
+
+def build_bulk_targets(task_ids=None, filter_by: dict = None, chunk_size: int = 1000, placeholder: str = "%s"):
+    """
+    Builds the WHERE clauses of a set-based update or delete. Explicit ids are split into
+    chunked IN (...) lists, a filter becomes a single clause. Exactly one of task_ids and
+    filter_by must be given; an empty filter_by targets every task.
+    :param task_ids: Iterable of task ids.
+    :param filter_by: Dictionary with filter conditions (status, priority, due date).
+    :param chunk_size: Maximum number of ids per IN list.
+    :param placeholder: Parameter marker of the driver.
+    :return: List of (sql fragment, list of values) tuples, one per statement.
+    """
+    if (task_ids is None) == (filter_by is None):
+        raise ValueError("Pass either task_ids or filter_by")
+    if filter_by is not None:
+        return [build_filter_clause(filter_by, None, placeholder)]
+    ids = sorted({int(task_id) for task_id in task_ids})
+    return [
+        (f" WHERE task_id IN ({', '.join([placeholder] * len(chunk))})", chunk)
+        for chunk in (ids[start:start + chunk_size] for start in range(0, len(ids), chunk_size))
+    ]
+
+# MySQL sorts ENUM columns by declaration order, which already is the rank order; backends
+# storing them as text (SQLite) sort by these expressions instead. SQLite keeps the priority
+# rank in a generated column, so its indexes can serve ORDER BY priority.
+PRIORITY_RANK_EXPRESSION = "CASE priority WHEN 'Low' THEN 1 WHEN 'Medium' THEN 2 ELSE 3 END"
+RANK_EXPRESSIONS = {
+    "priority": "priority_rank",
+    "status": "CASE status WHEN 'Pending' THEN 1 WHEN 'In Progress' THEN 2 ELSE 3 END",
+}
+
+# LIMIT is required before OFFSET in MySQL, this stands for "no limit" in MySQL and SQLite.
+NO_LIMIT = 2**63 - 1
+
+def escape_like(text: str, escape: str = "!"):
+    """Escapes LIKE wildcards so text is matched literally, for use with ESCAPE '!'."""
+    return text.replace(escape, escape * 2).replace("%", escape + "%").replace("_", escape + "_")
+
+def build_where_clause(query, placeholder: str = "%s", today=None):
+    """
+    Builds the WHERE clause of a TaskQuery. Single values compile to =, several to IN (...),
+    so both can use the (status, priority, due_date) indexes.
+    :param query: TaskQuery instance.
+    :param placeholder: Parameter marker of the driver.
+    :param today: Reference date for overdue, defaults to date.today().
+    :return: Tuple of (sql fragment, list of values).
+    """
+    conditions = []
+    values = []
+    for field in ("status", "priority"):
+        selected = getattr(query, field)
+        if selected and len(selected) == 1:
+            conditions.append(f"{field} = {placeholder}")
+        elif selected:
+            conditions.append(f"{field} IN ({', '.join([placeholder] * len(selected))})")
+        values.extend(selected or ())
+    if query.due_date is not None:
+        conditions.append(f"due_date = {placeholder}")
+        values.append(query.due_date)
+    if query.due_from is not None:
+        conditions.append(f"due_date >= {placeholder}")
+        values.append(query.due_from)
+    if query.due_to is not None:
+        conditions.append(f"due_date <= {placeholder}")
+        values.append(query.due_to)
+    if query.overdue:
+        conditions.append(f"due_date < {placeholder} AND status <> {placeholder}")
+        values += [today or date.today(), "Completed"]
+    if query.text:
+        conditions.append(f"(title LIKE {placeholder} ESCAPE '!' OR description LIKE {placeholder} ESCAPE '!')")
+        pattern = "%" + escape_like(query.text) + "%"
+        values += [pattern, pattern]
+    if query.after_id is not None:
+        conditions.append(f"task_id > {placeholder}")
+        values.append(query.after_id)
+
+    if conditions:
+        return " WHERE " + " AND ".join(conditions), values
+    return "", values
+
+def build_query(query, placeholder: str = "%s", enum_order: bool = True, today=None):
+    """
+    Compiles a TaskQuery into a parameterized SELECT. Only the projected columns are read,
+    so a listing without description never loads the TEXT column.
+    :param query: TaskQuery instance.
+    :param placeholder: Parameter marker of the driver.
+    :param enum_order: Whether the database sorts priority/status by rank natively (MySQL ENUM).
+    :param today: Reference date for overdue, defaults to date.today().
+    :return: Tuple of (sql, list of values).
+    """
+    where, values = build_where_clause(query, placeholder, today)
+    # A field filtered to a single value is constant in the result, sorting by it only keeps
+    # the planner from the index that covers the filter.
+    pinned = {field for field in ("status", "priority") if getattr(query, field) and len(getattr(query, field)) == 1}
+    if query.due_date is not None:
+        pinned.add("due_date")
+    order = []
+    for field, descending in query.order_by:
+        if field in pinned:
+            continue
+        expression = field if enum_order else RANK_EXPRESSIONS.get(field, field)
+        order.append(expression + (" DESC" if descending else ""))
+    sql = "SELECT " + ", ".join(query.columns) + " FROM tasks" + where + " ORDER BY " + ", ".join(order)
+    if query.limit is not None or query.offset:
+        sql += f" LIMIT {placeholder}"
+        values.append(NO_LIMIT if query.limit is None else query.limit)
+    if query.offset:
+        sql += f" OFFSET {placeholder}"
+        values.append(query.offset)
+    return sql, values
+
+def claim_query(priority_order: bool = True):
+    """
+    Builds the query that finds the Pending tasks claim_tasks hands out, in claim order:
+    High before Medium before Low and then by due date, or by due date alone without
+    priority_order, task_id breaking ties.
+    :param priority_order: Order by priority before due date.
+    :return: TaskQuery instance without limit.
+    """
+    if not priority_order:
+        return TaskQuery(status="Pending", order_by=["due_date"])
+    return TaskQuery(status="Pending", order_by=["-priority", "due_date"])
+
+def next_queries(filter_by: dict = None):
+    """
+    Builds the queries of next_tasks: the tasks of each selected status (by default Pending
+    and In Progress) in "what's next" order, highest priority first, then by due date.
+    One query per status lets each one read its first rows straight from the
+    (status, priority, due_date) ordered index; merge the results with rank_index.top_ranked.
+    :param filter_by: Dictionary with filter conditions (status, priority, due date).
+    :return: List of TaskQuery instances without limit.
+    """
+    from repositories.rank_index import OPEN_STATUSES
+
+    filter_by = filter_by or {}
+    statuses = (filter_by["status"],) if filter_by.get("status") else OPEN_STATUSES
+    return [TaskQuery(status=status, priority=filter_by.get("priority") or None, due_date=filter_by.get("due_date") or None,
+                      order_by=["-priority", "due_date"]) for status in statuses]
+
+STATS_BY_STATUS_PRIORITY = "SELECT status, priority, COUNT(*) FROM tasks GROUP BY status, priority"
+
+def build_due_histogram_query(today, placeholder: str = "%s"):
+    """
+    Builds the GROUP BY that counts open tasks per due date bucket (see task_stats.DUE_BUCKETS).
+    :param today: Reference date.
+    :param placeholder: Parameter marker of the driver.
+    :return: Tuple of (sql, list of values).
+    """
+    from repositories.task_stats import bucket_bounds
+
+    today, week_end, month_end = bucket_bounds(today)
+    sql = (f"SELECT CASE WHEN due_date < {placeholder} THEN 'overdue'"
+           f" WHEN due_date = {placeholder} THEN 'today'"
+           f" WHEN due_date <= {placeholder} THEN 'next_7_days'"
+           f" WHEN due_date <= {placeholder} THEN 'next_30_days'"
+           f" ELSE 'later' END AS bucket, COUNT(*) FROM tasks WHERE status <> {placeholder} GROUP BY bucket")
+    return sql, [today, today, week_end, month_end, "Completed"]
@@ -0,0 +1,108 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bisect import bisect_left, insort
+from datetime import date
+from heapq import merge
+from itertools import islice
+from models.task_query import PRIORITY_RANKS
+
+# Statuses next_tasks ranks; completed tasks are history and only grow.
+OPEN_STATUSES = ("Pending", "In Progress")
+PRIORITY_ORDER = ("High", "Medium", "Low")
+
+def rank_key(task):
+    """"What's next" order: highest priority first, then the earliest due date, then the oldest task."""
+    return (-PRIORITY_RANKS[task.priority], task.due_date, task.task_id)
+
+def top_ranked(rankings, k: int):
+    """
+    Merges lists that are each in rank_key order into the first k tasks overall.
+    :param rankings: Iterable of lists of Task objects sorted by rank_key.
+    :param k: Number of tasks returned.
+    :return: List of Task objects.
+    """
+    return list(islice(merge(*rankings, key=rank_key), k))
+
+class RankIndex:
+    """
+    The open tasks in "what's next" order: one list of rank keys per status, kept sorted by
+    bisection, plus the tasks by id. Every priority, and every (priority, due_date) pair,
+    is a contiguous slice of a list, so top(k) bisects to at most one slice per selected
+    status and priority and merges their first k keys: O(log n + k) whatever the filter.
+    Not thread-safe on its own, the owning repository serializes access.
+    """
+
+    def __init__(self, tasks=()):
+        """
+        :param tasks: Optional iterable of Task objects to start with, sorted once instead of inserted one by one.
+        """
+        self.__keys = {status: [] for status in OPEN_STATUSES}
+        self.__tasks = {}
+        for task in tasks:
+            if task.status in self.__keys:
+                self.__tasks[task.task_id] = task
+        for task in self.__tasks.values():
+            self.__keys[task.status].append(rank_key(task))
+        for keys in self.__keys.values():
+            keys.sort()
+
+    def __len__(self):
+        return len(self.__tasks)
+
+    def get(self, task_id: int):
+        """Returns the indexed task with this id, None if it is not an indexed open task."""
+        return self.__tasks.get(task_id)
+
+    def add(self, task):
+        """Indexes a task, replacing its previous state. A task that is not open is only removed."""
+        self.remove(task.task_id)
+        if task.status in self.__keys:
+            insort(self.__keys[task.status], rank_key(task))
+            self.__tasks[task.task_id] = task
+
+    def remove(self, task_id: int):
+        task = self.__tasks.pop(task_id, None)
+        if task is not None:
+            keys = self.__keys[task.status]
+            del keys[bisect_left(keys, rank_key(task))]
+
+    def clear(self):
+        for keys in self.__keys.values():
+            keys.clear()
+        self.__tasks.clear()
+
+    def top(self, k: int, statuses=None, priority: str = None, due_date=None):
+        """
+        Returns the first k open tasks in rank_key order.
+        :param k: Maximum number of tasks returned.
+        :param statuses: Open statuses to include, None for all of them.
+        :param priority: Only tasks with this priority.
+        :param due_date: Only tasks due on this date, YYYY-MM-DD or date.
+        :return: List of Task objects.
+        :raises ValueError: For a status that is not open, an unknown priority or a malformed due date,
+                            as TaskQuery raises for the SQL backends.
+        """
+        for status in statuses or ():
+            if status not in self.__keys:
+                raise ValueError(f"Invalid status '{status}'")
+        if priority is not None and priority not in PRIORITY_RANKS:
+            raise ValueError(f"Invalid priority '{priority}'")
+        if isinstance(due_date, str):
+            due_date = date.fromisoformat(due_date)
+        slices = []
+        for status in statuses or OPEN_STATUSES:
+            keys = self.__keys[status]
+            if priority is None and due_date is None:
+                slices.append(keys[:k])
+                continue
+            for name in (priority,) if priority else PRIORITY_ORDER:
+                rank = -PRIORITY_RANKS[name]
+                if due_date is None:
+                    start, end = bisect_left(keys, (rank,)), bisect_left(keys, (rank + 1,))
+                else:
+                    start, end = bisect_left(keys, (rank, due_date)), bisect_left(keys, (rank, due_date, float("inf")))
+                slices.append(keys[start:min(end, start + k)])
+        return [self.__tasks[task_id] for _, _, task_id in islice(merge(*slices), k)]
@@ -0,0 +1,246 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from models.task import Task
+from interfaces.Itask_repository import ITaskRepository
+from repositories.task_repository_decorator import TaskRepositoryDecorator
+from repositories.rank_index import RankIndex, OPEN_STATUSES
+
+class RankedTaskRepository(TaskRepositoryDecorator):
+    """
+    Serves next_tasks from an in-process RankIndex of the open tasks, so "what's next" costs
+    O(log n + k) instead of a query per status. The index is loaded from the wrapped
+    repository on first use and kept current by the single-task writes and claims made
+    through this repository: each one re-reads the tasks it wrote and re-indexes them, and
+    their versions keep a slow re-read from undoing a newer one. Writes whose effect is not
+    known task by task (bulk imports and bulk operations) and transaction scopes that roll
+    back drop the index; it is also reloaded every refresh_interval seconds to pick up
+    other processes writing to the same database. Until the first next_tasks call nothing
+    is loaded and writes skip the re-reads.
+    """
+
+    def __init__(self, task_repository: ITaskRepository, refresh_interval: float = 300.0):
+        """
+        :param task_repository: The repository being wrapped.
+        :param refresh_interval: Seconds after which the index is reloaded, 0 or None to only
+                                 reload when needed.
+        """
+        super().__init__(task_repository)
+        self.__refresh_interval = refresh_interval
+        self.__lock = threading.Lock()
+        self.__load_lock = threading.Lock()
+        self.__index = None
+        self.__loaded_at = None
+        self.__unknown = 0
+        # Ids written while a load runs, replayed onto the loaded index.
+        self.__touched = None
+        # Last version seen of the tasks that are not in the index, infinity once deleted, with
+        # the sequence number it was recorded at. An entry only guards against re-reads that
+        # were in flight when it was recorded, so it is evicted once they have all finished.
+        self.__versions = {}
+        self.__recorded = deque()
+        self.__sequence = 0
+        # Sequence number at which each write still in flight started -> number of such writes.
+        self.__in_flight = Counter()
+
+    def next_tasks(self, k: int = 10, filter_by: dict = None):
+        filter_by = filter_by or {}
+        status = filter_by.get("status")
+        if status and status not in OPEN_STATUSES:
+            return self._inner.next_tasks(k, filter_by)
+        with self.__lock:
+            index = self.__index if self.__is_fresh() else None
+            if index is not None:
+                return self.__top(index, k, status, filter_by)
+        index = self.__load()
+        with self.__lock:
+            return self.__top(index, k, status, filter_by)
+
+    def __top(self, index: RankIndex, k: int, status: str, filter_by: dict):
+        return index.top(k, (status,) if status else None, filter_by.get("priority") or None, filter_by.get("due_date") or None)
+
+    def __is_fresh(self):
+        if self.__index is None or self.__loaded_at is None:
+            return False
+        return not self.__refresh_interval or time.monotonic() - self.__loaded_at < self.__refresh_interval
+
+    @contextmanager
+    def __tracked(self):
+        """
+        Marks a write and its re-reads as in flight, evicting the versions no write needs any more at the end.
+        :return: Context manager yielding the sequence number the write started at.
+        """
+        with self.__lock:
+            started = self.__sequence
+            self.__in_flight[started] += 1
+        try:
+            yield started
+        finally:
+            with self.__lock:
+                self.__in_flight[started] -= 1
+                if not self.__in_flight[started]:
+                    del self.__in_flight[started]
+                oldest = min(self.__in_flight, default=self.__sequence)
+                while self.__recorded and self.__recorded[0][0] <= oldest:
+                    sequence, task_id = self.__recorded.popleft()
+                    if self.__versions.get(task_id, (None, None))[1] == sequence:
+                        del self.__versions[task_id]
+
+    def __remember(self, task_id: int, version):
+        self.__sequence += 1
+        self.__versions[task_id] = (version, self.__sequence)
+        self.__recorded.append((self.__sequence, task_id))
+
+    def __load(self):
+        """
+        Loads the open tasks into a new index, unless another thread just did, and replays
+        onto it the writes made while loading.
+        :return: The RankIndex to serve the read from.
+        """
+        with self.__load_lock, self.__tracked():
+            with self.__lock:
+                if self.__is_fresh():
+                    return self.__index
+                unknown = self.__unknown
+                self.__touched = set()
+            index = RankIndex(task for status in OPEN_STATUSES for task in self._inner.iter_tasks({"status": status}))
+            with self.__lock:
+                touched, self.__touched = self.__touched, None
+                self.__index = index
+            self.__refresh(touched)
+            with self.__lock:
+                # A write of unknown effect that overlapped the load may or may not be part of
+                # it; serve this index once and reload on the next read instead of guessing.
+                self.__loaded_at = time.monotonic() if unknown == self.__unknown else None
+            return index
+
+    def __drop(self):
+        with self.__lock:
+            self.__unknown += 1
+            self.__index = None
+            self.__loaded_at = None
+
+    def __apply(self, tasks):
+        """
+        Indexes the current state of tasks, skipping states older than the indexed one.
+        :param tasks: List of (task_id, Task object or None once deleted) pairs.
+        """
+        with self.__lock:
+            if self.__touched is not None:
+                self.__touched.update(task_id for task_id, _ in tasks)
+            if self.__index is None:
+                return
+            for task_id, task in tasks:
+                current = self.__index.get(task_id)
+                seen = current.version if current is not None else self.__versions.get(task_id, (0, 0))[0]
+                if task is None:
+                    self.__index.remove(task_id)
+                    self.__remember(task_id, float("inf"))
+                elif task.version > seen:
+                    self.__index.add(task)
+                    if task.status in OPEN_STATUSES:
+                        self.__versions.pop(task_id, None)
+                    else:
+                        self.__remember(task_id, task.version)
+
+    def __refresh(self, task_ids):
+        """Re-reads tasks from the wrapped repository and indexes them, unless nothing needs the index."""
+        with self.__lock:
+            if self.__index is None and self.__touched is None:
+                return
+        self.__apply([(task_id, self._inner.get_task(task_id)) for task_id in task_ids])
+
+    def __write(self, write, task_ids=None):
+        """
+        Runs a write of the wrapped repository and re-indexes the tasks it touched.
+        :param task_ids: Ids of the written tasks, a callable returning them from the write's
+                         result, or None when they are not known (the index is dropped).
+        """
+        with self.__tracked():
+            try:
+                result = write()
+            except BaseException:
+                if task_ids is None or callable(task_ids):
+                    self.__drop()
+                else:
+                    self.__refresh(task_ids)
+                raise
+            if task_ids is None:
+                self.__drop()
+            else:
+                self.__refresh(task_ids(result) if callable(task_ids) else task_ids)
+            return result
+
+    @contextmanager
+    def transaction(self):
+        try:
+            with self._inner.transaction():
+                yield
+        except BaseException:
+            self.__drop()
+            raise
+
+    def add_task(self, task: Task):
+        with self.__tracked() as started:
+            try:
+                result = self._inner.add_task(task)
+            except BaseException:
+                self.__drop()
+                raise
+            if task.task_id is not None:
+                with self.__lock:
+                    # A version recorded before the insert comes from a failed write to the then unused
+                    # id. One recorded since is a newer state of this task, written by another thread.
+                    if self.__versions.get(task.task_id, (0, 0))[1] <= started:
+                        self.__versions.pop(task.task_id, None)
+                self.__apply([(task.task_id, task)])
+            return result
+
+    def add_tasks(self, tasks, chunk_size: int = 1000):
+        return self.__write(lambda: self._inner.add_tasks(tasks, chunk_size))
+
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
+        return self.__write(lambda: self._inner.update_task_details(task_id, title, description, due_date, priority,
+                                                                    expected_version), [task_id])
+
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        return self.__write(lambda: self._inner.update_task_fields(task_id, changes, expected_version), [task_id])
+
+    def update_task_status(self, task_id: int, new_status: str):
+        return self.__write(lambda: self._inner.update_task_status(task_id, new_status), [task_id])
+
+    def delete_task(self, task_id: int):
+        return self.__write(lambda: self._inner.delete_task(task_id), [task_id])
+
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__write(lambda: self._inner.update_status_bulk(new_status, task_ids, filter_by, chunk_size))
+
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__write(lambda: self._inner.update_details_bulk(changes, task_ids, filter_by, chunk_size))
+
+    def delete_bulk(self, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__write(lambda: self._inner.delete_bulk(task_ids, filter_by, chunk_size))
+
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        # The claimed tasks come back in their new state, no re-read needed.
+        with self.__tracked():
+            try:
+                claimed = self._inner.claim_tasks(worker_id, n, priority_order, lease_seconds)
+            except BaseException:
+                self.__drop()
+                raise
+            self.__apply([(task.task_id, task) for task in claimed])
+            return claimed
+
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        return self.__write(lambda: self._inner.release_claims(worker_id, task_ids, status), lambda released: released)
+
+    def reap_expired_claims(self, limit: int = 1000):
+        return self.__write(lambda: self._inner.reap_expired_claims(limit), lambda reaped: reaped)
@@ -0,0 +1,87 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import time
+
+# How safe it is to repeat an attempt that failed, as classified by a backend's error translator.
+NEVER = None
+ALWAYS = "always"                # the failed attempt certainly had no effect (rolled back, never sent)
+IF_IDEMPOTENT = "if_idempotent"  # the attempt may have been applied (connection lost mid-statement)
+
+class RetryPolicy:
+    """
+    Repeats an operation that failed with a transient database error, sleeping with full-jitter
+    exponential backoff between attempts so that clients colliding on the same rows spread out
+    instead of deadlocking again in lockstep. Operations that are not idempotent (an INSERT)
+    are only repeated when the failed attempt certainly had no effect.
+    """
+
+    def __init__(self, attempts: int = 4, base_delay: float = 0.05, max_delay: float = 1.0):
+        """
+        :param attempts: Maximum number of attempts, 1 disables retrying.
+        :param base_delay: Upper bound in seconds of the sleep before the second attempt, doubled for each further one.
+        :param max_delay: Cap in seconds of the sleep between two attempts.
+        """
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        self.__attempts = attempts
+        self.__base_delay = base_delay
+        self.__max_delay = max_delay
+
+    def delay(self, attempt: int):
+        """Returns the sleep in seconds after the given failed attempt (1-based)."""
+        return random.uniform(0, min(self.__max_delay, self.__base_delay * 2 ** (attempt - 1)))
+
+    def run(self, operation, translate, idempotent: bool = True):
+        """
+        Runs operation until it succeeds, fails permanently or runs out of attempts.
+        :param operation: Callable performing one attempt. It receives uncertain, True when an earlier
+                          attempt may have been applied, e.g. so a retried delete that finds nothing
+                          does not report the task as missing.
+        :param translate: Callable mapping an exception raised by operation to (error class, retry), where
+                          retry is NEVER, ALWAYS or IF_IDEMPOTENT. An error class of None re-raises the
+                          exception unchanged, anything else is raised from it.
+        :param idempotent: Whether repeating an applied attempt is harmless.
+        :return: The result of operation.
+        """
+        attempt = 1
+        uncertain = False
+        while True:
+            try:
+                return operation(uncertain)
+            except Exception as e:
+                uncertain = self.backoff(e, translate, attempt, idempotent) or uncertain
+                attempt += 1
+
+    def backoff(self, error: Exception, translate, attempt: int, idempotent: bool = True):
+        """
+        Handles a failed attempt, for callers that drive the attempts themselves (see run).
+        Sleeps and returns when another attempt should follow, otherwise raises the translated error.
+        :param attempt: Number of the attempt that failed, 1-based.
+        :return: True if the failed attempt may have been applied.
+        """
+        seconds, uncertain = self.next_attempt(error, translate, attempt, idempotent)
+        time.sleep(seconds)
+        return uncertain
+
+    def next_attempt(self, error: Exception, translate, attempt: int, idempotent: bool = True):
+        """
+        Like backoff, but returns the sleep instead of sleeping, for asyncio callers that await it.
+        :return: (seconds to sleep before the next attempt, True if the failed attempt may have been applied).
+        """
+        error_class, retry = translate(error)
+        if error_class is None:
+            raise error
+        if attempt < self.__attempts and (retry == ALWAYS or (retry == IF_IDEMPOTENT and idempotent)):
+            return self.delay(attempt), retry == IF_IDEMPOTENT
+        message = f"Database error: {error}"
+        if attempt > 1:
+            message += f" (gave up after {attempt} attempts)"
+        raise error_class(message) from error
+
+# Policy of operations inside an explicit transaction: a deadlock rolls back the whole
+# transaction, so repeating the single statement would be wrong; errors are only translated.
+NO_RETRY = RetryPolicy(attempts=1)
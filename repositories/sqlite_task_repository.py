@@ -0,0 +1,579 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import islice
+from models.task import Task, TASK_COLUMNS
+from models.task_change import TaskChange
+from interfaces.Itask_repository import ITaskRepository
+from repositories.query_builder import (SELECT_TASKS, SELECT_CHANGES, SELECT_ARCHIVED_TASKS, ARCHIVE_TASKS,
+                                        CHANGE_LOG_TRIGGERS, BACKFILL_CHANGES,
+                                        build_filter_clause, build_filter_conditions, build_set_clause,
+                                        build_bulk_targets, build_query, claim_query, next_queries, STATS_BY_STATUS_PRIORITY,
+                                        build_due_histogram_query, PRIORITY_RANK_EXPRESSION)
+from repositories.rank_index import top_ranked
+from repositories.inverted_index import tokenize
+from repositories.task_stats import build_stats
+from repositories.errors import RepositoryError, NotFoundError, ConflictError, VersionConflictError, TransientError
+from repositories.retry import RetryPolicy, NO_RETRY, NEVER, ALWAYS
+
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.fromisoformat(raw.decode()))
+
+# Kept out of SCHEMA so that a database created before the foreign key can rebuild the table.
+CLAIMS_TABLE = """
+    CREATE TABLE IF NOT EXISTS task_claims (
+        task_id INTEGER PRIMARY KEY REFERENCES tasks (task_id) ON DELETE CASCADE,
+        worker_id TEXT NOT NULL,
+        claimed_at TIMESTAMP NOT NULL,
+        lease_expires_at TIMESTAMP NOT NULL
+    )
+    """
+CLAIMS_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_task_claims_lease ON task_claims (lease_expires_at)",
+    "CREATE INDEX IF NOT EXISTS idx_task_claims_worker ON task_claims (worker_id)",
+]
+
+SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS tasks (
+        task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        due_date DATE NOT NULL,
+        priority TEXT NOT NULL CHECK (priority IN ('Low', 'Medium', 'High')),
+        status TEXT NOT NULL DEFAULT 'Pending' CHECK (status IN ('Pending', 'In Progress', 'Completed')),
+        creation_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        version INTEGER NOT NULL DEFAULT 1,
+        priority_rank INTEGER GENERATED ALWAYS AS ({PRIORITY_RANK_EXPRESSION}) VIRTUAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tasks_status_priority_due ON tasks (status, priority, due_date)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks (status, due_date)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_priority_due ON tasks (priority, due_date)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date)",
+    CLAIMS_TABLE,
+    *CLAIMS_INDEXES,
+    """
+    CREATE TABLE IF NOT EXISTS tasks_archive (
+        task_id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        due_date DATE NOT NULL,
+        priority TEXT NOT NULL,
+        status TEXT NOT NULL,
+        creation_timestamp TIMESTAMP,
+        version INTEGER NOT NULL,
+        archived_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tasks_archive_priority_due ON tasks_archive (priority, due_date)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_archive_due_date ON tasks_archive (due_date)",
+]
+
+# FTS5 index over title and description for search_tasks. It is an external-content table,
+# so the text is not stored twice; triggers keep it in step with every write to tasks.
+FULLTEXT_SCHEMA = [
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, content='tasks', content_rowid='task_id')",
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, title, description) VALUES (new.task_id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', old.task_id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', old.task_id, old.title, old.description);
+        INSERT INTO tasks_fts (rowid, title, description) VALUES (new.task_id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+]
+
+# Change log for TaskService.changes_since, created together with its backfill and the
+# triggers that append to it, see query_builder.CHANGE_LOG_TRIGGERS.
+CHANGE_LOG_SCHEMA = [
+    """
+    CREATE TABLE task_changes (
+        change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        operation TEXT NOT NULL CHECK (operation IN ('insert', 'update', 'delete')),
+        changed_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+        task_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT,
+        due_date DATE NOT NULL,
+        priority TEXT NOT NULL,
+        status TEXT NOT NULL,
+        creation_timestamp TIMESTAMP,
+        version INTEGER NOT NULL
+    )
+    """,
+    BACKFILL_CHANGES,
+] + [f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON tasks BEGIN {statement}; END"
+     for name, event, statement in CHANGE_LOG_TRIGGERS]
+
+# Serves ORDER BY priority (the rank column, see query_builder.RANK_EXPRESSIONS) for claim_tasks and next_tasks.
+NEXT_INDEX = "CREATE INDEX IF NOT EXISTS idx_tasks_next ON tasks (status, priority_rank DESC, due_date)"
+
+SEARCH_TASKS = ("SELECT " + ", ".join("tasks." + column for column in TASK_COLUMNS)
+                + " FROM tasks_fts JOIN tasks ON tasks.task_id = tasks_fts.rowid")
+
+INSERT_TASK = """INSERT INTO tasks (title, description, due_date, priority, status, creation_timestamp)
+                 VALUES (?, ?, ?, ?, ?, ?)"""
+
+CLAIM_TASKS = ("INSERT OR REPLACE INTO task_claims (task_id, worker_id, claimed_at, lease_expires_at) "
+               "SELECT task_id, ?, ?, ? FROM tasks")
+SELECT_ARCHIVABLE = "SELECT task_id FROM tasks WHERE status = 'Completed' AND due_date < ? ORDER BY due_date, task_id LIMIT ?"
+
+def translate_sqlite_error(error: Exception):
+    """
+    Classifies an exception raised by sqlite3, see RetryPolicy.run. A locked or busy database
+    outlasted the busy timeout without applying the statement, so it is always safe to retry.
+    :return: (error class, retry) pair, (None, NEVER) for exceptions that are not database errors.
+    """
+    if isinstance(error, sqlite3.OperationalError) and ("locked" in str(error) or "busy" in str(error)):
+        return TransientError, ALWAYS
+    if isinstance(error, sqlite3.IntegrityError):
+        return ConflictError, NEVER
+    if isinstance(error, sqlite3.Error):
+        return RepositoryError, NEVER
+    return None, NEVER
+
+class SQLiteTaskRepository(ITaskRepository):
+    """
+    Embedded SQLite implementation of ITaskRepository, for single-node deployments,
+    benchmarks and tests. Each thread gets its own connection to the database file,
+    which runs in WAL mode so readers never block the writer. Statements are constant
+    strings with ? parameters, so sqlite3's statement cache reuses the compiled plans.
+    search_tasks uses an FTS5 index that triggers keep in step with the tasks table, and
+    further triggers append every write to the task_changes log read by changes_since.
+    """
+
+    def __init__(self, database: str = ":memory:", timeout: float = 30.0, metrics=None, retry_policy: RetryPolicy = None):
+        """
+        Opens (and if needed creates) the database.
+        :param database: Path of the database file, or ":memory:" for a private in-memory database.
+        :param timeout: Seconds to wait for a lock held by another connection.
+        :param metrics: Optional instrumentation.Metrics recording every statement executed.
+        :param retry_policy: Retry policy for a database still locked after timeout, defaults to RetryPolicy().
+        """
+        self.__timeout = timeout
+        self.__metrics = metrics
+        self.__retry = retry_policy or RetryPolicy()
+        self.__local = threading.local()
+        self.__connections = []
+        self.__lock = threading.Lock()
+        self.__anchor = None
+        if database == ":memory:":
+            # Shared-cache URI so every thread sees the same in-memory database; the
+            # anchor connection keeps it alive for the lifetime of the repository.
+            self.__database = f"file:tasks-{id(self)}?mode=memory&cache=shared"
+            self.__anchor = self.__connection()
+        else:
+            self.__database = database
+        connection = self.__connection()
+        for statement in SCHEMA:
+            connection.execute(statement)
+        if "version" not in {row[1] for row in connection.execute("PRAGMA table_info(tasks)")}:
+            # Databases created before row versions were added.
+            connection.execute("ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        if "priority_rank" not in {row[1] for row in connection.execute("PRAGMA table_xinfo(tasks)")}:
+            # Databases created before the rank column was added; a VIRTUAL column is computed on read.
+            connection.execute(f"ALTER TABLE tasks ADD COLUMN priority_rank INTEGER GENERATED ALWAYS AS ({PRIORITY_RANK_EXPRESSION}) VIRTUAL")
+        if not connection.execute("PRAGMA foreign_key_list(task_claims)").fetchall():
+            # Databases created before claims cascaded: SQLite cannot add a foreign key, so the
+            # table is rebuilt without the claims of tasks deleted in the meantime.
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("ALTER TABLE task_claims RENAME TO task_claims_old")
+            connection.execute(CLAIMS_TABLE)
+            connection.execute("INSERT INTO task_claims SELECT * FROM task_claims_old WHERE task_id IN (SELECT task_id FROM tasks)")
+            connection.execute("DROP TABLE task_claims_old")
+            for statement in CLAIMS_INDEXES:
+                connection.execute(statement)
+            connection.execute("COMMIT")
+        connection.execute(NEXT_INDEX)
+        if not connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'").fetchone():
+            connection.execute("BEGIN IMMEDIATE")
+            for statement in FULLTEXT_SCHEMA:
+                connection.execute(statement)
+            connection.execute("COMMIT")
+        if not connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'task_changes'").fetchone():
+            connection.execute("BEGIN IMMEDIATE")
+            for statement in CHANGE_LOG_SCHEMA:
+                connection.execute(statement)
+            connection.execute("COMMIT")
+        if not connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            self.analyze()
+
+    def analyze(self):
+        """
+        Refreshes the planner statistics (sampled, see analysis_limit). Without them SQLite
+        prefers the low-selectivity status/priority indexes plus a sort over walking the
+        primary key, which is far slower for ORDER BY task_id LIMIT pages.
+        Only the tasks table is analyzed: statistics taken while the FTS5 shadow tables are
+        still empty make the planner scan them on every insert.
+        """
+        self.__connection().execute("ANALYZE tasks")
+
+    def __connection(self):
+        connection = getattr(self.__local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.__database, timeout=self.__timeout, uri=self.__database.startswith("file:"),
+                                         detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None,
+                                         check_same_thread=False, cached_statements=256)
+            if not self.__database.startswith("file:"):
+                connection.execute("PRAGMA journal_mode = WAL")
+                connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA temp_store = MEMORY")
+            connection.execute("PRAGMA foreign_keys = ON")
+            connection.execute("PRAGMA analysis_limit = 1000")
+            if self.__metrics is not None:
+                connection = self.__metrics.wrap_connection(connection)
+            self.__local.connection = connection
+            with self.__lock:
+                self.__connections.append(connection)
+        return connection
+
+    def close(self):
+        """Closes every connection opened by this repository."""
+        with self.__lock:
+            connections, self.__connections = self.__connections, []
+        for connection in connections:
+            connection.close()
+        self.__local = threading.local()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the operations of a with block in one BEGIN IMMEDIATE transaction on this thread's
+        connection, committed when the block ends and rolled back if it raises. Nested blocks
+        become savepoints. Taking the write lock up front means statements inside never wait
+        for it, so only BEGIN and COMMIT go through the retry policy.
+        """
+        if getattr(self.__local, "depth", 0):
+            with self.__savepoint(self.__connection()):
+                yield
+            return
+        connection = self.__connection()
+        self.__retry.run(lambda uncertain: connection.execute("BEGIN IMMEDIATE"), translate_sqlite_error)
+        self.__local.depth = 1
+        try:
+            yield
+            self.__retry.run(lambda uncertain: connection.execute("COMMIT"), translate_sqlite_error)
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            self.__local.depth = 0
+
+    @contextmanager
+    def __savepoint(self, connection):
+        """Scopes a nested block of the open transaction, rolling back only its own changes if it raises."""
+        self.__local.depth += 1
+        name = f"task_savepoint_{self.__local.depth}"
+        try:
+            self.__control(connection, "SAVEPOINT " + name)
+            try:
+                yield
+            except BaseException:
+                self.__control(connection, f"ROLLBACK TO {name}")
+                self.__control(connection, "RELEASE " + name)
+                raise
+            self.__control(connection, "RELEASE " + name)
+        finally:
+            self.__local.depth -= 1
+
+    def __control(self, connection, sql: str):
+        NO_RETRY.run(lambda uncertain: connection.execute(sql), translate_sqlite_error)
+
+    def __run(self, work, transaction: bool = False):
+        """
+        Runs work(connection) on this thread's connection under the retry policy, raising
+        database errors as RepositoryError subclasses. Inside an open transaction the work
+        is not retried, the transaction's caller decides whether to run it again.
+        :param transaction: Run the work atomically: inside BEGIN IMMEDIATE/COMMIT, or a savepoint of the open transaction.
+        """
+        in_transaction = getattr(self.__local, "depth", 0) > 0
+
+        def attempt(uncertain):
+            connection = self.__connection()
+            if not transaction:
+                return work(connection)
+            if in_transaction:
+                with self.__savepoint(connection):
+                    return work(connection)
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                result = work(connection)
+                connection.execute("COMMIT")
+                return result
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+
+        return (NO_RETRY if in_transaction else self.__retry).run(attempt, translate_sqlite_error)
+
+    def add_task(self, task: Task):
+        def insert(connection):
+            cursor = connection.execute(INSERT_TASK, (task.title, task.description, task.due_date, task.priority, task.status, task.creation_timestamp))
+            task._task_id = cursor.lastrowid
+            task._version = 1
+
+        self.__run(insert)
+
+    def add_tasks(self, tasks, chunk_size: int = 1000):
+        """
+        Inserts tasks in chunks, one executemany and one transaction per chunk.
+        A failing chunk is rolled back and reported, the remaining chunks still run.
+        Planner statistics are refreshed afterwards since a bulk load changes the data distribution.
+        :param tasks: Iterable of Task objects.
+        :param chunk_size: Number of tasks per chunk.
+        :return: List of per-chunk reports (chunk, count, inserted, error).
+        """
+        reports = []
+        iterator = iter(tasks)
+        chunk_number = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            chunk_number += 1
+            report = {"chunk": chunk_number, "count": len(chunk), "inserted": 0, "error": None}
+            rows = [(task.title, task.description, task.due_date, task.priority, task.status, task.creation_timestamp) for task in chunk]
+            try:
+                self.__run(lambda connection: connection.executemany(INSERT_TASK, rows), transaction=True)
+                report["inserted"] = len(chunk)
+            except RepositoryError as e:
+                report["error"] = str(e)
+            reports.append(report)
+        if reports:
+            self.analyze()
+        return reports
+
+    def get_task(self, task_id: int):
+        row = self.__run(lambda connection: connection.execute(SELECT_TASKS + " WHERE task_id = ?", (task_id,)).fetchone())
+        return Task.from_tuple(row) if row else None
+
+    def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        where, values = build_filter_clause(filter_by, after_id, "?")
+        sql = SELECT_TASKS + where + " ORDER BY task_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(limit)
+        return self.__run(lambda connection: [Task.from_tuple(row) for row in connection.execute(sql, values)])
+
+    def query_tasks(self, query):
+        sql, values = build_query(query, "?", enum_order=False)
+        return self.__run(lambda connection: [Task.from_columns(query.columns, row) for row in connection.execute(sql, values)])
+
+    def search_tasks(self, text: str, filter_by: dict = None, limit: int = None):
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        conditions, values = build_filter_conditions(filter_by, None, "?")
+        sql = SEARCH_TASKS + " WHERE " + " AND ".join(["tasks_fts MATCH ?"] + conditions) + " ORDER BY tasks_fts.rank, tasks.task_id"
+        values = [" OR ".join(f'"{token}"' for token in tokens)] + values
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(limit)
+        return self.__run(lambda connection: [Task.from_tuple(row) for row in connection.execute(sql, values)])
+
+    def get_stats(self, today=None):
+        today = today or date.today()
+        sql, values = build_due_histogram_query(today, "?")
+
+        def fetch(connection):
+            grid_rows = connection.execute(STATS_BY_STATUS_PRIORITY).fetchall()
+            return build_stats(grid_rows, connection.execute(sql, values).fetchall(), today)
+
+        return self.__run(fetch)
+
+    def iter_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        where, values = build_filter_clause(filter_by, None, "?")
+        try:
+            cursor = self.__connection().execute(SELECT_TASKS + where + " ORDER BY task_id", values)
+        except sqlite3.Error as e:
+            error_class, _ = translate_sqlite_error(e)
+            raise error_class(f"Database error: {e}") from e
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield Task.from_tuple(row)
+        finally:
+            cursor.close()
+
+    def next_tasks(self, k: int = 10, filter_by: dict = None):
+        return top_ranked([self.query_tasks(query.replace(limit=k)) for query in next_queries(filter_by)], k)
+
+    def changes_since(self, cursor: int = 0, limit: int = 1000):
+        sql = SELECT_CHANGES + " WHERE change_id > ? ORDER BY change_id LIMIT ?"
+        return self.__run(lambda connection: [TaskChange.from_tuple(row) for row in connection.execute(sql, (cursor, limit))])
+
+    def export_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        return self.iter_tasks(filter_by, chunk_size)
+
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        """
+        Claims up to n Pending tasks inside BEGIN IMMEDIATE. SQLite has a single writer, so the
+        write lock already keeps concurrent claimers apart and there are no locked rows to skip.
+        The tasks are read in claim order from the idx_tasks_next index.
+        """
+        if n <= 0:
+            return []
+        sql, values = build_query(claim_query(priority_order).replace(limit=n), "?", enum_order=False)
+
+        def claim(connection):
+            now = datetime.now()
+            tasks = [Task.from_tuple(row) for row in connection.execute(sql, values)]
+            for where, ids in build_bulk_targets([task.task_id for task in tasks], None, 1000, "?"):
+                connection.execute("UPDATE tasks SET status = 'In Progress', version = version + 1" + where, ids)
+                connection.execute(CLAIM_TASKS + where, [worker_id, now, now + timedelta(seconds=lease_seconds)] + ids)
+            for task in tasks:
+                task._status = "In Progress"
+                task._version += 1
+            return tasks
+
+        return self.__run(claim, transaction=True)
+
+    def renew_claims(self, worker_id: str, task_ids=None, lease_seconds: float = 300.0):
+        targets = [("", [])] if task_ids is None else build_bulk_targets(task_ids, None, 1000, "?")
+        targets = [(where.replace(" WHERE", " AND"), ids) for where, ids in targets]
+
+        def renew(connection):
+            expires = datetime.now() + timedelta(seconds=lease_seconds)
+            renewed = []
+            for where, ids in targets:
+                connection.execute("UPDATE task_claims SET lease_expires_at = ? WHERE worker_id = ?" + where, [expires, worker_id] + ids)
+                renewed += [row[0] for row in connection.execute("SELECT task_id FROM task_claims WHERE worker_id = ?" + where,
+                                                                 [worker_id] + ids)]
+            return sorted(renewed)
+
+        return self.__run(renew, transaction=True)
+
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        targets = build_bulk_targets(task_ids, None, 1000, "?")
+
+        def release(connection):
+            held = []
+            for where, ids in targets:
+                held += [row[0] for row in connection.execute("SELECT task_id FROM task_claims" + where + " AND worker_id = ?",
+                                                              ids + [worker_id])]
+            for where, ids in build_bulk_targets(held, None, 1000, "?"):
+                connection.execute("UPDATE tasks SET status = ?, version = version + 1" + where, [status] + ids)
+                connection.execute("DELETE FROM task_claims" + where, ids)
+            return sorted(held)
+
+        return self.__run(release, transaction=True)
+
+    def reap_expired_claims(self, limit: int = 1000):
+        def reap(connection):
+            expired = [row[0] for row in connection.execute(
+                "SELECT task_id FROM task_claims WHERE lease_expires_at < ? ORDER BY lease_expires_at LIMIT ?", (datetime.now(), limit))]
+            for where, ids in build_bulk_targets(expired, None, 1000, "?"):
+                connection.execute("UPDATE tasks SET status = 'Pending', version = version + 1" + where + " AND status = 'In Progress'", ids)
+                connection.execute("DELETE FROM task_claims" + where, ids)
+            return sorted(expired)
+
+        return self.__run(reap, transaction=True)
+
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        """
+        Moves a batch of old Completed tasks into tasks_archive inside BEGIN IMMEDIATE. The
+        write lock is held for one batch only, keep limit small so other writers wait briefly.
+        """
+        def archive(connection):
+            archived = [row[0] for row in connection.execute(SELECT_ARCHIVABLE, (completed_before, limit))]
+            for where, ids in build_bulk_targets(archived, None, 1000, "?"):
+                connection.execute(ARCHIVE_TASKS + where, ids)
+                connection.execute("DELETE FROM tasks" + where, ids)
+                connection.execute("DELETE FROM task_claims" + where, ids)
+            return sorted(archived)
+
+        return self.__run(archive, transaction=True)
+
+    def get_archived_task(self, task_id: int):
+        row = self.__run(lambda connection: connection.execute(SELECT_ARCHIVED_TASKS + " WHERE task_id = ?", (task_id,)).fetchone())
+        return Task.from_tuple(row) if row else None
+
+    def list_archived_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        where, values = build_filter_clause(filter_by, after_id, "?")
+        sql = SELECT_ARCHIVED_TASKS + where + " ORDER BY task_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(limit)
+        return self.__run(lambda connection: [Task.from_tuple(row) for row in connection.execute(sql, values)])
+
+    def __write_task(self, task_id: int, sql: str, values: tuple, expected_version: int = None):
+        """
+        Runs a single-task write, raising NotFoundError when no row matched, or VersionConflictError
+        when the statement is conditional on expected_version and the task has another version.
+        """
+        def write(connection):
+            if connection.execute(sql, values).rowcount:
+                return True
+            if expected_version is None:
+                return None
+            return connection.execute("SELECT version FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+
+        current = self.__run(write)
+        if current is True:
+            return
+        if current is not None:
+            raise VersionConflictError(task_id, expected_version, current[0])
+        raise NotFoundError(f"Task {task_id} not found")
+
+    def update_task_status(self, task_id: int, new_status: str):
+        self.__write_task(task_id, "UPDATE tasks SET status = ?, version = version + 1 WHERE task_id = ?", (new_status, task_id))
+
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
+        self.update_task_fields(task_id, {"title": title, "description": description, "due_date": due_date,
+                                          "priority": priority}, expected_version)
+
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        set_clause, values = build_set_clause(changes, "?")
+        sql = "UPDATE tasks" + set_clause + " WHERE task_id = ?"
+        values.append(task_id)
+        if expected_version is not None:
+            sql += " AND version = ?"
+            values.append(expected_version)
+        self.__write_task(task_id, sql, tuple(values), expected_version)
+
+    def delete_task(self, task_id: int):
+        self.__write_task(task_id, "DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__execute_bulk("UPDATE tasks SET status = ?, version = version + 1", [new_status],
+                                   task_ids, filter_by, chunk_size)
+
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        set_clause, set_values = build_set_clause(changes, "?")
+        return self.__execute_bulk("UPDATE tasks" + set_clause, set_values, task_ids, filter_by, chunk_size)
+
+    def delete_bulk(self, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__execute_bulk("DELETE FROM tasks", [], task_ids, filter_by, chunk_size)
+
+    def __execute_bulk(self, statement: str, statement_values: list, task_ids, filter_by: dict, chunk_size: int):
+        """
+        Runs a set-based UPDATE/DELETE inside a single transaction.
+        :return: Number of affected rows.
+        """
+        targets = build_bulk_targets(task_ids, filter_by, chunk_size, "?")
+        return self.__run(lambda connection: sum(connection.execute(statement + where, statement_values + values).rowcount
+                                                 for where, values in targets), transaction=True)
@@ -0,0 +1,233 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import copy
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from models.task import Task
+from interfaces.Itask_repository import ITaskRepository
+from repositories.task_repository_decorator import TaskRepositoryDecorator
+from repositories.task_stats import due_bucket
+
+def _as_date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+class SummaryTaskRepository(TaskRepositoryDecorator):
+    """
+    Keeps the get_stats counters in process and adjusts them on every single-task write made
+    through this repository, so dashboard reads are O(1) instead of two GROUP BY queries.
+    The counters are loaded from the wrapped repository on first use and reloaded when the
+    day changes (the due buckets move), after writes whose effect is not known task by task
+    (bulk imports and bulk operations, failed writes), and every refresh_interval seconds
+    to pick up other processes writing to the same database. A transaction scope that
+    rolls back drops the counters, since the writes it undid were already counted.
+    A single-task write reads the task's values before it from the wrapped repository, which
+    does not lock them until the write. When another write through this repository touches the
+    same task (or tasks not known in advance) in the meantime, the values may be stale, so the
+    counters are dropped rather than adjusted with a wrong move.
+    """
+
+    def __init__(self, task_repository: ITaskRepository, refresh_interval: float = 60.0):
+        """
+        :param task_repository: The repository being wrapped.
+        :param refresh_interval: Seconds after which the counters are reloaded, 0 or None to only
+                                 reload when needed.
+        """
+        super().__init__(task_repository)
+        self.__refresh_interval = refresh_interval
+        self.__lock = threading.Lock()
+        self.__stats = None
+        self.__loaded_at = None
+        self.__pending = 0
+        self.__version = 0
+        # Single-task writes in flight by task_id, the ids two writes overlapped on, and the
+        # number of writes in flight whose tasks are only known once they are done.
+        self.__writing = Counter()
+        self.__contended = set()
+        self.__wide = 0
+
+    def get_stats(self, today=None):
+        if today is not None and today != date.today():
+            return self._inner.get_stats(today)
+        with self.__lock:
+            if self.__is_fresh():
+                return copy.deepcopy(self.__stats)
+            version, pending = self.__version, self.__pending
+        stats = self._inner.get_stats()
+        if stats is None:
+            return None
+        with self.__lock:
+            self.__stats = stats
+            # A write that overlapped the load may or may not be part of it; serve this
+            # result once and reload on the next read instead of guessing.
+            settled = pending == 0 and self.__pending == 0 and version == self.__version
+            self.__loaded_at = time.monotonic() if settled else None
+            return copy.deepcopy(stats)
+
+    @contextmanager
+    def transaction(self):
+        self.__begin()
+        try:
+            with self._inner.transaction():
+                yield
+        except BaseException:
+            self.__end(known=False)
+            raise
+        self.__end()
+
+    def __is_fresh(self):
+        if self.__stats is None or self.__loaded_at is None:
+            return False
+        if self.__stats["as_of"] != date.today().isoformat():
+            return False
+        return not self.__refresh_interval or time.monotonic() - self.__loaded_at < self.__refresh_interval
+
+    def __begin(self, task_id: int = None, wide: bool = False):
+        """
+        Starts a write.
+        :param task_id: Task of a single-task write, whose effect only holds if no other write overlaps it.
+        :param wide: Whether the write changes tasks that are not known until it is done.
+        """
+        with self.__lock:
+            self.__pending += 1
+            if wide:
+                self.__wide += 1
+                self.__contended.update(self.__writing)
+            elif task_id is not None:
+                if self.__wide or task_id in self.__writing:
+                    self.__contended.add(task_id)
+                self.__writing[task_id] += 1
+
+    def __end(self, moves=(), known: bool = True, task_id: int = None, wide: bool = False):
+        """
+        Finishes a write: applies its (before, after) changes of (status, priority, due_date)
+        values, or drops the counters when the effect of the write is unknown.
+        """
+        with self.__lock:
+            self.__pending -= 1
+            self.__version += 1
+            if wide:
+                self.__wide -= 1
+            elif task_id is not None:
+                if task_id in self.__contended:
+                    known = False
+                self.__writing[task_id] -= 1
+                if not self.__writing[task_id]:
+                    del self.__writing[task_id]
+                    self.__contended.discard(task_id)
+            if not known:
+                self.__stats = None
+            elif self.__stats is not None:
+                for before, after in moves:
+                    self.__apply(before, -1)
+                    self.__apply(after, 1)
+
+    def __apply(self, values, sign: int):
+        if values is None:
+            return
+        status, priority, due_date = values
+        stats = self.__stats
+        stats["total"] += sign
+        stats["by_status"][status] += sign
+        stats["by_priority"][priority] += sign
+        stats["by_status_priority"][status][priority] += sign
+        if status != "Completed":
+            stats["due"][due_bucket(_as_date(due_date), date.fromisoformat(stats["as_of"]))] += sign
+            stats["overdue"] = stats["due"]["overdue"]
+
+    def __write(self, write, before=None, after=None, known: bool = True, wide: bool = True):
+        """
+        Runs a write of the wrapped repository and records its effect on the counters.
+        :param after: Values after the write, or a callable returning them once the write is done.
+        :param known: Whether the effect is known, or a callable telling it from the write's result.
+        :param wide: Whether the write may change existing tasks that are not known in advance.
+        """
+        self.__begin(wide=wide)
+        try:
+            result = write()
+        except BaseException:
+            self.__end(known=False, wide=wide)
+            raise
+        self.__end([(before, after() if callable(after) else after)], known(result) if callable(known) else known,
+                   wide=wide)
+        return result
+
+    def __write_task(self, task_id: int, write, after):
+        """
+        Runs a write of one existing task, reading its values before the write once the write
+        counts as in flight, so that an overlapping write to the same task is noticed.
+        :param after: Callable returning the values after the write from the values before it.
+        """
+        task_id = int(task_id)
+        self.__begin(task_id)
+        try:
+            task = self._inner.get_task(task_id)
+            before = None if task is None else (task.status, task.priority, task.due_date)
+            result = write()
+        except BaseException:
+            self.__end(known=False, task_id=task_id)
+            raise
+        self.__end([(before, after(before) if before else None)], task_id=task_id)
+        return result
+
+    def add_task(self, task: Task):
+        return self.__write(lambda: self._inner.add_task(task), None,
+                            lambda: (task.status, task.priority, task.due_date) if task.task_id is not None else None,
+                            wide=False)
+
+    def add_tasks(self, tasks, chunk_size: int = 1000):
+        return self.__write(lambda: self._inner.add_tasks(tasks, chunk_size), known=False)
+
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
+        return self.__write_task(task_id, lambda: self._inner.update_task_details(task_id, title, description, due_date,
+                                                                                  priority, expected_version),
+                                 lambda before: (before[0], priority, due_date))
+
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        return self.__write_task(task_id, lambda: self._inner.update_task_fields(task_id, changes, expected_version),
+                                 lambda before: (before[0], changes.get("priority", before[1]),
+                                                 changes.get("due_date", before[2])))
+
+    def update_task_status(self, task_id: int, new_status: str):
+        return self.__write_task(task_id, lambda: self._inner.update_task_status(task_id, new_status),
+                                 lambda before: (new_status, before[1], before[2]))
+
+    def delete_task(self, task_id: int):
+        return self.__write_task(task_id, lambda: self._inner.delete_task(task_id), lambda before: None)
+
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__write(lambda: self._inner.update_status_bulk(new_status, task_ids, filter_by, chunk_size), known=False)
+
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__write(lambda: self._inner.update_details_bulk(changes, task_ids, filter_by, chunk_size), known=False)
+
+    def delete_bulk(self, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__write(lambda: self._inner.delete_bulk(task_ids, filter_by, chunk_size), known=False)
+
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        # Every claimed task moved from Pending to In Progress, so claiming keeps the counters.
+        self.__begin(wide=True)
+        try:
+            claimed = self._inner.claim_tasks(worker_id, n, priority_order, lease_seconds)
+        except BaseException:
+            self.__end(known=False, wide=True)
+            raise
+        self.__end([(("Pending", task.priority, task.due_date), (task.status, task.priority, task.due_date))
+                    for task in claimed], wide=True)
+        return claimed
+
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        # The released and reaped tasks are only known by id, a write that touched none keeps the counters.
+        return self.__write(lambda: self._inner.release_claims(worker_id, task_ids, status), known=lambda released: not released)
+
+    def reap_expired_claims(self, limit: int = 1000):
+        return self.__write(lambda: self._inner.reap_expired_claims(limit), known=lambda reaped: not reaped)
+
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        return self.__write(lambda: self._inner.archive_tasks(completed_before, limit), known=lambda archived: not archived)
@@ -4,84 +4,554 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import pymysql
-from models.task import Task
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from datetime import date
+from models.task import Task, TASK_COLUMNS
+from models.task_change import TaskChange
 from interfaces.Itask_repository import ITaskRepository
+from db_pool import PoolTimeoutError
+from repositories.errors import RepositoryError, NotFoundError, ConflictError, VersionConflictError, TransientError
+from repositories.retry import RetryPolicy, NO_RETRY, NEVER, ALWAYS, IF_IDEMPOTENT
+from repositories.task_stats import build_stats
+from repositories.query_builder import (SELECT_TASKS, SELECT_CHANGES, SELECT_ARCHIVED_TASKS, ARCHIVE_TASKS, build_filter_clause, build_set_clause, build_bulk_targets, build_query,
+                                        build_filter_conditions, claim_query, next_queries, STATS_BY_STATUS_PRIORITY,
+                                        build_due_histogram_query)
+from repositories.rank_index import top_ranked
+
+MATCH_TEXT = "MATCH (title, description) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+SEARCH_TASKS = "SELECT " + ", ".join(TASK_COLUMNS) + ", " + MATCH_TEXT + " AS score FROM tasks"
+INSERT_TASK = """INSERT INTO tasks (title, description, due_date, priority, status, creation_timestamp)
+                 VALUES (%s, %s, %s, %s, %s, %s)"""
+
+# Lease times come from the server clock (NOW(6)), so workers with skewed clocks agree on expiry.
+LEASE_EXPIRY = "NOW(6) + INTERVAL %s MICROSECOND"
+CLAIM_TASKS = ("INSERT INTO task_claims (task_id, worker_id, claimed_at, lease_expires_at) SELECT task_id, %s, NOW(6), "
+               + LEASE_EXPIRY + " FROM tasks{where} ON DUPLICATE KEY UPDATE worker_id = %s, claimed_at = NOW(6), "
+               + "lease_expires_at = " + LEASE_EXPIRY)
+SELECT_EXPIRED_CLAIMS = ("SELECT task_id FROM task_claims WHERE lease_expires_at < NOW(6) "
+                         "ORDER BY lease_expires_at LIMIT %s FOR UPDATE SKIP LOCKED")
+SELECT_ARCHIVABLE = ("SELECT task_id FROM tasks WHERE status = 'Completed' AND due_date < %s "
+                     "ORDER BY due_date, task_id LIMIT %s FOR UPDATE SKIP LOCKED")
+
+# MySQL error codes after which the failed attempt certainly had no effect: deadlock (1213) and
+# lock wait timeout (1205) roll back, can't connect (2003) and gone away (2006) fail before the
+# statement reaches the server. A connection lost during a query (2013) leaves the outcome unknown.
+RETRY_ALWAYS_CODES = {1205, 1213, 2003, 2006}
+RETRY_IF_IDEMPOTENT_CODES = {2013}
+
+def translate_mysql_error(error: Exception):
+    """
+    Classifies an exception raised while talking to MySQL, see RetryPolicy.run.
+    :return: (error class, retry) pair, (None, NEVER) for exceptions that are not database errors.
+    """
+    if isinstance(error, PoolTimeoutError):
+        return TransientError, NEVER
+    if isinstance(error, pymysql.InterfaceError):
+        return TransientError, ALWAYS
+    if not isinstance(error, pymysql.MySQLError):
+        return None, NEVER
+    code = error.args[0] if error.args and isinstance(error.args[0], int) else None
+    if code in RETRY_ALWAYS_CODES:
+        return TransientError, ALWAYS
+    if code in RETRY_IF_IDEMPOTENT_CODES:
+        return TransientError, IF_IDEMPOTENT
+    if isinstance(error, pymysql.IntegrityError):
+        return ConflictError, NEVER
+    return RepositoryError, NEVER
 
 class TaskManager(ITaskRepository):
-    def __init__(self, connection):
-        self.__connection = connection
+    def __init__(self, pool, retry_policy: RetryPolicy = None):
+        """
+        Initializes TaskManager with a connection pool. A connection is borrowed
+        for each operation and returned as soon as it completes.
+        Database errors are raised as RepositoryError subclasses; deadlocks, lock wait timeouts
+        and lost connections are retried first, see RetryPolicy.
+        :param pool: ConnectionPool providing autocommit pymysql connections. They should be opened
+                     with CLIENT.FOUND_ROWS (see db_config.get_db_settings), so that an UPDATE that
+                     changes nothing still counts the task it matched.
+        :param retry_policy: Retry policy for transient errors, defaults to RetryPolicy().
+        """
+        self.__pool = pool
+        self.__retry = retry_policy or RetryPolicy()
+        self.__local = threading.local()
 
-    def add_task(self, task: Task):
+    def close(self):
+        """Closes the connection pool."""
+        self.__pool.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the operations of a with block in one transaction on one pooled connection: it is
+        committed when the block ends and rolled back if the block raises. Nested blocks become
+        savepoints. The transaction belongs to the calling thread.
+        Statements inside are not retried one by one, since a deadlock rolls back the whole
+        transaction; the TransientError ends the block and the caller may run it again.
+        """
+        connection = getattr(self.__local, "connection", None)
+        if connection is not None:
+            with self.__savepoint(connection):
+                yield
+            return
+
+        connection = NO_RETRY.run(lambda uncertain: self.__pool.acquire(), translate_mysql_error)
+        self.__local.connection, self.__local.depth, self.__local.aborted = connection, 0, False
+        discard = False
         try:
-            with self.__connection.cursor() as cursor:
-                sql = """INSERT INTO tasks (title, description, due_date, priority, status, creation_timestamp)
-                         VALUES (%s, %s, %s, %s, %s, %s)"""
-                cursor.execute(sql, (task.title, task.description, task.due_date.strftime("%Y-%m-%d"), task.priority, task.status, task.creation_timestamp))
-                self.__connection.commit()
-                task._Task__task_id = cursor.lastrowid
-        except pymysql.MySQLError as e:
-            print(f"Database error: {e}")
-            self.__connection.rollback()
-        except Exception as e:
-            print(f"Unexpected error: {e}")
+            NO_RETRY.run(lambda uncertain: connection.begin(), translate_mysql_error)
+            yield
+            if self.__local.aborted:
+                raise TransientError("Transaction was aborted by a deadlock or lost connection, it has to be run again")
+            NO_RETRY.run(lambda uncertain: connection.commit(), translate_mysql_error)
+        except BaseException:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.__local.connection = None
+            self.__pool.release(connection, discard)
 
-    def get_task(self, task_id: int):
+    @contextmanager
+    def __savepoint(self, connection):
+        """Scopes a nested block of the open transaction, rolling back only its own changes if it raises."""
+        self.__local.depth += 1
+        name = f"task_savepoint_{self.__local.depth}"
         try:
-            with self.__connection.cursor() as cursor:
-                sql = "SELECT * FROM tasks WHERE task_id = %s"
-                cursor.execute(sql, (task_id,))
-                row = cursor.fetchone()
-                if row:
-                    return Task(row["title"], row["description"], row["due_date"].strftime("%Y-%m-%d"), row["priority"], row["status"], row["task_id"], row["creation_timestamp"])
-        except pymysql.MySQLError as e:
-            print(f"Database error: {e}")
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-        return None
-
-    def list_tasks(self, filter_by: dict = None):
+            self.__control(connection, "SAVEPOINT " + name)
+            try:
+                yield
+            except BaseException as e:
+                # After a deadlock the transaction, savepoints included, is already gone. The raw
+                # driver error may not have been translated yet, so classify it here.
+                if isinstance(e, TransientError) or (isinstance(e, Exception) and translate_mysql_error(e)[0] is TransientError):
+                    self.__local.aborted = True
+                if not self.__local.aborted:
+                    try:
+                        self.__control(connection, "ROLLBACK TO SAVEPOINT " + name)
+                    except Exception:
+                        # The block's changes may still be there: the transaction must not
+                        # commit, and the block's own error is the one to report.
+                        self.__local.aborted = True
+                raise
+            self.__control(connection, "RELEASE SAVEPOINT " + name)
+        finally:
+            self.__local.depth -= 1
+
+    def __control(self, connection, sql: str):
+        def execute(uncertain):
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+
+        self.__in_transaction(execute)
+
+    def __in_transaction(self, attempt):
+        """Runs one attempt inside the open transaction, marking the transaction aborted on a transient error."""
+        if self.__local.aborted:
+            raise TransientError("Transaction was aborted by a deadlock or lost connection, it has to be run again")
         try:
-            with self.__connection.cursor() as cursor:
-                sql = "SELECT * FROM tasks"
-                conditions = []
-                values = []
-                
-                if filter_by:
-                    if "status" in filter_by:
-                        conditions.append("status = %s")
-                        values.append(filter_by["status"])
-                    if "priority" in filter_by:
-                        conditions.append("priority = %s")
-                        values.append(filter_by["priority"])
-                    if "due_date" in filter_by:
-                        conditions.append("due_date = %s")
-                        values.append(filter_by["due_date"])
-                
-                if conditions:
-                    sql += " WHERE " + " AND ".join(conditions)
-                
-                cursor.execute(sql, tuple(values))
-                rows = cursor.fetchall()
-                return [Task(row["title"], row["description"], row["due_date"].strftime("%Y-%m-%d"), row["priority"], row["status"], row["task_id"], row["creation_timestamp"]) for row in rows]
-        except pymysql.MySQLError as e:
-            print(f"Database error: {e}")
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-        return []
+            return NO_RETRY.run(attempt, translate_mysql_error)
+        except TransientError:
+            self.__local.aborted = True
+            raise
+
+    def __run(self, work, idempotent: bool = True, cursor_class=None, transaction: bool = False):
+        """
+        Runs work(cursor, uncertain) on a pooled connection under the retry policy, or on the
+        connection of the calling thread's open transaction without retrying.
+        :param idempotent: Whether the work may be repeated after an attempt with an unknown outcome.
+        :param cursor_class: pymysql cursor class, None for the connection default (DictCursor).
+        :param transaction: Run the work atomically: inside BEGIN/COMMIT, or a savepoint of the open transaction.
+        """
+        connection = getattr(self.__local, "connection", None)
+        if connection is not None:
+            def attempt_in_transaction(uncertain):
+                with connection.cursor(cursor_class) as cursor:
+                    if not transaction:
+                        return work(cursor, uncertain)
+                    with self.__savepoint(connection):
+                        return work(cursor, uncertain)
+
+            return self.__in_transaction(attempt_in_transaction)
+
+        def attempt(uncertain):
+            with self.__pool.connection() as connection, connection.cursor(cursor_class) as cursor:
+                if not transaction:
+                    return work(cursor, uncertain)
+                connection.begin()
+                result = work(cursor, uncertain)
+                connection.commit()
+                return result
+
+        return self.__retry.run(attempt, translate_mysql_error, idempotent)
+
+    def add_task(self, task: Task):
+        """
+        Inserts a task and assigns its new task_id. The INSERT is not idempotent, so it is only
+        retried after errors that guarantee it was not applied.
+        """
+        def insert(cursor, uncertain):
+            cursor.execute(INSERT_TASK, (task.title, task.description, task.due_date, task.priority, task.status, task.creation_timestamp))
+            task._task_id = cursor.lastrowid
+            task._version = 1
+
+        self.__run(insert, idempotent=False)
+
+    def add_tasks(self, tasks, chunk_size: int = 1000):
+        """
+        Inserts tasks in chunks. Each chunk is a single executemany call, which pymysql
+        rewrites into multi-row INSERT ... VALUES statements, inside one transaction.
+        A failing chunk is rolled back and reported, the remaining chunks still run.
+        Ids are not assigned back to the Task objects, multi-row inserts do not
+        guarantee consecutive auto-increment values.
+        :param tasks: Iterable of Task objects.
+        :param chunk_size: Number of tasks per chunk.
+        :return: List of per-chunk reports (chunk, count, inserted, error).
+        """
+        reports = []
+        iterator = iter(tasks)
+        chunk_number = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            chunk_number += 1
+            report = {"chunk": chunk_number, "count": len(chunk), "inserted": 0, "error": None}
+            rows = [(task.title, task.description, task.due_date, task.priority, task.status, task.creation_timestamp) for task in chunk]
+            try:
+                self.__run(lambda cursor, uncertain: cursor.executemany(INSERT_TASK, rows), idempotent=False, transaction=True)
+                report["inserted"] = len(chunk)
+            except RepositoryError as e:
+                report["error"] = str(e)
+            reports.append(report)
+        return reports
+
+    def get_task(self, task_id: int):
+        def fetch(cursor, uncertain):
+            cursor.execute(SELECT_TASKS + " WHERE task_id = %s", (task_id,))
+            row = cursor.fetchone()
+            return Task.from_row(row) if row else None
+
+        return self.__run(fetch)
+
+    def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        """
+        Lists tasks in task_id order, one keyset page at a time.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param after_id: task_id of the last task of the previous page, None for the first page.
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :return: List of Task objects.
+        """
+        where, values = build_filter_clause(filter_by, after_id)
+        sql = SELECT_TASKS + where + " ORDER BY task_id"
+        if limit is not None:
+            sql += " LIMIT %s"
+            values.append(limit)
+
+        def fetch(cursor, uncertain):
+            cursor.execute(sql, tuple(values))
+            return [Task.from_tuple(row) for row in cursor.fetchall()]
+
+        return self.__run(fetch, cursor_class=pymysql.cursors.Cursor)
+
+    def query_tasks(self, query):
+        """
+        Runs a TaskQuery. Filtering, ordering and paging happen on the server and only the
+        projected columns are transferred.
+        :param query: TaskQuery instance.
+        :return: List of Task objects.
+        """
+        sql, values = build_query(query)
+
+        def fetch(cursor, uncertain):
+            cursor.execute(sql, tuple(values))
+            return [Task.from_columns(query.columns, row) for row in cursor.fetchall()]
+
+        return self.__run(fetch, cursor_class=pymysql.cursors.Cursor)
+
+    def search_tasks(self, text: str, filter_by: dict = None, limit: int = None):
+        """
+        Full-text search through the FULLTEXT(title, description) index, in natural
+        language mode and ordered by relevance. Needs setup_database migration 3.
+        :param text: Search words.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :return: List of Task objects.
+        """
+        conditions, values = build_filter_conditions(filter_by)
+        sql = SEARCH_TASKS + " WHERE " + " AND ".join([MATCH_TEXT] + conditions) + " ORDER BY score DESC, task_id"
+        values = [text, text] + values
+        if limit is not None:
+            sql += " LIMIT %s"
+            values.append(limit)
+
+        def fetch(cursor, uncertain):
+            cursor.execute(sql, tuple(values))
+            return [Task.from_tuple(row) for row in cursor.fetchall()]
+
+        return self.__run(fetch, cursor_class=pymysql.cursors.Cursor)
+
+    def get_stats(self, today=None):
+        """
+        Computes the dashboard statistics with two GROUP BY queries, both answered from indexes.
+        :param today: Reference date for overdue and the due buckets, defaults to date.today().
+        :return: Dictionary as built by task_stats.build_stats.
+        """
+        today = today or date.today()
+        sql, values = build_due_histogram_query(today)
+
+        def fetch(cursor, uncertain):
+            cursor.execute(STATS_BY_STATUS_PRIORITY)
+            grid_rows = cursor.fetchall()
+            cursor.execute(sql, tuple(values))
+            return build_stats(grid_rows, cursor.fetchall(), today)
+
+        return self.__run(fetch, cursor_class=pymysql.cursors.Cursor)
+
+    def iter_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        """
+        Streams tasks in task_id order through an unbuffered SSCursor, fetching chunk_size rows at a time.
+        Memory stays flat regardless of table size. The connection is busy until the generator
+        is exhausted or closed. A transient error mid-stream resumes after the last task yielded.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param chunk_size: Number of rows fetched per round trip.
+        :return: Generator of Task objects.
+        """
+        if getattr(self.__local, "connection", None) is not None:
+            # An unbuffered result would tie up the transaction's connection, so page instead.
+            yield from self.__iter_pages(filter_by, chunk_size)
+            return
+        last_id = None
+        attempt = 1
+        while True:
+            where, values = build_filter_clause(filter_by, last_id)
+            sql = SELECT_TASKS + where + " ORDER BY task_id"
+            resumed_from = last_id
+            try:
+                with self.__pool.connection() as connection, connection.cursor(pymysql.cursors.SSCursor) as cursor:
+                    cursor.execute(sql, tuple(values))
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            return
+                        for row in rows:
+                            task = Task.from_tuple(row)
+                            last_id = task.task_id
+                            yield task
+            except Exception as e:
+                attempt = 1 if last_id != resumed_from else attempt
+                self.__retry.backoff(e, translate_mysql_error, attempt)
+                attempt += 1
+
+    def __iter_pages(self, filter_by: dict, chunk_size: int):
+        after_id = None
+        while True:
+            tasks = self.list_tasks(filter_by, after_id, chunk_size)
+            yield from tasks
+            if len(tasks) < chunk_size:
+                return
+            after_id = tasks[-1].task_id
+
+    def next_tasks(self, k: int = 10, filter_by: dict = None):
+        """
+        Ranks the open tasks with one query per status, each reading its first k rows in order
+        from the (status, priority DESC, due_date) index of setup_database migration 6. MySQL
+        sorts the priority ENUM by declaration order, so the ENUM itself is the rank column.
+        :param k: Maximum number of tasks returned.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :return: List of Task objects, highest priority first, then by due date.
+        """
+        return top_ranked([self.query_tasks(query.replace(limit=k)) for query in next_queries(filter_by)], k)
+
+    def changes_since(self, cursor: int = 0, limit: int = 1000):
+        """
+        Reads the task_changes log written by the triggers of setup_database migration 5.
+        change_id comes from AUTO_INCREMENT, which is assigned at write time but becomes visible
+        at commit, so a lower id may still appear behind a higher one; ChangeSubscriber waits
+        for such gaps before moving its checkpoint past them.
+        :param cursor: change_id of the last change already processed, 0 to start from the beginning.
+        :param limit: Maximum number of changes returned.
+        :return: List of TaskChange objects ordered by change_id.
+        """
+        def fetch(db_cursor, uncertain):
+            db_cursor.execute(SELECT_CHANGES + " WHERE change_id > %s ORDER BY change_id LIMIT %s", (cursor, limit))
+            return [TaskChange.from_tuple(row) for row in db_cursor.fetchall()]
+
+        return self.__run(fetch, cursor_class=pymysql.cursors.Cursor)
+
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        """
+        Claims up to n Pending tasks in one transaction. SELECT ... FOR UPDATE SKIP LOCKED (MySQL 8.0+)
+        locks the next tasks in claim order, read from the idx_tasks_claim index of setup_database
+        migration 6, and skips the rows other workers are claiming right now instead of queueing
+        behind them; the tasks are then set In Progress and recorded in task_claims.
+        Claiming is not idempotent, so it is only retried after errors that guarantee nothing was
+        claimed. If the outcome of an attempt is unknown the claims may exist without the worker
+        knowing, they return to Pending once their lease expires.
+        :param worker_id: Identifier of the claiming worker.
+        :param n: Maximum number of tasks claimed.
+        :param priority_order: Claim by priority (High first) then due date, otherwise by due date alone.
+        :param lease_seconds: Seconds until the claim expires unless renewed.
+        :return: List of the claimed Task objects, in claim order.
+        """
+        if n <= 0:
+            return []
+        lease = int(lease_seconds * 1_000_000)
+        sql, values = build_query(claim_query(priority_order).replace(limit=n))
+        sql += " FOR UPDATE SKIP LOCKED"
+
+        def claim(cursor, uncertain):
+            cursor.execute(sql, tuple(values))
+            tasks = [Task.from_tuple(row) for row in cursor.fetchall()]
+            for where, ids in build_bulk_targets([task.task_id for task in tasks]):
+                cursor.execute("UPDATE tasks SET status = 'In Progress', version = version + 1" + where, tuple(ids))
+                cursor.execute(CLAIM_TASKS.format(where=where), tuple([worker_id, lease] + ids + [worker_id, lease]))
+            for task in tasks:
+                task._status = "In Progress"
+                task._version += 1
+            return tasks
+
+        return self.__run(claim, idempotent=False, cursor_class=pymysql.cursors.Cursor, transaction=True)
+
+    def renew_claims(self, worker_id: str, task_ids=None, lease_seconds: float = 300.0):
+        """
+        Extends the leases of the claims worker_id still holds, in one transaction. Renewing only
+        touches task_claims, so heartbeats neither bump task versions nor fill the change log.
+        :return: Sorted list of the renewed task ids.
+        """
+        lease = int(lease_seconds * 1_000_000)
+        targets = [("", [])] if task_ids is None else build_bulk_targets(task_ids)
+        targets = [(where.replace(" WHERE", " AND"), ids) for where, ids in targets]
+
+        def renew(cursor, uncertain):
+            renewed = []
+            for where, ids in targets:
+                cursor.execute("UPDATE task_claims SET lease_expires_at = " + LEASE_EXPIRY + " WHERE worker_id = %s" + where,
+                               tuple([lease, worker_id] + ids))
+                cursor.execute("SELECT task_id FROM task_claims WHERE worker_id = %s" + where, tuple([worker_id] + ids))
+                renewed += [row[0] for row in cursor.fetchall()]
+            return sorted(renewed)
+
+        return self.__run(renew, cursor_class=pymysql.cursors.Cursor, transaction=True)
+
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        """
+        Sets the status of the given tasks still claimed by worker_id and deletes their claims,
+        in one transaction. A claim that was reaped in the meantime is left to its new owner.
+        :return: Sorted list of the released task ids.
+        """
+        targets = build_bulk_targets(task_ids)
+
+        def release(cursor, uncertain):
+            held = []
+            for where, ids in targets:
+                cursor.execute("SELECT task_id FROM task_claims" + where + " AND worker_id = %s FOR UPDATE",
+                               tuple(ids + [worker_id]))
+                held += [row[0] for row in cursor.fetchall()]
+            for where, ids in build_bulk_targets(held):
+                cursor.execute("UPDATE tasks SET status = %s, version = version + 1" + where, tuple([status] + ids))
+                cursor.execute("DELETE FROM task_claims" + where, tuple(ids))
+            return sorted(held)
+
+        return self.__run(release, idempotent=False, cursor_class=pymysql.cursors.Cursor, transaction=True)
+
+    def reap_expired_claims(self, limit: int = 1000):
+        """
+        Deletes up to limit expired claims and puts their tasks back to Pending, in one transaction.
+        The expired claims are locked with SKIP LOCKED, so several reapers split the work and a
+        claim being renewed or released right now is left for the next pass.
+        :return: Sorted list of the task ids whose claims were removed.
+        """
+        def reap(cursor, uncertain):
+            cursor.execute(SELECT_EXPIRED_CLAIMS, (limit,))
+            expired = [row[0] for row in cursor.fetchall()]
+            for where, ids in build_bulk_targets(expired):
+                cursor.execute("UPDATE tasks SET status = 'Pending', version = version + 1" + where + " AND status = 'In Progress'",
+                               tuple(ids))
+                cursor.execute("DELETE FROM task_claims" + where, tuple(ids))
+            return sorted(expired)
+
+        return self.__run(reap, cursor_class=pymysql.cursors.Cursor, transaction=True)
+
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        """
+        Moves up to limit Completed tasks due before completed_before into tasks_archive
+        (setup_database migration 7), in one transaction. The batch is found through the
+        (status, due_date) index and locked with SKIP LOCKED, so the move holds row locks on
+        limit tasks only and never waits for, or blocks, writers of other tasks. A retried
+        attempt picks the next batch, tasks already moved are no longer in tasks.
+        :return: Sorted list of the archived task ids.
+        """
+        def archive(cursor, uncertain):
+            cursor.execute(SELECT_ARCHIVABLE, (completed_before, limit))
+            archived = [row[0] for row in cursor.fetchall()]
+            for where, ids in build_bulk_targets(archived):
+                cursor.execute(ARCHIVE_TASKS + where, tuple(ids))
+                cursor.execute("DELETE FROM tasks" + where, tuple(ids))
+                cursor.execute("DELETE FROM task_claims" + where, tuple(ids))
+            return sorted(archived)
+
+        return self.__run(archive, cursor_class=pymysql.cursors.Cursor, transaction=True)
+
+    def get_archived_task(self, task_id: int):
+        def fetch(cursor, uncertain):
+            cursor.execute(SELECT_ARCHIVED_TASKS + " WHERE task_id = %s", (task_id,))
+            row = cursor.fetchone()
+            return Task.from_row(row) if row else None
+
+        return self.__run(fetch)
+
+    def list_archived_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        where, values = build_filter_clause(filter_by, after_id)
+        sql = SELECT_ARCHIVED_TASKS + where + " ORDER BY task_id"
+        if limit is not None:
+            sql += " LIMIT %s"
+            values.append(limit)
+
+        def fetch(cursor, uncertain):
+            cursor.execute(sql, tuple(values))
+            return [Task.from_tuple(row) for row in cursor.fetchall()]
+
+        return self.__run(fetch, cursor_class=pymysql.cursors.Cursor)
+
+    def export_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        """
+        Streams tasks for export, see iter_tasks.
+        :param filter_by: Dictionary with filter conditions (status, priority, due date).
+        :param chunk_size: Number of rows fetched per round trip.
+        :return: Generator of Task objects.
+        """
+        return self.iter_tasks(filter_by, chunk_size)
+
+    def __write_task(self, task_id: int, sql: str, values: tuple, expected_version: int = None):
+        """
+        Runs a single-task write, raising NotFoundError when no row matched, or VersionConflictError
+        when the statement is conditional on expected_version and the task has another version.
+        A conditional write is not idempotent (a lost attempt that was applied changed the version),
+        so it is only retried after errors that guarantee it was not applied.
+        """
+        def write(cursor, uncertain):
+            # A repeated DELETE finds nothing if the lost attempt was applied after all.
+            if cursor.execute(sql, values) or uncertain:
+                return
+            if expected_version is not None:
+                cursor.execute("SELECT version FROM tasks WHERE task_id = %s", (task_id,))
+                row = cursor.fetchone()
+                if row is not None:
+                    raise VersionConflictError(task_id, expected_version, row["version"])
+            raise NotFoundError(f"Task {task_id} not found")
+
+        self.__run(write, idempotent=expected_version is None)
 
     def update_task_status(self, task_id: int, new_status: str):
-        try:
-            with self.__connection.cursor() as cursor:
-                sql = "UPDATE tasks SET status = %s WHERE task_id = %s"
-                cursor.execute(sql, (new_status, task_id))
-                self.__connection.commit()
-        except pymysql.MySQLError as e:
-            print(f"Database error: {e}")
-            self.__connection.rollback()
-        except Exception as e:
-            print(f"Unexpected error: {e}")
+        self.__write_task(task_id, "UPDATE tasks SET status = %s, version = version + 1 WHERE task_id = %s",
+                          (new_status, task_id))
     
-    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str):
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
         """
         Updates the details of an existing task.
         :param task_id: Unique identifier of the task.
@@ -89,27 +559,51 @@ class TaskManager(ITaskRepository):
         :param description: New description of the task.
         :param due_date: New due date of the task in YYYY-MM-DD format.
         :param priority: New priority level of the task.
+        :param expected_version: Only update the task if it still has this version.
         """
-        try:
-            with self.__connection.cursor() as cursor:
-                sql = """UPDATE tasks SET title = %s, description = %s, due_date = %s, priority = %s
-                         WHERE task_id = %s"""
-                cursor.execute(sql, (title, description, due_date, priority, task_id))
-                self.__connection.commit()
-        except pymysql.MySQLError as e:
-            print(f"Database error: {e}")
-            self.__connection.rollback()
-        except Exception as e:
-            print(f"Unexpected error: {e}")
+        self.update_task_fields(task_id, {"title": title, "description": description, "due_date": due_date,
+                                          "priority": priority}, expected_version)
+
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        """
+        Writes only the given detail fields of a task, with UPDATE ... WHERE task_id = %s AND version = %s
+        when expected_version is given, so concurrent editors never overwrite each other without locks.
+        :param task_id: Unique identifier of the task.
+        :param changes: Mapping of field (title, description, due_date, priority) to new value.
+        :param expected_version: Only update the task if it still has this version.
+        """
+        set_clause, values = build_set_clause(changes)
+        sql = "UPDATE tasks" + set_clause + " WHERE task_id = %s"
+        values.append(task_id)
+        if expected_version is not None:
+            sql += " AND version = %s"
+            values.append(expected_version)
+        self.__write_task(task_id, sql, tuple(values), expected_version)
                
     def delete_task(self, task_id: int):
-        try:
-            with self.__connection.cursor() as cursor:
-                sql = "DELETE FROM tasks WHERE task_id = %s"
-                cursor.execute(sql, (task_id,))
-                self.__connection.commit()
-        except pymysql.MySQLError as e:
-            print(f"Database error: {e}")
-            self.__connection.rollback()
-        except Exception as e:
-            print(f"Unexpected error: {e}")
\ No newline at end of file
+        self.__write_task(task_id, "DELETE FROM tasks WHERE task_id = %s", (task_id,))
+
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__execute_bulk("UPDATE tasks SET status = %s, version = version + 1", [new_status],
+                                   task_ids, filter_by, chunk_size)
+
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        set_clause, set_values = build_set_clause(changes)
+        return self.__execute_bulk("UPDATE tasks" + set_clause, set_values, task_ids, filter_by, chunk_size)
+
+    def delete_bulk(self, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self.__execute_bulk("DELETE FROM tasks", [], task_ids, filter_by, chunk_size)
+
+    def __execute_bulk(self, statement: str, statement_values: list, task_ids, filter_by: dict, chunk_size: int):
+        """
+        Runs a set-based UPDATE/DELETE, as one statement for a filter or as chunked
+        IN (...) statements for explicit ids, all inside a single transaction.
+        Setting the same values again is harmless, so the transaction is retried as a whole.
+        :return: Number of affected (matched) rows.
+        """
+        targets = build_bulk_targets(task_ids, filter_by, chunk_size)
+
+        def write(cursor, uncertain):
+            return sum(cursor.execute(statement + where, tuple(statement_values + values)) for where, values in targets)
+
+        return self.__run(write, transaction=True)
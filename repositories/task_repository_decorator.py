@@ -0,0 +1,102 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.task import Task
+from interfaces.Itask_repository import ITaskRepository
+
+class TaskRepositoryDecorator(ITaskRepository):
+    """
+    Base class for repositories that wrap another ITaskRepository.
+    Every method is forwarded to the wrapped repository, subclasses override only what they add to.
+    """
+
+    def __init__(self, task_repository: ITaskRepository):
+        """
+        Initializes the decorator.
+        :param task_repository: The repository being wrapped.
+        """
+        self._inner = task_repository
+
+    def add_task(self, task: Task):
+        return self._inner.add_task(task)
+
+    def add_tasks(self, tasks, chunk_size: int = 1000):
+        return self._inner.add_tasks(tasks, chunk_size)
+
+    def get_task(self, task_id: int):
+        return self._inner.get_task(task_id)
+
+    def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        return self._inner.list_tasks(filter_by, after_id, limit)
+
+    def query_tasks(self, query):
+        return self._inner.query_tasks(query)
+
+    def search_tasks(self, text: str, filter_by: dict = None, limit: int = None):
+        return self._inner.search_tasks(text, filter_by, limit)
+
+    def get_stats(self, today=None):
+        return self._inner.get_stats(today)
+
+    def next_tasks(self, k: int = 10, filter_by: dict = None):
+        return self._inner.next_tasks(k, filter_by)
+
+    def iter_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        return self._inner.iter_tasks(filter_by, chunk_size)
+
+    def export_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        return self._inner.export_tasks(filter_by, chunk_size)
+
+    def changes_since(self, cursor: int = 0, limit: int = 1000):
+        return self._inner.changes_since(cursor, limit)
+
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
+        return self._inner.update_task_details(task_id, title, description, due_date, priority, expected_version)
+
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        return self._inner.update_task_fields(task_id, changes, expected_version)
+
+    def update_task_status(self, task_id: int, new_status: str):
+        return self._inner.update_task_status(task_id, new_status)
+
+    def delete_task(self, task_id: int):
+        return self._inner.delete_task(task_id)
+
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self._inner.update_status_bulk(new_status, task_ids, filter_by, chunk_size)
+
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self._inner.update_details_bulk(changes, task_ids, filter_by, chunk_size)
+
+    def delete_bulk(self, task_ids=None, filter_by: dict = None, chunk_size: int = 1000):
+        return self._inner.delete_bulk(task_ids, filter_by, chunk_size)
+
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        return self._inner.claim_tasks(worker_id, n, priority_order, lease_seconds)
+
+    def renew_claims(self, worker_id: str, task_ids=None, lease_seconds: float = 300.0):
+        return self._inner.renew_claims(worker_id, task_ids, lease_seconds)
+
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        return self._inner.release_claims(worker_id, task_ids, status)
+
+    def reap_expired_claims(self, limit: int = 1000):
+        return self._inner.reap_expired_claims(limit)
+
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        return self._inner.archive_tasks(completed_before, limit)
+
+    def get_archived_task(self, task_id: int):
+        return self._inner.get_archived_task(task_id)
+
+    def list_archived_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        return self._inner.list_archived_tasks(filter_by, after_id, limit)
+
+    def transaction(self):
+        return self._inner.transaction()
+
+    def close(self):
+        return self._inner.close()
@@ -0,0 +1,55 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import date, timedelta
+from models.task_query import PRIORITY_RANKS, STATUS_RANKS
+
+# Due date buckets of the open (not completed) tasks, relative to today.
+DUE_BUCKETS = ("overdue", "today", "next_7_days", "next_30_days", "later")
+
+def due_bucket(due_date: date, today: date):
+    """
+    Returns the DUE_BUCKETS entry a due date falls into.
+    :param due_date: Due date of a task.
+    :param today: Reference date.
+    """
+    days = (due_date - today).days
+    if days < 0:
+        return "overdue"
+    if days == 0:
+        return "today"
+    if days <= 7:
+        return "next_7_days"
+    if days <= 30:
+        return "next_30_days"
+    return "later"
+
+def bucket_bounds(today: date):
+    """Last day of the today, next_7_days and next_30_days buckets, for SQL CASE expressions."""
+    return today, today + timedelta(days=7), today + timedelta(days=30)
+
+def build_stats(grid_rows, bucket_rows, today: date):
+    """
+    Assembles the get_stats dictionary from grouped counts.
+    :param grid_rows: Iterable of (status, priority, count).
+    :param bucket_rows: Iterable of (bucket, count) over the open tasks.
+    :param today: Reference date of the due buckets.
+    :return: Dictionary with total, by_status, by_priority, by_status_priority, overdue, due and as_of.
+    """
+    grid = {status: {priority: 0 for priority in PRIORITY_RANKS} for status in STATUS_RANKS}
+    for status, priority, count in grid_rows:
+        grid[status][priority] += count
+    due = dict.fromkeys(DUE_BUCKETS, 0)
+    for bucket, count in bucket_rows:
+        due[bucket] += count
+    return {
+        "as_of": today.isoformat(),
+        "total": sum(sum(row.values()) for row in grid.values()),
+        "by_status": {status: sum(row.values()) for status, row in grid.items()},
+        "by_priority": {priority: sum(grid[status][priority] for status in grid) for priority in PRIORITY_RANKS},
+        "by_status_priority": grid,
+        "overdue": due["overdue"],
+        "due": due,
+    }
@@ -0,0 +1,65 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from models.task import Task
+from interfaces.Itask_repository import ITaskRepository
+from interfaces.Iasync_task_repository import IAsyncTaskRepository
+
+class ThreadedAsyncTaskRepository(IAsyncTaskRepository):
+    """
+    Exposes a blocking ITaskRepository (SQLite, in-memory, ...) as an IAsyncTaskRepository
+    by running each call on a dedicated thread pool, so the local backends work offline
+    without an async driver. max_concurrency bounds both the threads and the calls in flight.
+    Blocking calls cannot be interrupted: a cancelled coroutine stops waiting, but the call
+    it started still runs to completion in its thread.
+    """
+
+    def __init__(self, task_repository: ITaskRepository, max_concurrency: int = 8):
+        """
+        :param task_repository: The blocking repository being wrapped.
+        :param max_concurrency: Number of worker threads and maximum calls in flight.
+        """
+        self.__repository = task_repository
+        self.__executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tasks-async")
+
+    async def __call(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, method, *args)
+
+    async def add_task(self, task: Task):
+        return await self.__call(self.__repository.add_task, task)
+
+    async def add_tasks(self, tasks, chunk_size: int = 1000):
+        return await self.__call(self.__repository.add_tasks, list(tasks), chunk_size)
+
+    async def get_task(self, task_id: int):
+        return await self.__call(self.__repository.get_task, task_id)
+
+    async def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        return await self.__call(self.__repository.list_tasks, filter_by, after_id, limit)
+
+    async def iter_tasks(self, filter_by: dict = None, chunk_size: int = 1000):
+        after_id = None
+        while True:
+            page = await self.list_tasks(filter_by, after_id, chunk_size)
+            for task in page:
+                yield task
+            if len(page) < chunk_size:
+                return
+            after_id = page[-1].task_id
+
+    async def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str):
+        return await self.__call(self.__repository.update_task_details, task_id, title, description, due_date, priority)
+
+    async def update_task_status(self, task_id: int, new_status: str):
+        return await self.__call(self.__repository.update_task_status, task_id, new_status)
+
+    async def delete_task(self, task_id: int):
+        return await self.__call(self.__repository.delete_task, task_id)
+
+    async def close(self):
+        self.__executor.shutdown(wait=True)
+        self.__repository.close()
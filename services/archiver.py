@@ -0,0 +1,47 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import date, timedelta
+from services.periodic_job import PeriodicJob
+
+class TaskArchiver(PeriodicJob):
+    """
+    Moves Completed tasks whose due date is more than retention_days in the past to the
+    archive, every interval seconds. Each pass moves batch_size tasks per transaction and
+    pauses between batches, so the locks are short and the writes are spread out instead of
+    competing with the application's traffic for the whole backlog at once.
+    """
+
+    def __init__(self, task_service, retention_days: int = 90, batch_size: int = 500, pause: float = 0.1,
+                 interval: float = 3600.0, max_batches: int = None):
+        """
+        :param task_service: TaskService (or repository) providing archive_tasks.
+        :param retention_days: Completed tasks due at least this many days ago are archived.
+        :param batch_size: Maximum number of tasks moved per transaction.
+        :param pause: Seconds to wait between two batches of a pass.
+        :param interval: Seconds between passes.
+        :param max_batches: Maximum number of batches per pass, None to drain the backlog.
+        """
+        super().__init__(interval, "task-archiver")
+        self.__task_service = task_service
+        self.__retention_days = retention_days
+        self.__batch_size = batch_size
+        self.__pause = pause
+        self.__max_batches = max_batches
+
+    def step(self):
+        """
+        Archives batches until one is not full, max_batches is reached or the job is stopped.
+        :return: Sorted list of the archived task ids.
+        """
+        completed_before = date.today() - timedelta(days=self.__retention_days)
+        archived = []
+        batches = 0
+        while True:
+            batch = self.__task_service.archive_tasks(completed_before, self.__batch_size)
+            archived += batch
+            batches += 1
+            if len(batch) < self.__batch_size or batches == self.__max_batches or not self.pause(self.__pause):
+                return sorted(archived)
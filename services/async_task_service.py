@@ -0,0 +1,95 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from models.task import Task
+from interfaces.Iasync_task_repository import IAsyncTaskRepository
+from interfaces.Iasync_task_service import IAsyncTaskService
+
+class AsyncTaskService(IAsyncTaskService):
+    """
+    Asyncio service class for managing tasks, the counterpart of TaskService for
+    embedding in an asyncio web service. Calls made concurrently are pipelined over the
+    repository's connections, which bounds how many run at once.
+    """
+
+    def __init__(self, task_repository: IAsyncTaskRepository):
+        """
+        Initializes AsyncTaskService with an async repository.
+        :param task_repository: Any IAsyncTaskRepository implementation.
+        """
+        self.__task_repository = task_repository
+
+    async def create_task(self, title: str, description: str, due_date: str, priority: str):
+        """
+        Creates a new task and adds it to the repository.
+        :param title: Title of the task.
+        :param description: Description of the task.
+        :param due_date: Due date of the task in YYYY-MM-DD format.
+        :param priority: Priority level of the task (Low, Medium, High).
+        :return: The created Task object.
+        """
+        task = Task(title, description, due_date, priority)
+        await self.__task_repository.add_task(task)
+        return task
+
+    async def get_task(self, task_id: int):
+        """
+        Retrieves a task by its ID.
+        :param task_id: Unique identifier of the task.
+        :return: Task object if found, otherwise None.
+        """
+        return await self.__task_repository.get_task(task_id)
+
+    async def get_tasks(self, task_ids):
+        """
+        Retrieves many tasks concurrently, the lookups are pipelined over the pool.
+        :param task_ids: Iterable of task IDs.
+        :return: List of Task objects (or None for missing ids) in the order of task_ids.
+        """
+        return list(await asyncio.gather(*(self.__task_repository.get_task(task_id) for task_id in task_ids)))
+
+    async def list_tasks(self, filter_by: dict = None, after_id: int = None, limit: int = None):
+        """
+        Lists tasks with optional filtering by status, priority, or due date, one page at a time.
+        :param filter_by: Dictionary containing filter conditions.
+        :param after_id: task_id of the last task of the previous page, None for the first page.
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :return: List of Task objects.
+        """
+        return await self.__task_repository.list_tasks(filter_by, after_id, limit)
+
+    def iter_tasks(self, filter_by: dict = None):
+        """
+        Streams all matching tasks without loading them into memory at once.
+        :param filter_by: Dictionary containing filter conditions.
+        :return: Async generator of Task objects.
+        """
+        return self.__task_repository.iter_tasks(filter_by)
+
+    async def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str):
+        """
+        Updates the details of an existing task.
+        :param task_id: Unique identifier of the task.
+        :param title: New title of the task.
+        :param description: New description of the task.
+        :param due_date: New due date of the task.
+        :param priority: New priority level of the task.
+        """
+        await self.__task_repository.update_task_details(task_id, title, description, due_date, priority)
+
+    async def mark_task_completed(self, task_id: int):
+        """
+        Marks a task as completed by updating its status.
+        :param task_id: Unique identifier of the task.
+        """
+        await self.__task_repository.update_task_status(task_id, "Completed")
+
+    async def delete_task(self, task_id: int):
+        """
+        Deletes a task from the repository.
+        :param task_id: Unique identifier of the task to be deleted.
+        """
+        await self.__task_repository.delete_task(task_id)
@@ -0,0 +1,119 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+import time
+from repositories.errors import TransientError
+
+class ChangeSubscriber:
+    """
+    Follows the task change log and hands the changes to a handler in change_id order,
+    batch by batch, so a mirror only applies deltas instead of rescanning the tasks table.
+    The checkpoint, the change_id of the last change handled, is saved to a file after
+    every batch the handler accepted. A restarted subscriber resumes from it, so each change
+    is delivered at least once: a batch whose handler raised, or whose checkpoint was not
+    saved before a crash, is delivered again and the handler must tolerate repeats (apply
+    the task snapshot by task_id and version).
+    MySQL makes a change_id visible only when its transaction commits, so a gap in the ids
+    may still be filled by a slower writer. Delivery stops at a gap until it is older than
+    gap_timeout seconds, after which it is taken as a rolled back write and skipped.
+    """
+
+    def __init__(self, task_service, handler, checkpoint_path: str = None, cursor: int = 0, batch_size: int = 1000,
+                 poll_interval: float = 1.0, gap_timeout: float = 5.0):
+        """
+        :param task_service: TaskService (or repository) providing changes_since.
+        :param handler: Callable receiving each batch as a list of TaskChange objects.
+        :param checkpoint_path: File keeping the checkpoint, None to keep it in memory only.
+        :param cursor: Checkpoint to start from while checkpoint_path does not exist yet.
+        :param batch_size: Maximum number of changes read and handled at once.
+        :param poll_interval: Seconds run() sleeps when it has caught up.
+        :param gap_timeout: Seconds to wait for a missing change_id, 0 to never wait.
+        """
+        self.__task_service = task_service
+        self.__handler = handler
+        self.__checkpoint_path = checkpoint_path
+        self.__batch_size = batch_size
+        self.__poll_interval = poll_interval
+        self.__gap_timeout = gap_timeout
+        self.__cursor = self.__load_checkpoint(cursor)
+        self.__gap = None
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    @property
+    def cursor(self):
+        """change_id of the last change handled."""
+        return self.__cursor
+
+    def __load_checkpoint(self, default: int):
+        if self.__checkpoint_path is None or not os.path.exists(self.__checkpoint_path):
+            return default
+        with open(self.__checkpoint_path, encoding="utf-8") as file:
+            return int(file.read().strip() or default)
+
+    def __save_checkpoint(self):
+        if self.__checkpoint_path is None:
+            return
+        temporary = f"{self.__checkpoint_path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(f"{self.__cursor}\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.__checkpoint_path)
+
+    def __gap_expired(self, missing_id: int):
+        if self.__gap is None or self.__gap[0] != missing_id:
+            self.__gap = (missing_id, time.monotonic())
+        return time.monotonic() - self.__gap[1] >= self.__gap_timeout
+
+    def __ready(self, changes):
+        """Returns the leading changes that follow the cursor without an unexpired gap."""
+        expected = self.__cursor + 1
+        for position, change in enumerate(changes):
+            if change.change_id != expected and not self.__gap_expired(expected):
+                return changes[:position]
+            expected = change.change_id + 1
+        return changes
+
+    def poll(self):
+        """
+        Reads the next batch of changes, hands it to the handler and saves the checkpoint.
+        :return: Number of changes handled.
+        """
+        changes = self.__ready(self.__task_service.changes_since(self.__cursor, self.__batch_size))
+        if not changes:
+            return 0
+        self.__handler(changes)
+        self.__cursor = changes[-1].change_id
+        self.__gap = None
+        self.__save_checkpoint()
+        return len(changes)
+
+    def run(self):
+        """
+        Polls until stop() is called, sleeping poll_interval whenever it has caught up.
+        A TransientError only delays the next poll, other errors end the loop.
+        """
+        while not self.__stop.is_set():
+            try:
+                handled = self.poll()
+            except TransientError as e:
+                print(f"Change feed poll failed, retrying: {e}", file=sys.stderr)
+                handled = 0
+            if handled < self.__batch_size:
+                self.__stop.wait(self.__poll_interval)
+
+    def start(self):
+        """Runs the subscriber in a daemon thread until stop()."""
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.run, name="change-subscriber", daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
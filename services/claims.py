@@ -0,0 +1,91 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+from services.periodic_job import PeriodicJob
+
+class ClaimHeartbeat(PeriodicJob):
+    """
+    Keeps the claims of one worker alive while it works on them. Tasks are added with hold()
+    after claim_tasks and removed with drop() once released; every interval seconds their
+    leases are renewed. A task whose claim was reaped anyway (the worker stalled for longer
+    than the lease) is no longer held, it is dropped and passed to on_lost so the worker
+    can abandon it: another worker may already have claimed it.
+    """
+
+    def __init__(self, task_service, worker_id: str, lease_seconds: float = 300.0, interval: float = None, on_lost=None):
+        """
+        :param task_service: TaskService (or repository) providing renew_claims.
+        :param worker_id: Identifier of the worker, as passed to claim_tasks.
+        :param lease_seconds: Lease each renewal grants.
+        :param interval: Seconds between renewals, defaults to a third of the lease.
+        :param on_lost: Optional callable receiving the sorted ids of the claims found lost.
+        """
+        super().__init__(interval or lease_seconds / 3, "claim-heartbeat")
+        self.__task_service = task_service
+        self.__worker_id = worker_id
+        self.__lease_seconds = lease_seconds
+        self.__on_lost = on_lost
+        self.__held = set()
+        self.__lock = threading.Lock()
+
+    @property
+    def held(self):
+        """Sorted ids of the tasks being kept alive."""
+        with self.__lock:
+            return sorted(self.__held)
+
+    def hold(self, task_ids):
+        with self.__lock:
+            self.__held.update(int(task_id) for task_id in task_ids)
+
+    def drop(self, task_ids):
+        with self.__lock:
+            self.__held.difference_update(int(task_id) for task_id in task_ids)
+
+    def step(self):
+        """
+        Renews the leases of the held tasks.
+        :return: Sorted list of the ids whose claims were lost.
+        """
+        held = self.held
+        if not held:
+            return []
+        renewed = set(self.__task_service.renew_claims(self.__worker_id, held, self.__lease_seconds))
+        lost = [task_id for task_id in held if task_id not in renewed]
+        if lost:
+            self.drop(lost)
+            if self.__on_lost is not None:
+                self.__on_lost(lost)
+        return lost
+
+class ClaimReaper(PeriodicJob):
+    """
+    Puts the tasks of expired claims back to Pending every interval seconds, batch_size
+    claims per transaction. Several reapers may run against one database, each batch only
+    takes claims no other reaper is holding.
+    """
+
+    def __init__(self, task_service, interval: float = 10.0, batch_size: int = 1000):
+        """
+        :param task_service: TaskService (or repository) providing reap_expired_claims.
+        :param interval: Seconds between passes.
+        :param batch_size: Maximum number of claims removed per transaction.
+        """
+        super().__init__(interval, "claim-reaper")
+        self.__task_service = task_service
+        self.__batch_size = batch_size
+
+    def step(self):
+        """
+        Reaps batches until none is full.
+        :return: Sorted list of the task ids whose claims were removed.
+        """
+        reaped = []
+        while True:
+            batch = self.__task_service.reap_expired_claims(self.__batch_size)
+            reaped += batch
+            if len(batch) < self.__batch_size:
+                return sorted(reaped)
@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+from abc import ABC, abstractmethod
+from repositories.errors import TransientError
+
+class PeriodicJob(ABC):
+    """Calls step() every interval seconds in a daemon thread until stop(), surviving transient errors."""
+
+    def __init__(self, interval: float, name: str):
+        self.__interval = interval
+        self.__name = name
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    @abstractmethod
+    def step(self):
+        """
+        Does one pass of the job's work; run() calls it every interval seconds.
+        :return: What the pass did, e.g. the ids it handled.
+        """
+        pass
+
+    def run(self):
+        """
+        Runs step() every interval seconds until stop() is called.
+        A TransientError only delays the next step, other errors end the loop.
+        """
+        while not self.__stop.is_set():
+            try:
+                self.step()
+            except TransientError as e:
+                print(f"{self.__name} failed, retrying: {e}", file=sys.stderr)
+            self.__stop.wait(self.__interval)
+
+    def start(self):
+        """Runs the job in a daemon thread until stop()."""
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.run, name=self.__name, daemon=True)
+        self.__thread.start()
+
+    def pause(self, seconds: float):
+        """
+        Waits between two pieces of work inside step(), returning early once stop() is called.
+        :return: False if the job is stopping, True otherwise.
+        """
+        return not self.__stop.wait(seconds)
+
+    def stop(self):
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
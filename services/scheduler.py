@@ -0,0 +1,294 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import urllib.request
+from datetime import datetime, time, timedelta
+from heapq import heappush, heappop
+from models.task_query import TaskQuery
+from repositories.errors import TransientError, VersionConflictError
+from repositories.rank_index import OPEN_STATUSES
+from services.change_subscriber import ChangeSubscriber
+from services.periodic_job import PeriodicJob
+from services.task_io import EXPORT_FIELDS, task_to_record
+
+# Alert kinds and when they fire, relative to the start of the due date.
+DEFAULT_ALERTS = {"due_soon": timedelta(days=-1), "overdue": timedelta(days=1)}
+
+ALERT_FIELDS = ["key", "kind", "at"] + EXPORT_FIELDS
+
+class Deadline:
+    """One alert of one task: kind, the time it fired for and the task as re-read at firing."""
+
+    __slots__ = ("_kind", "_at", "_task")
+
+    def __init__(self, kind: str, at: datetime, task):
+        self._kind = kind
+        self._at = at
+        self._task = task
+
+    @property
+    def kind(self):
+        return self._kind
+
+    @property
+    def at(self):
+        return self._at
+
+    @property
+    def task(self):
+        return self._task
+
+    @property
+    def key(self):
+        """Identifies the alert across restarts, for receivers that must drop a repeat."""
+        return f"{self._task.task_id}:{self._kind}:{self._task.due_date.isoformat()}"
+
+def deadline_to_record(deadline: Deadline):
+    """
+    Converts a Deadline into a flat dictionary: the alert followed by the task.
+    :param deadline: Deadline object.
+    :return: Dictionary keyed by ALERT_FIELDS.
+    """
+    record = {"key": deadline.key, "kind": deadline.kind, "at": deadline.at.strftime("%Y-%m-%d %H:%M:%S")}
+    record.update(task_to_record(deadline.task))
+    return record
+
+class LogAlert:
+    """Callback printing one line per alert."""
+
+    def __init__(self, stream=None):
+        """
+        :param stream: Where the lines are written, defaults to stderr.
+        """
+        self.__stream = stream
+
+    def __call__(self, deadline: Deadline):
+        task = deadline.task
+        print(f"⏰ Task {task.task_id} '{task.title}' ({task.priority}) is {deadline.kind.replace('_', ' ')}, due {task.due_date}",
+              file=self.__stream or sys.stderr)
+
+class WebhookAlert:
+    """Callback posting each alert as JSON (deadline_to_record) to a URL."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        """
+        :param url: Endpoint receiving a POST per alert.
+        :param timeout: Seconds to wait for the endpoint.
+        """
+        self.__url = url
+        self.__timeout = timeout
+
+    def __call__(self, deadline: Deadline):
+        body = json.dumps(deadline_to_record(deadline)).encode("utf-8")
+        request = urllib.request.Request(self.__url, body, {"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.__timeout):
+            pass
+
+class EscalateAlert:
+    """Callback raising the priority of the alerted tasks to High."""
+
+    def __init__(self, task_service, kinds=("overdue",)):
+        """
+        :param task_service: TaskService (or repository) providing get_task and update_task_fields.
+        :param kinds: Alert kinds that escalate.
+        """
+        self.__task_service = task_service
+        self.__kinds = tuple(kinds)
+
+    def __call__(self, deadline: Deadline):
+        if deadline.kind not in self.__kinds:
+            return
+        task = deadline.task
+        while task is not None and task.status in OPEN_STATUSES and task.priority != "High" \
+                and task.due_date == deadline.task.due_date:
+            try:
+                self.__task_service.update_task_fields(task.task_id, {"priority": "High"}, task.version)
+                return
+            except VersionConflictError:
+                # Edited since it was read: escalate the new state, unless that closed or moved it.
+                task = self.__task_service.get_task(task.task_id)
+
+class DueDateScheduler(PeriodicJob):
+    """
+    Fires alerts for the due dates of open tasks, by default a day before ("due_soon") and
+    a day after ("overdue") the start of the due date, and hands each to the callbacks.
+    Only the deadlines of the next horizon sit in a heap. They are loaded a due date at a
+    time through the (status, due_date) index as the horizon moves forward, and tasks
+    added or edited into the loaded range are picked up from the change feed, so the
+    tasks table is never rescanned whatever its size. Each task is re-read when its alert
+    is due and skipped if it was completed, deleted or given another due date.
+    The last fired alert is saved to checkpoint_path after each one. A restarted scheduler
+    resumes after it, firing the alerts it missed while down, so each alert fires once;
+    only a crash between the callbacks and the save repeats one, which Deadline.key lets
+    receivers detect. Without a checkpoint it starts with the alerts after now.
+    """
+
+    def __init__(self, task_service, callbacks, checkpoint_path: str = None, alerts: dict = None,
+                 horizon: timedelta = timedelta(days=1), interval: float = 60.0, batch_size: int = 1000,
+                 clock=datetime.now):
+        """
+        :param task_service: TaskService (or repository) providing list_tasks, get_task and changes_since.
+        :param callbacks: Callables receiving each Deadline. A TransientError is retried on the
+                          next pass from the callback that raised it, other exceptions are
+                          reported and the alert still counts as fired.
+        :param checkpoint_path: File keeping the last fired alert, None to keep it in memory only.
+        :param alerts: Mapping of alert kind to its offset from the start of the due date.
+        :param horizon: How far ahead of now deadlines are loaded.
+        :param interval: Seconds between passes.
+        :param batch_size: Maximum number of tasks or changes read at once.
+        :param clock: Callable returning the current local datetime.
+        """
+        super().__init__(interval, "due-date-scheduler")
+        self.__task_service = task_service
+        self.__callbacks = list(callbacks)
+        self.__checkpoint_path = checkpoint_path
+        self.__alerts = dict(alerts or DEFAULT_ALERTS)
+        self.__horizon = horizon
+        self.__batch_size = batch_size
+        self.__clock = clock
+        self.__fired = self.__load_checkpoint()
+        self.__saved = None
+        self.__heap = []
+        self.__scheduled = set()
+        self.__loaded_through = None
+        self.__subscriber = None
+        # (key, Deadline, position of the next callback) of an alert a TransientError interrupted.
+        self.__partial = None
+
+    @property
+    def pending(self):
+        """Number of deadlines loaded and not fired yet."""
+        return len(self.__heap)
+
+    def __load_checkpoint(self):
+        if self.__checkpoint_path is None or not os.path.exists(self.__checkpoint_path):
+            return (self.__clock(), 0, "")
+        with open(self.__checkpoint_path, encoding="utf-8") as file:
+            saved = json.load(file)
+        return (datetime.fromisoformat(saved["at"]), saved["task_id"], saved["kind"])
+
+    def __save_checkpoint(self):
+        if self.__checkpoint_path is None or self.__saved == self.__fired:
+            return
+        at, task_id, kind = self.__fired
+        temporary = f"{self.__checkpoint_path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"at": at.isoformat(), "task_id": task_id, "kind": kind}, file)
+            file.write("\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.__checkpoint_path)
+        self.__saved = self.__fired
+
+    def __change_head(self):
+        """change_id of the newest change, found with O(log n) single-change reads of the log."""
+        if not self.__task_service.changes_since(0, 1):
+            return 0
+        low, high = 0, 1
+        while self.__task_service.changes_since(high, 1):
+            low, high = high, high * 2
+        # There are changes after low and none after high.
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.__task_service.changes_since(middle, 1):
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def __start(self):
+        # Follow the feed from its current head; the due dates loaded afterwards already reflect older changes.
+        self.__subscriber = ChangeSubscriber(self.__task_service, self.__on_changes, cursor=self.__change_head(),
+                                             batch_size=self.__batch_size)
+        first_due = (self.__fired[0] - max(self.__alerts.values())).date()
+        self.__loaded_through = first_due - timedelta(days=1)
+
+    def __schedule(self, task_id: int, due_date):
+        start = datetime.combine(due_date, time.min)
+        for kind, offset in self.__alerts.items():
+            key = (start + offset, task_id, kind)
+            if key > self.__fired and key not in self.__scheduled:
+                self.__scheduled.add(key)
+                heappush(self.__heap, key)
+
+    def __on_changes(self, changes):
+        for change in changes:
+            task = change.task
+            if change.operation != "delete" and task.status in OPEN_STATUSES and task.due_date <= self.__loaded_through:
+                self.__schedule(task.task_id, task.due_date)
+
+    def __load(self, through):
+        """Schedules the open tasks due after the loaded range up to the through date, a due date at a time."""
+        while self.__loaded_through < through:
+            day = self.__loaded_through + timedelta(days=1)
+            after_id = None
+            while True:
+                tasks = self.__task_service.list_tasks(TaskQuery(status=OPEN_STATUSES, due_date=day, columns=("due_date",),
+                                                                 after_id=after_id, limit=self.__batch_size))
+                for task in tasks:
+                    self.__schedule(task.task_id, task.due_date)
+                if len(tasks) < self.__batch_size:
+                    break
+                after_id = tasks[-1].task_id
+            self.__loaded_through = day
+
+    def __deadline(self, key):
+        """Re-reads the task of a due deadline, None if the alert no longer applies."""
+        at, task_id, kind = key
+        task = self.__task_service.get_task(task_id)
+        if task is None or task.status not in OPEN_STATUSES or task.due_date != (at - self.__alerts[kind]).date():
+            return None
+        return Deadline(kind, at, task)
+
+    def __fire(self, key, deadline: Deadline, first: int = 0):
+        """Hands the alert to the callbacks from position first on, remembering where a TransientError stopped it."""
+        for position in range(first, len(self.__callbacks)):
+            try:
+                self.__callbacks[position](deadline)
+            except TransientError:
+                # The callbacks before this one already have the alert: the retry resumes here.
+                self.__partial = (key, deadline, position)
+                raise
+            except Exception as e:
+                print(f"⚠️ {deadline.kind} alert of task {deadline.task.task_id} failed: {e}", file=sys.stderr)
+
+    def step(self):
+        """
+        Catches up with the change feed, loads the deadlines up to the horizon and fires the due ones.
+        A TransientError leaves the alert being fired for the next pass, which resumes it with
+        the callback that raised.
+        :return: List of the Deadline objects fired.
+        """
+        now = self.__clock()
+        if self.__subscriber is None:
+            self.__start()
+        while self.__subscriber.poll() == self.__batch_size:
+            pass
+        self.__load((now + self.__horizon - min(self.__alerts.values())).date())
+
+        fired = []
+        while self.__heap and self.__heap[0][0] <= now:
+            key = heappop(self.__heap)
+            self.__scheduled.discard(key)
+            try:
+                if self.__partial is not None and self.__partial[0] == key:
+                    _, deadline, first = self.__partial
+                else:
+                    deadline, first = self.__deadline(key), 0
+                if deadline is not None:
+                    self.__fire(key, deadline, first)
+            except BaseException:
+                self.__scheduled.add(key)
+                heappush(self.__heap, key)
+                raise
+            self.__partial = None
+            self.__fired = key
+            if deadline is not None:
+                fired.append(deadline)
+                self.__save_checkpoint()
+        # Also keeps the skipped alerts behind the checkpoint, and records where a new checkpoint starts.
+        self.__save_checkpoint()
+        return fired
@@ -0,0 +1,111 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import csv
+import io
+import json
+from datetime import datetime
+from models.task import Task
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+PRIORITIES = ("Low", "Medium", "High")
+STATUSES = ("Pending", "In Progress", "Completed")
+EXPORT_FIELDS = ["task_id", "title", "description", "due_date", "priority", "status", "creation_timestamp", "version"]
+
+def task_from_record(record: dict):
+    """
+    Builds a Task from an imported record (a CSV row, or a JSONL line that is decoded here).
+    Any task_id or version in the record is ignored, the database assigns new ones on import.
+    :param record: Mapping with title, description, due_date, priority and optionally status and creation_timestamp.
+    :return: Task object.
+    """
+    if isinstance(record, str):
+        record = json.loads(record)
+    creation_timestamp = record.get("creation_timestamp") or None
+    if isinstance(creation_timestamp, str):
+        creation_timestamp = datetime.fromisoformat(creation_timestamp)
+    status = record.get("status") or "Pending"
+    if record["priority"] not in PRIORITIES:
+        raise ValueError(f"invalid priority '{record['priority']}'")
+    if status not in STATUSES:
+        raise ValueError(f"invalid status '{status}'")
+    return Task(record["title"], record.get("description") or "", record["due_date"], record["priority"],
+                status, creation_timestamp=creation_timestamp)
+
+def task_to_record(task: Task):
+    """
+    Converts a Task into a flat dictionary suitable for CSV or JSONL export.
+    :param task: Task object.
+    :return: Dictionary keyed by EXPORT_FIELDS.
+    """
+    return {
+        "task_id": task.task_id,
+        "title": task.title,
+        "description": task.description,
+        "due_date": task.due_date.strftime("%Y-%m-%d") if task.due_date else None,
+        "priority": task.priority,
+        "status": task.status,
+        "creation_timestamp": task.creation_timestamp.strftime("%Y-%m-%d %H:%M:%S") if task.creation_timestamp else None,
+        "version": task.version,
+    }
+
+CHANGE_FIELDS = ["change_id", "operation", "changed_at"] + EXPORT_FIELDS
+
+def change_to_record(change):
+    """
+    Converts a TaskChange into a flat dictionary: the change followed by the task snapshot.
+    :param change: TaskChange object.
+    :return: Dictionary keyed by CHANGE_FIELDS.
+    """
+    record = {
+        "change_id": change.change_id,
+        "operation": change.operation,
+        "changed_at": change.changed_at.strftime("%Y-%m-%d %H:%M:%S.%f") if change.changed_at else None,
+    }
+    record.update(task_to_record(change.task))
+    return record
+
+def read_records(stream, fmt: str):
+    """
+    Lazily reads raw records from a CSV or JSONL text stream.
+    JSONL lines are yielded undecoded so that a malformed line only invalidates itself.
+    :param stream: File-like object opened in text mode.
+    :param fmt: Either "csv" or "jsonl".
+    :return: Generator of (line_number, record) tuples.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                yield line_number, line
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'. Choose from {', '.join(SUPPORTED_FORMATS)}.")
+
+def format_records(tasks, fmt: str):
+    """
+    Serializes tasks one line at a time, so exports never hold the whole result set.
+    :param tasks: Iterable of Task objects.
+    :param fmt: Either "csv" or "jsonl".
+    :return: Generator of text lines, each terminated by a newline.
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        for task in tasks:
+            writer.writerow(task_to_record(task))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    elif fmt == "jsonl":
+        for task in tasks:
+            yield json.dumps(task_to_record(task)) + "\n"
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'. Choose from {', '.join(SUPPORTED_FORMATS)}.")
@@ -3,20 +3,47 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from datetime import date
+from heapq import merge
+from itertools import islice
 from models.task import Task
-from repositories.task_manager import TaskManager
+from models.task_query import TaskQuery
+from interfaces.Itask_repository import ITaskRepository
+from repositories.cached_task_repository import CachedTaskRepository
+from repositories.summary_task_repository import SummaryTaskRepository
+from repositories.ranked_task_repository import RankedTaskRepository
+from services.task_io import read_records, task_from_record, format_records
 
 class TaskService:
     """
     Service class for managing tasks.
-    Handles business logic and interacts with the task repository.
+    Handles business logic and interacts with the task repository. Storage failures are
+    not caught here: NotFoundError, ConflictError and TransientError reach the caller.
     """
     
-    def __init__(self, task_repository: TaskManager):
+    def __init__(self, task_repository: ITaskRepository, cache_settings: dict = None, summary_settings: dict = None,
+                 next_index_settings: dict = None):
         """
         Initializes TaskService with a TaskRepository instance.
-        :param task_repository: An instance of TaskRepository for database operations.
+        :param task_repository: Any ITaskRepository implementation (MySQL TaskManager, SQLite, ...).
+        :param cache_settings: Optional cache configuration (see db_config.get_cache_settings).
+                               When enabled, the repository is wrapped in a CachedTaskRepository.
+        :param summary_settings: Optional summary configuration (see db_config.get_summary_settings).
+                                 When enabled, get_stats is served by a SummaryTaskRepository.
+        :param next_index_settings: Optional next index configuration (see db_config.get_next_index_settings).
+                                    When enabled, next_tasks is served by a RankedTaskRepository.
         """
+        self.__cache = None
+        if cache_settings and cache_settings.get("enabled"):
+            options = {key: value for key, value in cache_settings.items() if key != "enabled"}
+            self.__cache = CachedTaskRepository(task_repository, **options)
+            task_repository = self.__cache
+        if summary_settings and summary_settings.get("enabled"):
+            options = {key: value for key, value in summary_settings.items() if key != "enabled"}
+            task_repository = SummaryTaskRepository(task_repository, **options)
+        if next_index_settings and next_index_settings.get("enabled"):
+            options = {key: value for key, value in next_index_settings.items() if key != "enabled"}
+            task_repository = RankedTaskRepository(task_repository, **options)
         self.__task_repository = task_repository
 
     def create_task(self, title: str, description: str, due_date: str, priority: str):
@@ -32,23 +59,144 @@ class TaskService:
         self.__task_repository.add_task(task)
         return task
 
-    def get_task(self, task_id: int):
+    def import_tasks(self, source, fmt: str = None, chunk_size: int = 1000):
+        """
+        Imports many tasks through the repository's chunked bulk insert.
+        Rows that fail validation are skipped and reported, they never reach the database.
+        :param source: Iterable of Task objects, or a text stream when fmt is given.
+        :param fmt: None for an iterable of tasks, otherwise "csv" or "jsonl".
+        :param chunk_size: Number of tasks inserted per transaction.
+        :return: Dictionary with imported and failed counts, per-chunk reports and invalid rows.
+        """
+        invalid_rows = []
+
+        def parsed_tasks():
+            for line_number, record in read_records(source, fmt):
+                try:
+                    yield task_from_record(record)
+                except (KeyError, ValueError, TypeError) as e:
+                    invalid_rows.append({"line": line_number, "error": f"{type(e).__name__}: {e}"})
+
+        tasks = source if fmt is None else parsed_tasks()
+        chunks = self.__task_repository.add_tasks(tasks, chunk_size)
+        return {
+            "imported": sum(chunk["inserted"] for chunk in chunks),
+            "failed": sum(chunk["count"] - chunk["inserted"] for chunk in chunks),
+            "chunks": chunks,
+            "invalid_rows": invalid_rows,
+        }
+
+    def export_tasks(self, filter_by: dict = None, fmt: str = None, chunk_size: int = 1000):
+        """
+        Streams tasks out of the repository without loading them all at once.
+        :param filter_by: Dictionary containing filter conditions.
+        :param fmt: None to yield Task objects, otherwise "csv" or "jsonl" to yield text lines.
+        :param chunk_size: Number of rows fetched from the database at a time.
+        :return: Generator of Task objects or formatted lines.
+        """
+        tasks = self.__task_repository.export_tasks(filter_by, chunk_size)
+        return tasks if fmt is None else format_records(tasks, fmt)
+
+    def changes_since(self, cursor: int = 0, limit: int = 1000):
+        """
+        Returns the task changes made after a cursor, in order, so a mirror of the tasks
+        only fetches deltas. Pass the change_id of the last change processed as the next
+        cursor; ChangeSubscriber does this in a loop and keeps the cursor in a file.
+        :param cursor: change_id of the last change already processed, 0 for the whole log.
+        :param limit: Maximum number of changes returned.
+        :return: List of TaskChange objects (change_id, operation, changed_at, task).
+        """
+        return self.__task_repository.changes_since(cursor, limit)
+
+    def get_task(self, task_id: int, history: bool = False):
         """
         Retrieves a task by its ID.
         :param task_id: Unique identifier of the task.
+        :param history: Fall back to the archive of old Completed tasks (see archive_tasks).
         :return: Task object if found, otherwise None.
         """
-        return self.__task_repository.get_task(task_id)
+        task = self.__task_repository.get_task(task_id)
+        if task is None and history:
+            task = self.__task_repository.get_archived_task(task_id)
+        return task
 
-    def list_tasks(self, filter_by: dict = None):
+    def list_tasks(self, query=None, after_id: int = None, limit: int = None, history: bool = False):
         """
-        Lists all tasks with optional filtering by status, priority, or due date.
-        :param filter_by: Dictionary containing filter conditions.
+        Lists tasks, one page at a time.
+        A dictionary of equality filters takes the (cached) keyset listing in task_id order;
+        a TaskQuery adds ranges, IN lists, overdue, text search, ordering and projection.
+        :param query: TaskQuery, or a dictionary containing filter conditions (status, priority, due date).
+        :param after_id: task_id of the last task of the previous page, None for the first page.
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :param history: Merge in the archived tasks matching the filter dictionary, by task_id.
+        :return: List of Task objects.
+        """
+        if isinstance(query, TaskQuery):
+            if history:
+                raise ValueError("History listings take a filter dictionary, not a TaskQuery")
+            changes = {name: value for name, value in (("after_id", after_id), ("limit", limit)) if value is not None}
+            return self.__task_repository.query_tasks(query.replace(**changes) if changes else query)
+        tasks = self.__task_repository.list_tasks(query, after_id, limit)
+        if not history or not self.__includes_archive(query):
+            return tasks
+        # Both listings are in task_id order and the ids never overlap, so one page of each covers the merged page.
+        archived = self.__task_repository.list_archived_tasks(query, after_id, limit)
+        return list(islice(merge(tasks, archived, key=lambda task: task.task_id), limit))
+
+    def __includes_archive(self, filter_by: dict):
+        """Whether archived tasks can match the filter: the archive only holds Completed tasks."""
+        return not filter_by or filter_by.get("status") in (None, "Completed")
+
+    def __iter_archived(self, filter_by: dict, chunk_size: int = 1000):
+        after_id = None
+        while True:
+            tasks = self.__task_repository.list_archived_tasks(filter_by, after_id, chunk_size)
+            yield from tasks
+            if len(tasks) < chunk_size:
+                return
+            after_id = tasks[-1].task_id
+
+    def search_tasks(self, text: str, filter_by: dict = None, limit: int = 50):
+        """
+        Finds tasks by keyword in their title or description, most relevant first.
+        :param text: Search words, a task matches if it contains any of them.
+        :param filter_by: Dictionary containing filter conditions (status, priority, due date).
+        :param limit: Maximum number of tasks returned, None for no limit.
+        :return: List of Task objects ordered by relevance.
+        """
+        if not text or not text.strip():
+            raise ValueError("Search text must not be empty")
+        return self.__task_repository.search_tasks(text, filter_by, limit)
+
+    def next_tasks(self, k: int = 10, filter_by: dict = None):
+        """
+        Lists what to work on next: the open (Pending and In Progress) tasks, High before Medium
+        before Low, then by earliest due date. With next index settings enabled this is served
+        from memory in O(log n + k), otherwise by one indexed query per status.
+        :param k: Maximum number of tasks returned.
+        :param filter_by: Dictionary containing filter conditions (status, priority, due date).
         :return: List of Task objects.
         """
-        return self.__task_repository.list_tasks(filter_by)
+        if k < 0:
+            raise ValueError("k must not be negative")
+        if k == 0:
+            return []
+        return self.__task_repository.next_tasks(k, filter_by)
+
+    def iter_tasks(self, filter_by: dict = None, history: bool = False):
+        """
+        Streams all matching tasks without loading them into memory at once.
+        :param filter_by: Dictionary containing filter conditions.
+        :param history: Merge in the archived tasks, by task_id.
+        :return: Generator of Task objects.
+        """
+        tasks = self.__task_repository.iter_tasks(filter_by)
+        if not history or not self.__includes_archive(filter_by):
+            return tasks
+        return merge(tasks, self.__iter_archived(filter_by), key=lambda task: task.task_id)
 
-    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str):
+    def update_task_details(self, task_id: int, title: str, description: str, due_date: str, priority: str,
+                            expected_version: int = None):
         """
         Updates the details of an existing task.
         :param task_id: Unique identifier of the task.
@@ -56,13 +204,29 @@ class TaskService:
         :param description: New description of the task.
         :param due_date: New due date of the task.
         :param priority: New priority level of the task.
+        :param expected_version: Only update the task if it still has this version.
+        :raises NotFoundError: If the task does not exist.
+        :raises VersionConflictError: If someone else changed the task since it was read.
         """
-        self.__task_repository.update_task_details(task_id, title, description, due_date, priority)
+        self.__task_repository.update_task_details(task_id, title, description, due_date, priority, expected_version)
+
+    def update_task_fields(self, task_id: int, changes: dict, expected_version: int = None):
+        """
+        Updates only the given details of a task. Pass the version of the task the changes
+        were made on, e.g. task.version after get_task, to detect concurrent edits.
+        :param task_id: Unique identifier of the task.
+        :param changes: Mapping of field (title, description, due_date, priority) to new value.
+        :param expected_version: Version of the task the changes are based on.
+        :raises NotFoundError: If the task does not exist.
+        :raises VersionConflictError: If someone else changed the task since it was read.
+        """
+        self.__task_repository.update_task_fields(task_id, changes, expected_version)
 
     def mark_task_completed(self, task_id: int):
         """
         Marks a task as completed by updating its status.
         :param task_id: Unique identifier of the task.
+        :raises NotFoundError: If the task does not exist.
         """
         self.__task_repository.update_task_status(task_id, "Completed")
 
@@ -70,5 +234,150 @@ class TaskService:
         """
         Deletes a task from the repository.
         :param task_id: Unique identifier of the task to be deleted.
+        :raises NotFoundError: If the task does not exist.
         """
         self.__task_repository.delete_task(task_id)
+
+    def update_status_bulk(self, new_status: str, task_ids=None, filter_by: dict = None):
+        """
+        Sets the status of many tasks at once, e.g. to close out a sprint.
+        :param new_status: New status (Pending, In Progress, Completed).
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary containing filter conditions, an empty dictionary targets every task.
+        :return: Number of affected tasks.
+        """
+        if new_status not in ("Pending", "In Progress", "Completed"):
+            raise ValueError(f"Invalid status '{new_status}'")
+        return self.__task_repository.update_status_bulk(new_status, task_ids, filter_by)
+
+    def mark_tasks_completed(self, task_ids=None, filter_by: dict = None):
+        """
+        Marks many tasks as completed at once.
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary containing filter conditions.
+        :return: Number of affected tasks.
+        """
+        return self.update_status_bulk("Completed", task_ids, filter_by)
+
+    def update_details_bulk(self, changes: dict, task_ids=None, filter_by: dict = None):
+        """
+        Applies the same detail changes to many tasks at once.
+        :param changes: Mapping of field (title, description, due_date, priority) to new value.
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary containing filter conditions, an empty dictionary targets every task.
+        :return: Number of affected tasks.
+        """
+        if "priority" in changes and changes["priority"] not in ("Low", "Medium", "High"):
+            raise ValueError(f"Invalid priority '{changes['priority']}'")
+        return self.__task_repository.update_details_bulk(changes, task_ids, filter_by)
+
+    def delete_bulk(self, task_ids=None, filter_by: dict = None):
+        """
+        Deletes many tasks at once.
+        :param task_ids: Iterable of task ids, mutually exclusive with filter_by.
+        :param filter_by: Dictionary containing filter conditions, an empty dictionary targets every task.
+        :return: Number of deleted tasks.
+        """
+        return self.__task_repository.delete_bulk(task_ids, filter_by)
+
+    def claim_tasks(self, worker_id: str, n: int, priority_order: bool = True, lease_seconds: float = 300.0):
+        """
+        Hands the next Pending tasks to a worker: up to n of them are set In Progress and held
+        by worker_id for lease_seconds. Concurrent workers never get the same task. A worker
+        keeps its claims with renew_claims (see services.claims.ClaimHeartbeat) and ends them
+        with release_claims; claims that expire are handed out again after reap_expired_claims
+        (see services.claims.ClaimReaper).
+        :param worker_id: Identifier of the claiming worker.
+        :param n: Maximum number of tasks claimed.
+        :param priority_order: Claim High before Medium before Low, then by due date; otherwise by due date alone.
+        :param lease_seconds: Seconds until the claims expire unless renewed.
+        :return: List of the claimed Task objects, in claim order.
+        """
+        self.__check_claim(worker_id, lease_seconds)
+        if n < 0:
+            raise ValueError("n must not be negative")
+        return self.__task_repository.claim_tasks(worker_id, n, priority_order, lease_seconds)
+
+    def renew_claims(self, worker_id: str, task_ids=None, lease_seconds: float = 300.0):
+        """
+        Heartbeat: extends the leases of the claims a worker still holds.
+        :param worker_id: Identifier of the worker.
+        :param task_ids: Iterable of task ids, None for every claim of the worker.
+        :param lease_seconds: Seconds from now until the claims expire.
+        :return: Sorted list of the renewed task ids; a task missing from it was reaped and may
+                 now belong to another worker, so its work should be abandoned.
+        """
+        self.__check_claim(worker_id, lease_seconds)
+        return self.__task_repository.renew_claims(worker_id, task_ids, lease_seconds)
+
+    def release_claims(self, worker_id: str, task_ids, status: str = "Completed"):
+        """
+        Ends a worker's claims, e.g. release_claims(worker, [task.task_id]) once a task is done.
+        :param worker_id: Identifier of the worker.
+        :param task_ids: Iterable of task ids.
+        :param status: Completed, or Pending to hand the tasks back unfinished.
+        :return: Sorted list of the released task ids, ids the worker no longer held are left out.
+        """
+        if status not in ("Pending", "Completed"):
+            raise ValueError(f"Invalid status '{status}', released tasks become Completed or Pending")
+        self.__check_claim(worker_id)
+        return self.__task_repository.release_claims(worker_id, task_ids, status)
+
+    def reap_expired_claims(self, limit: int = 1000):
+        """
+        Removes up to limit expired claims and puts their tasks back to Pending.
+        :param limit: Maximum number of claims removed.
+        :return: Sorted list of the task ids whose claims were removed.
+        """
+        return self.__task_repository.reap_expired_claims(limit)
+
+    def archive_tasks(self, completed_before, limit: int = 1000):
+        """
+        Moves one batch of Completed tasks due before completed_before from the tasks table to
+        the archive, keeping the table that every listing and claim reads small. The batch is a
+        short transaction of its own; services.archiver.TaskArchiver runs batches in a throttled
+        loop. Archived tasks are read back with get_task, list_tasks and iter_tasks(history=True).
+        :param completed_before: date or YYYY-MM-DD, only tasks due before it are moved.
+        :param limit: Maximum number of tasks moved.
+        :return: Sorted list of the archived task ids.
+        """
+        if isinstance(completed_before, str):
+            completed_before = date.fromisoformat(completed_before)
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        return self.__task_repository.archive_tasks(completed_before, limit)
+
+    def __check_claim(self, worker_id: str, lease_seconds: float = None):
+        if not worker_id:
+            raise ValueError("worker_id must not be empty")
+        if lease_seconds is not None and lease_seconds <= 0:
+            raise ValueError("lease_seconds must be positive")
+
+    def transaction(self):
+        """
+        Groups the calls made inside a with block into one unit of work, e.g.
+
+            with task_service.transaction():
+                task = task_service.create_task(...)
+                task_service.delete_task(old_id)
+
+        Nothing is committed before the block ends, and everything is rolled back if it raises.
+        A nested block is a savepoint: catching its exception keeps the outer work.
+        :return: Context manager.
+        """
+        return self.__task_repository.transaction()
+
+    def get_stats(self):
+        """
+        Returns the dashboard statistics: counts by status and priority, the overdue count
+        and a histogram of the open tasks by due date (overdue, today, next 7 days, next 30 days, later).
+        :return: Dictionary of statistics.
+        """
+        return self.__task_repository.get_stats()
+
+    def cache_stats(self):
+        """
+        Returns the cache hit/miss/eviction counters.
+        :return: Dictionary of cache statistics, or None when caching is disabled.
+        """
+        return self.__cache.cache_stats() if self.__cache else None
@@ -1,40 +1,305 @@
+import os
+import argparse
+from datetime import date
+from itertools import combinations
 import pymysql
+from db_config import get_db_settings
+from repositories.query_builder import CHANGE_LOG_TRIGGERS, BACKFILL_CHANGES
+
+def _create_index(table: str, name: str, columns: str, kind: str = "INDEX"):
+    """
+    Builds an idempotent migration step that creates an index only if it is missing.
+    MySQL commits every DDL statement on its own, so a rerun after a partial failure must skip what already exists.
+    :param table: Table name.
+    :param name: Index name.
+    :param columns: Column list, e.g. "status, priority, due_date".
+    :param kind: Index kind, e.g. "INDEX" or "FULLTEXT INDEX".
+    """
+    def step(cursor):
+        cursor.execute(
+            """SELECT 1 FROM information_schema.statistics
+               WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1""",
+            (table, name),
+        )
+        if not cursor.fetchone():
+            cursor.execute(f"CREATE {kind} {name} ON {table} ({columns})")
+    step.description = f"CREATE {kind} {name} ON {table} ({columns})"
+    return step
+
+def _add_column(table: str, name: str, definition: str):
+    """
+    Builds an idempotent migration step that adds a column only if it is missing, see _create_index.
+    :param table: Table name.
+    :param name: Column name.
+    :param definition: Column type and options, e.g. "INT UNSIGNED NOT NULL DEFAULT 1".
+    """
+    def step(cursor):
+        cursor.execute(
+            """SELECT 1 FROM information_schema.columns
+               WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s LIMIT 1""",
+            (table, name),
+        )
+        if not cursor.fetchone():
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+    step.description = f"ALTER TABLE {table} ADD COLUMN {name} {definition}"
+    return step
+
+def _create_trigger(name: str, timing: str, event: str, table: str, statement: str):
+    """
+    Builds an idempotent migration step that creates a row trigger only if it is missing, see _create_index.
+    With binary logging enabled, MySQL requires SUPER or log_bin_trust_function_creators=1 for this.
+    :param name: Trigger name.
+    :param timing: BEFORE or AFTER.
+    :param event: INSERT, UPDATE or DELETE.
+    :param table: Table the trigger is defined on.
+    :param statement: Single statement run for each affected row.
+    """
+    def step(cursor):
+        cursor.execute(
+            "SELECT 1 FROM information_schema.triggers WHERE trigger_schema = DATABASE() AND trigger_name = %s LIMIT 1",
+            (name,),
+        )
+        if not cursor.fetchone():
+            cursor.execute(f"CREATE TRIGGER {name} {timing} {event} ON {table} FOR EACH ROW {statement}")
+    step.description = f"CREATE TRIGGER {name} {timing} {event} ON {table}"
+    return step
+
+def _add_foreign_key(table: str, name: str, definition: str):
+    """
+    Builds an idempotent migration step that adds a foreign key only if it is missing, see _create_index.
+    :param table: Table name.
+    :param name: Constraint name.
+    :param definition: Constraint body, e.g. "FOREIGN KEY (task_id) REFERENCES tasks (task_id)".
+    """
+    def step(cursor):
+        cursor.execute(
+            """SELECT 1 FROM information_schema.table_constraints
+               WHERE table_schema = DATABASE() AND table_name = %s AND constraint_name = %s LIMIT 1""",
+            (table, name),
+        )
+        if not cursor.fetchone():
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    step.description = f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}"
+    return step
+
+def _backfill_changes(cursor):
+    """Logs an insert for every existing task, unless the change log already has entries."""
+    cursor.execute("SELECT 1 FROM task_changes LIMIT 1")
+    if not cursor.fetchone():
+        cursor.execute(BACKFILL_CHANGES)
+_backfill_changes.description = BACKFILL_CHANGES
+
+# Forward-only migrations as (version, description, steps). A step is either a SQL
+# string that is safe to rerun or a callable taking a cursor. Never edit an applied
+# migration, append a new one instead.
+MIGRATIONS = [
+    (1, "create tasks table", [
+        """
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            due_date DATE NOT NULL,
+            priority ENUM('Low', 'Medium', 'High') NOT NULL,
+            status ENUM('Pending', 'In Progress', 'Completed') NOT NULL DEFAULT 'Pending',
+            creation_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    (2, "add indexes for the list_tasks filter shapes", [
+        _create_index("tasks", "idx_tasks_status_priority_due", "status, priority, due_date"),
+        _create_index("tasks", "idx_tasks_status_due", "status, due_date"),
+        _create_index("tasks", "idx_tasks_priority_due", "priority, due_date"),
+        _create_index("tasks", "idx_tasks_due_date", "due_date"),
+    ]),
+    (3, "add a full-text index for search_tasks", [
+        _create_index("tasks", "idx_tasks_fulltext", "title, description", "FULLTEXT INDEX"),
+    ]),
+    (4, "add a row version for optimistic concurrency", [
+        _add_column("tasks", "version", "INT UNSIGNED NOT NULL DEFAULT 1"),
+    ]),
+    # Backfills before creating the triggers, run it while nothing else writes to tasks.
+    (5, "add the task_changes log for incremental sync", [
+        """
+        CREATE TABLE IF NOT EXISTS task_changes (
+            change_id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+            operation ENUM('insert', 'update', 'delete') NOT NULL,
+            changed_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            task_id INT NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            due_date DATE NOT NULL,
+            priority ENUM('Low', 'Medium', 'High') NOT NULL,
+            status ENUM('Pending', 'In Progress', 'Completed') NOT NULL,
+            creation_timestamp TIMESTAMP NULL,
+            version INT UNSIGNED NOT NULL
+        )
+        """,
+        _backfill_changes,
+    ] + [_create_trigger(name, "AFTER", event, "tasks", statement) for name, event, statement in CHANGE_LOG_TRIGGERS]),
+    # claim_tasks scans priority descending and due date ascending, which needs its own index order (MySQL 8.0+).
+    (6, "add task_claims for work queue leases", [
+        """
+        CREATE TABLE IF NOT EXISTS task_claims (
+            task_id INT PRIMARY KEY,
+            worker_id VARCHAR(255) NOT NULL,
+            claimed_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            lease_expires_at TIMESTAMP(6) NOT NULL,
+            INDEX idx_task_claims_lease (lease_expires_at),
+            INDEX idx_task_claims_worker (worker_id),
+            CONSTRAINT fk_task_claims_task FOREIGN KEY (task_id) REFERENCES tasks (task_id) ON DELETE CASCADE
+        )
+        """,
+        _create_index("tasks", "idx_tasks_claim", "status, priority DESC, due_date"),
+    ]),
+    # Only Completed tasks are archived, so the archive is indexed for the priority and due date filters.
+    (7, "add tasks_archive for archived Completed tasks", [
+        """
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            task_id INT PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            due_date DATE NOT NULL,
+            priority ENUM('Low', 'Medium', 'High') NOT NULL,
+            status ENUM('Pending', 'In Progress', 'Completed') NOT NULL,
+            creation_timestamp TIMESTAMP NULL,
+            version INT UNSIGNED NOT NULL,
+            archived_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            INDEX idx_tasks_archive_priority_due (priority, due_date),
+            INDEX idx_tasks_archive_due_date (due_date)
+        )
+        """,
+    ]),
+    # Databases that applied migration 6 before it declared the foreign key: drop the claims
+    # of tasks deleted since, then cascade future deletes (archive_tasks included) to task_claims.
+    (8, "cascade task deletes to task_claims", [
+        "DELETE FROM task_claims WHERE task_id NOT IN (SELECT task_id FROM tasks)",
+        _add_foreign_key("task_claims", "fk_task_claims_task",
+                         "FOREIGN KEY (task_id) REFERENCES tasks (task_id) ON DELETE CASCADE"),
+    ]),
+]
+
+def _connect():
+    """
+    Connects to the server and selects the tasks database, creating it if needed.
+    :return: Tuple of (connection, database name).
+    """
+    database = os.environ.get("TASKS_DB_NAME", "tasks_db")
+    connection = pymysql.connect(**get_db_settings(include_database=False))
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`;")
+        cursor.execute(f"USE `{database}`;")
+    return connection, database
+
+def _applied_versions(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    cursor.execute("SELECT version FROM schema_version")
+    return {row["version"] for row in cursor.fetchall()}
+
+def migrate(connection):
+    """
+    Applies every migration newer than the recorded schema version, in order.
+    :param connection: Connection with the tasks database selected.
+    :return: List of applied (version, description) tuples.
+    """
+    applied = []
+    with connection.cursor() as cursor:
+        done = _applied_versions(cursor)
+        for version, description, steps in MIGRATIONS:
+            if version in done:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)", (version, description))
+            connection.commit()
+            applied.append((version, description))
+    return applied
 
 def setup_database():
     """
-    Creates the tasks_db database and the tasks table if they do not exist.
+    Creates the tasks_db database and brings its schema up to the latest migration.
     """
+    connection = None
     try:
-        connection = pymysql.connect(
-            host="localhost",
-            user="your_user",
-            password="your_password",
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        
-        with connection.cursor() as cursor:
-            cursor.execute("CREATE DATABASE IF NOT EXISTS tasks_db;")
-            cursor.execute("USE tasks_db;")
-            
-            create_table_query = """
-            CREATE TABLE IF NOT EXISTS tasks (
-                task_id INT AUTO_INCREMENT PRIMARY KEY,
-                title VARCHAR(255) NOT NULL,
-                description TEXT,
-                due_date DATE NOT NULL,
-                priority ENUM('Low', 'Medium', 'High') NOT NULL,
-                status ENUM('Pending', 'In Progress', 'Completed') NOT NULL DEFAULT 'Pending',
-                creation_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """
-            cursor.execute(create_table_query)
-            
-        connection.commit()
-        print("✅ Database and table setup complete!")
+        connection, database = _connect()
+        applied = migrate(connection)
+        for version, description in applied:
+            print(f"✅ Applied migration {version}: {description}")
+        if not applied:
+            print(f"✅ Database '{database}' is already up to date (version {MIGRATIONS[-1][0]}).")
+        else:
+            print("✅ Database and table setup complete!")
     except pymysql.MySQLError as e:
         print(f"❌ Error setting up database: {e}")
     finally:
-        connection.close()
+        if connection:
+            connection.close()
+
+def show_status():
+    """
+    Prints which migrations are applied and which are pending.
+    """
+    connection = None
+    try:
+        connection, database = _connect()
+        with connection.cursor() as cursor:
+            done = _applied_versions(cursor)
+        print(f"📌 Schema status for '{database}'")
+        for version, description, _ in MIGRATIONS:
+            marker = "✅" if version in done else "⏳"
+            print(f"{marker} {version}: {description}")
+    except pymysql.MySQLError as e:
+        print(f"❌ Error reading schema status: {e}")
+    finally:
+        if connection:
+            connection.close()
+
+def explain_filters():
+    """
+    Runs EXPLAIN on every filter shape TaskManager.list_tasks can build and reports
+    whether MySQL picks an index for it.
+    """
+    from repositories.query_builder import build_filter_clause
+
+    sample = {"status": "Pending", "priority": "High", "due_date": date.today().strftime("%Y-%m-%d")}
+    shapes = [()] + [shape for size in range(1, len(sample) + 1) for shape in combinations(sample, size)]
+    connection = None
+    try:
+        connection, _ = _connect()
+        with connection.cursor() as cursor:
+            print(f"{'Filter shape':<30} {'Index':<32} {'Type':<8} Rows")
+            for shape in shapes:
+                where, values = build_filter_clause({key: sample[key] for key in shape})
+                cursor.execute("EXPLAIN SELECT * FROM tasks" + where + " ORDER BY task_id LIMIT 50", tuple(values))
+                plan = cursor.fetchone()
+                label = ", ".join(shape) or "(no filter)"
+                index = plan["key"] or "❌ none (full scan)"
+                print(f"{label:<30} {index:<32} {plan['type'] or '':<8} {plan['rows']}")
+    except pymysql.MySQLError as e:
+        print(f"❌ Error running EXPLAIN: {e}")
+    finally:
+        if connection:
+            connection.close()
 
 if __name__ == "__main__":
-    setup_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Task database migrations.")
+    parser.add_argument("command", nargs="?", default="migrate", choices=["migrate", "status", "explain"],
+                        help="migrate (default) applies pending migrations, status lists them, explain checks index usage")
+    args = parser.parse_args()
+    if args.command == "status":
+        show_status()
+    elif args.command == "explain":
+        explain_filters()
+    else:
+        setup_database()
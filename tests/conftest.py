@@ -0,0 +1,34 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import date, timedelta
+
+import pytest
+
+from repositories.factory import create_repository
+from services.task_service import TaskService
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, tmp_path):
+    """Every backend that runs without a server: the in-memory one and a SQLite file."""
+    url = "memory://" if request.param == "memory" else "sqlite:///" + str(tmp_path / "tasks.db")
+    repository = create_repository(url)
+    yield repository
+    repository.close()
+
+@pytest.fixture
+def task_service(repository):
+    return TaskService(repository)
+
+def due_in(days: int):
+    """YYYY-MM-DD of the date days from today, negative for the past."""
+    return (date.today() + timedelta(days=days)).isoformat()
+
+def add_task(task_service, title: str = "Task", due_date: str = None, priority: str = "Medium", status: str = None):
+    """Creates a task, optionally moving it to another status, and returns its id."""
+    task = task_service.create_task(title, "", due_date or due_in(7), priority)
+    if status is not None:
+        task_service.update_status_bulk(status, task_ids=[task.task_id])
+    return task.task_id
@@ -0,0 +1,104 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from services.archiver import TaskArchiver
+from tests.conftest import add_task, due_in
+
+def ids(tasks):
+    return [task.task_id for task in tasks]
+
+@pytest.fixture
+def mixed(task_service):
+    """Alternating old Completed tasks and other tasks, returned as (archivable ids, all ids)."""
+    archivable, every = [], []
+    for number in range(12):
+        if number % 3 == 0:
+            task_id = add_task(task_service, f"old {number}", due_date=due_in(-200 - number), status="Completed")
+            archivable.append(task_id)
+        elif number % 3 == 1:
+            task_id = add_task(task_service, f"open {number}", due_date=due_in(-200 - number))
+        else:
+            task_id = add_task(task_service, f"recent {number}", due_date=due_in(-10), status="Completed")
+        every.append(task_id)
+    return archivable, every
+
+def test_archive_moves_only_old_completed_tasks_oldest_first(task_service, mixed):
+    archivable, every = mixed
+    # Due dates go back in time as the ids grow, so the oldest is the last one.
+    assert task_service.archive_tasks(due_in(-90), limit=2) == sorted(archivable[-2:])
+    assert task_service.archive_tasks(due_in(-90), limit=10) == sorted(archivable[:-2])
+    assert task_service.archive_tasks(due_in(-90)) == []
+    assert set(ids(task_service.list_tasks({}))) == set(every) - set(archivable)
+    assert all(task_service.get_task(task_id) is None for task_id in archivable)
+    assert sorted(ids(task_service.list_tasks({"status": "Pending"}))) == [every[1], every[4], every[7], every[10]]
+
+def test_archive_respects_completed_before(task_service, mixed):
+    archivable, _ = mixed
+    # The cutoff is exclusive: a task due on completed_before itself stays.
+    assert task_service.archive_tasks(due_in(-205)) == sorted(archivable[-2:])
+    assert task_service.archive_tasks(due_in(-203)) == []
+    assert task_service.archive_tasks(due_in(-202)) == [archivable[1]]
+    with pytest.raises(ValueError):
+        task_service.archive_tasks(due_in(-90), limit=0)
+
+def test_archive_removes_claims(task_service):
+    task_id = add_task(task_service, due_date=due_in(-200))
+    task_service.claim_tasks("worker-1", 1)
+    task_service.mark_task_completed(task_id)
+    assert task_service.renew_claims("worker-1") == [task_id]
+    assert task_service.archive_tasks(due_in(-90)) == [task_id]
+    assert task_service.renew_claims("worker-1") == []
+    assert task_service.reap_expired_claims() == []
+
+def test_archive_is_logged_as_a_delete(task_service):
+    task_id = add_task(task_service, "old", due_date=due_in(-200), status="Completed")
+    cursor = task_service.changes_since(0)[-1].change_id
+    task_service.archive_tasks(due_in(-90))
+    changes = task_service.changes_since(cursor)
+    assert [(change.operation, change.task_id, change.task.status) for change in changes] == [("delete", task_id, "Completed")]
+
+def test_history_reads_merge_both_tables_in_task_id_order(task_service, mixed):
+    archivable, every = mixed
+    task_service.archive_tasks(due_in(-90), limit=100)
+    assert task_service.get_task(archivable[0]) is None
+    assert task_service.get_task(archivable[0], history=True).title == "old 0"
+    assert ids(task_service.list_tasks({}, history=True)) == every
+    assert ids(task_service.iter_tasks({}, history=True)) == every
+    assert ids(task_service.iter_tasks({"status": "Completed"}, history=True)) == [
+        task_id for task_id in every if task_service.get_task(task_id, history=True).status == "Completed"]
+    assert ids(task_service.list_tasks({"status": "Pending"}, history=True)) == ids(task_service.list_tasks({"status": "Pending"}))
+
+    pages, after_id = [], None
+    while True:
+        page = task_service.list_tasks({}, after_id=after_id, limit=5, history=True)
+        pages.append(ids(page))
+        if len(page) < 5:
+            break
+        after_id = page[-1].task_id
+    assert pages == [every[0:5], every[5:10], every[10:]]
+
+def test_history_is_refused_for_rich_queries(task_service):
+    from models.task_query import TaskQuery
+
+    with pytest.raises(ValueError):
+        task_service.list_tasks(TaskQuery(status="Completed"), history=True)
+
+def test_rolled_back_archive_restores_the_tasks(task_service, mixed):
+    archivable, every = mixed
+    with pytest.raises(RuntimeError):
+        with task_service.transaction():
+            assert task_service.archive_tasks(due_in(-90), limit=100) == sorted(archivable)
+            raise RuntimeError("abort")
+    assert ids(task_service.list_tasks({})) == every
+    assert all(task_service.get_task(task_id).status == "Completed" for task_id in archivable)
+    assert ids(task_service.list_tasks({}, history=True)) == every
+    assert task_service.archive_tasks(due_in(-90), limit=100) == sorted(archivable)
+
+def test_archiver_drains_in_batches(task_service, mixed):
+    archivable, _ = mixed
+    assert TaskArchiver(task_service, retention_days=90, batch_size=1, pause=0, max_batches=2).step() == sorted(archivable[-2:])
+    assert TaskArchiver(task_service, retention_days=90, batch_size=1, pause=0).step() == sorted(archivable[:-2])
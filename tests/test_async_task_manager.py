@@ -0,0 +1,81 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiomysql")
+
+from models.task import Task
+from repositories.async_task_manager import AsyncTaskManager
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.__connection = connection
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def executemany(self, sql, rows):
+        self.__connection.events.append("INSERT")
+
+class FakeConnection:
+    """Records what it receives; COMMIT takes until commit_done is set."""
+
+    def __init__(self):
+        self.events = []
+        self.commit_started = asyncio.Event()
+        self.commit_done = asyncio.Event()
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self)
+
+    async def begin(self):
+        self.events.append("BEGIN")
+
+    async def commit(self):
+        self.commit_started.set()
+        await self.commit_done.wait()
+        self.events.append("COMMIT")
+
+    async def rollback(self):
+        self.events.append("ROLLBACK")
+
+    def close(self):
+        self.events.append("close")
+
+class FakePool:
+    maxsize = 2
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def acquire(self):
+        return self.connection
+
+    async def release(self, connection):
+        connection.events.append("release")
+
+def test_cancel_during_commit_waits_for_it_before_closing_the_connection():
+    async def scenario():
+        connection = FakeConnection()
+        manager = AsyncTaskManager(FakePool(connection))
+        adding = asyncio.ensure_future(manager.add_tasks([Task("Report", "", "2030-01-01", "High")]))
+        await connection.commit_started.wait()
+        adding.cancel()
+        await asyncio.sleep(0.01)
+        # Still waiting for the COMMIT in flight, the connection is untouched.
+        assert not adding.done()
+        assert connection.events == ["BEGIN", "INSERT"]
+        connection.commit_done.set()
+        with pytest.raises(asyncio.CancelledError):
+            await adding
+        return connection.events
+
+    assert asyncio.run(scenario()) == ["BEGIN", "INSERT", "COMMIT", "close", "release"]
@@ -0,0 +1,143 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from models.task_change import TaskChange
+from services.change_subscriber import ChangeSubscriber
+from tests.conftest import add_task, due_in
+
+def events(changes):
+    return [(change.operation, change.task.task_id, change.task.version) for change in changes]
+
+def test_changes_are_logged_in_write_order(task_service):
+    first = add_task(task_service, "first")
+    second = add_task(task_service, "second")
+    task_service.update_task_fields(first, {"priority": "High"})
+    task_service.mark_task_completed(second)
+    task_service.delete_task(first)
+    changes = task_service.changes_since(0)
+    assert events(changes) == [("insert", first, 1), ("insert", second, 1), ("update", first, 2),
+                               ("update", second, 2), ("delete", first, 2)]
+    # Both backends number the log the same way: consecutive ids from 1.
+    assert [change.change_id for change in changes] == [1, 2, 3, 4, 5]
+    # A delete carries the last state of the task.
+    assert (changes[-1].task.title, changes[-1].task.priority) == ("first", "High")
+    assert changes[3].task.status == "Completed"
+
+def test_changes_since_pages_after_the_cursor(task_service):
+    for number in range(5):
+        add_task(task_service, str(number))
+    everything = task_service.changes_since(0)
+    page = task_service.changes_since(everything[1].change_id, 2)
+    assert [change.change_id for change in page] == [change.change_id for change in everything[2:4]]
+    assert task_service.changes_since(everything[-1].change_id) == []
+
+def test_bulk_writes_log_one_change_per_task(task_service):
+    ids = [add_task(task_service, str(number)) for number in range(3)]
+    cursor = task_service.changes_since(0)[-1].change_id
+    task_service.update_status_bulk("In Progress", task_ids=ids)
+    task_service.delete_bulk(task_ids=ids[:2])
+    assert sorted(events(task_service.changes_since(cursor))) == sorted(
+        [("update", task_id, 2) for task_id in ids] + [("delete", task_id, 2) for task_id in ids[:2]])
+
+def test_rolled_back_transaction_logs_nothing(task_service):
+    kept = add_task(task_service, "kept")
+    cursor = task_service.changes_since(0)[-1].change_id
+    with pytest.raises(RuntimeError):
+        with task_service.transaction():
+            add_task(task_service, "added")
+            task_service.update_task_fields(kept, {"title": "renamed"})
+            task_service.delete_task(kept)
+            raise RuntimeError("abort")
+    assert task_service.changes_since(cursor) == []
+    task_service.mark_task_completed(kept)
+    changes = task_service.changes_since(cursor)
+    assert events(changes) == [("update", kept, 2)]
+    # No id was used up by the rolled back writes, so a subscriber has no gap to wait at.
+    assert changes[0].change_id == cursor + 1
+
+def test_subscriber_delivers_batches_in_order_and_resumes_from_its_checkpoint(task_service, tmp_path):
+    checkpoint = str(tmp_path / "feed.checkpoint")
+    ids = [add_task(task_service, str(number)) for number in range(5)]
+    batches = []
+    subscriber = ChangeSubscriber(task_service, lambda changes: batches.append(events(changes)), checkpoint,
+                                  batch_size=2)
+    assert [subscriber.poll(), subscriber.poll(), subscriber.poll(), subscriber.poll()] == [2, 2, 1, 0]
+    assert batches == [[("insert", ids[0], 1), ("insert", ids[1], 1)], [("insert", ids[2], 1), ("insert", ids[3], 1)],
+                       [("insert", ids[4], 1)]]
+    with open(checkpoint, encoding="utf-8") as file:
+        assert int(file.read()) == subscriber.cursor
+
+    task_service.update_task_fields(ids[0], {"due_date": due_in(3)})
+    delivered = []
+    restarted = ChangeSubscriber(task_service, lambda changes: delivered.extend(events(changes)), checkpoint)
+    assert restarted.poll() == 1
+    assert delivered == [("update", ids[0], 2)]
+
+def test_batch_whose_handler_raised_is_delivered_again(task_service):
+    task_id = add_task(task_service)
+    attempts = []
+
+    def handler(changes):
+        attempts.append(events(changes))
+        if len(attempts) == 1:
+            raise RuntimeError("mirror unavailable")
+
+    subscriber = ChangeSubscriber(task_service, handler)
+    with pytest.raises(RuntimeError):
+        subscriber.poll()
+    assert subscriber.cursor == 0
+    assert subscriber.poll() == 1
+    assert attempts == [[("insert", task_id, 1)], [("insert", task_id, 1)]]
+
+class GappedFeed:
+    """changes_since over a fixed list of change ids, standing in for a log with a write not committed yet."""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def changes_since(self, cursor: int = 0, limit: int = 1000):
+        return [TaskChange(change_id, "update", None, None) for change_id in self.ids if change_id > cursor][:limit]
+
+@pytest.fixture
+def monotonic(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("services.change_subscriber.time.monotonic", lambda: now[0])
+    return now
+
+def test_subscriber_waits_at_a_gap_until_it_is_filled(monotonic):
+    feed = GappedFeed([1, 2, 4])
+    delivered = []
+    subscriber = ChangeSubscriber(feed, lambda changes: delivered.extend(change.change_id for change in changes),
+                                  gap_timeout=5.0)
+    assert subscriber.poll() == 2
+    monotonic[0] += 4
+    assert subscriber.poll() == 0
+    feed.ids = [1, 2, 3, 4]
+    assert subscriber.poll() == 2
+    assert delivered == [1, 2, 3, 4]
+
+def test_subscriber_skips_a_gap_older_than_gap_timeout(monotonic):
+    delivered = []
+    subscriber = ChangeSubscriber(GappedFeed([1, 3, 4, 6]),
+                                  lambda changes: delivered.extend(change.change_id for change in changes),
+                                  gap_timeout=5.0)
+    assert subscriber.poll() == 1
+    assert subscriber.poll() == 0
+    monotonic[0] += 5
+    # Only the gap that expired is skipped, the one after it starts its own wait.
+    assert subscriber.poll() == 2
+    assert subscriber.poll() == 0
+    monotonic[0] += 5
+    assert subscriber.poll() == 1
+    assert delivered == [1, 3, 4, 6]
+
+def test_subscriber_with_zero_gap_timeout_never_waits():
+    delivered = []
+    subscriber = ChangeSubscriber(GappedFeed([2, 5, 9]), lambda changes: delivered.extend(change.change_id for change in changes),
+                                  gap_timeout=0)
+    assert subscriber.poll() == 3
+    assert delivered == [2, 5, 9]
@@ -0,0 +1,162 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from repositories.factory import create_repository
+from services.claims import ClaimHeartbeat, ClaimReaper
+from services.task_service import TaskService
+from tests.conftest import add_task, due_in
+
+def claimed_ids(tasks):
+    return [task.task_id for task in tasks]
+
+def test_claims_go_by_priority_then_due_date(task_service):
+    low = add_task(task_service, priority="Low", due_date=due_in(1))
+    late_high = add_task(task_service, priority="High", due_date=due_in(9))
+    early_high = add_task(task_service, priority="High", due_date=due_in(2))
+    tasks = task_service.claim_tasks("worker-1", 3)
+    assert claimed_ids(tasks) == [early_high, late_high, low]
+    assert all(task.status == "In Progress" for task in tasks)
+    assert claimed_ids(task_service.claim_tasks("worker-2", 3, priority_order=False)) == []
+
+def test_claims_by_due_date_ignore_priority(task_service):
+    low = add_task(task_service, priority="Low", due_date=due_in(1))
+    high = add_task(task_service, priority="High", due_date=due_in(5))
+    assert claimed_ids(task_service.claim_tasks("worker-1", 2, priority_order=False)) == [low, high]
+
+def test_concurrent_workers_never_share_a_task(task_service):
+    task_ids = {add_task(task_service, f"task {number}") for number in range(60)}
+    claims = {}
+
+    def work(worker_id):
+        claims[worker_id] = []
+        while True:
+            tasks = task_service.claim_tasks(worker_id, 3)
+            if not tasks:
+                return
+            claims[worker_id] += claimed_ids(tasks)
+
+    workers = [threading.Thread(target=work, args=(f"worker-{number}",)) for number in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    counts = Counter(task_id for ids in claims.values() for task_id in ids)
+    assert set(counts) == task_ids
+    assert max(counts.values()) == 1
+    for worker_id, ids in claims.items():
+        assert task_service.renew_claims(worker_id) == sorted(ids)
+
+def test_release_sets_the_status_and_skips_claims_held_by_others(task_service):
+    done, handed_back, other = (add_task(task_service, str(number)) for number in range(3))
+    task_service.claim_tasks("worker-1", 2)
+    task_service.claim_tasks("worker-2", 1)
+    assert task_service.release_claims("worker-1", [done, other]) == [done]
+    assert task_service.release_claims("worker-1", [handed_back], status="Pending") == [handed_back]
+    assert task_service.get_task(done).status == "Completed"
+    assert task_service.get_task(handed_back).status == "Pending"
+    assert task_service.get_task(other).status == "In Progress"
+    assert task_service.renew_claims("worker-1") == []
+    with pytest.raises(ValueError):
+        task_service.release_claims("worker-2", [other], status="In Progress")
+
+@pytest.mark.parametrize("delete", [
+    lambda task_service, task_id: task_service.delete_task(task_id),
+    lambda task_service, task_id: task_service.delete_bulk(task_ids=[task_id]),
+])
+def test_deleting_a_claimed_task_removes_its_claim(task_service, delete):
+    add_task(task_service, "deleted", due_date=due_in(1))
+    add_task(task_service, "kept", due_date=due_in(2))
+    deleted, kept = claimed_ids(task_service.claim_tasks("worker-1", 2))
+    delete(task_service, deleted)
+    assert task_service.renew_claims("worker-1") == [kept]
+    assert task_service.release_claims("worker-1", [deleted, kept]) == [kept]
+    assert task_service.reap_expired_claims() == []
+
+def test_sqlite_database_from_before_the_foreign_key_drops_orphaned_claims(tmp_path):
+    url = "sqlite:///" + str(tmp_path / "tasks.db")
+    repository = create_repository(url)
+    task_service = TaskService(repository)
+    kept = add_task(task_service)
+    repository.close()
+    connection = sqlite3.connect(str(tmp_path / "tasks.db"))
+    connection.executescript("""
+        DROP TABLE task_claims;
+        CREATE TABLE task_claims (task_id INTEGER PRIMARY KEY, worker_id TEXT NOT NULL,
+                                  claimed_at TIMESTAMP NOT NULL, lease_expires_at TIMESTAMP NOT NULL);
+    """)
+    connection.executemany("INSERT INTO task_claims VALUES (?, 'worker-1', '2030-01-01 00:00:00', '2030-01-01 00:05:00')",
+                           [(kept,), (kept + 1,)])
+    connection.commit()
+    connection.close()
+
+    repository = create_repository(url)
+    try:
+        task_service = TaskService(repository)
+        assert task_service.renew_claims("worker-1") == [kept]
+        task_service.delete_task(kept)
+        assert task_service.renew_claims("worker-1") == []
+    finally:
+        repository.close()
+    connection = sqlite3.connect(str(tmp_path / "tasks.db"))
+    indexes = {row[1] for row in connection.execute("PRAGMA index_list(task_claims)")}
+    connection.close()
+    assert {"idx_task_claims_lease", "idx_task_claims_worker"} <= indexes
+
+def test_expired_lease_is_reaped_back_to_pending(task_service):
+    expiring = add_task(task_service, "expiring")
+    task_service.claim_tasks("worker-1", 1, lease_seconds=0.05)
+    kept = add_task(task_service, "kept")
+    task_service.claim_tasks("worker-2", 1, lease_seconds=60)
+    time.sleep(0.1)
+    assert ClaimReaper(task_service, batch_size=1).step() == [expiring]
+    assert task_service.get_task(expiring).status == "Pending"
+    assert task_service.get_task(kept).status == "In Progress"
+    assert claimed_ids(task_service.claim_tasks("worker-3", 1)) == [expiring]
+
+def test_heartbeat_keeps_a_lease_alive(task_service):
+    task_id = add_task(task_service)
+    task_service.claim_tasks("worker-1", 1, lease_seconds=0.2)
+    heartbeat = ClaimHeartbeat(task_service, "worker-1", lease_seconds=60)
+    heartbeat.hold([task_id])
+    assert heartbeat.step() == []
+    time.sleep(0.3)
+    assert task_service.reap_expired_claims() == []
+    assert heartbeat.held == [task_id]
+
+def test_heartbeat_reports_a_claim_another_worker_took_as_lost(task_service):
+    task_id = add_task(task_service)
+    task_service.claim_tasks("worker-1", 1, lease_seconds=0.05)
+    lost = []
+    heartbeat = ClaimHeartbeat(task_service, "worker-1", lease_seconds=60, on_lost=lost.extend)
+    heartbeat.hold([task_id])
+    time.sleep(0.1)
+    assert task_service.reap_expired_claims() == [task_id]
+    assert claimed_ids(task_service.claim_tasks("worker-2", 1)) == [task_id]
+
+    assert heartbeat.step() == [task_id]
+    assert lost == [task_id]
+    assert heartbeat.held == []
+    assert task_service.renew_claims("worker-1", [task_id]) == []
+    assert task_service.renew_claims("worker-2") == [task_id]
+
+def test_reaper_runs_in_the_background_until_stopped(task_service):
+    task_id = add_task(task_service)
+    task_service.claim_tasks("worker-1", 1, lease_seconds=0.05)
+    reaper = ClaimReaper(task_service, interval=0.02)
+    reaper.start()
+    try:
+        deadline = time.monotonic() + 5
+        while task_service.get_task(task_id).status != "Pending" and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        reaper.stop()
+    assert task_service.get_task(task_id).status == "Pending"
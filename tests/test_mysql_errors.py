@@ -0,0 +1,48 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+pymysql = pytest.importorskip("pymysql")
+
+from db_pool import PoolTimeoutError
+from repositories.errors import ConflictError, RepositoryError, TransientError
+from repositories.retry import ALWAYS, IF_IDEMPOTENT, NEVER, RetryPolicy
+from repositories.task_manager import translate_mysql_error
+
+@pytest.mark.parametrize("error, expected", [
+    (pymysql.OperationalError(1213, "Deadlock found when trying to get lock"), (TransientError, ALWAYS)),
+    (pymysql.OperationalError(1205, "Lock wait timeout exceeded"), (TransientError, ALWAYS)),
+    (pymysql.OperationalError(2006, "MySQL server has gone away"), (TransientError, ALWAYS)),
+    (pymysql.OperationalError(2003, "Can't connect to MySQL server"), (TransientError, ALWAYS)),
+    (pymysql.OperationalError(2013, "Lost connection to MySQL server during query"), (TransientError, IF_IDEMPOTENT)),
+    (pymysql.InterfaceError(0, ""), (TransientError, ALWAYS)),
+    (PoolTimeoutError("no connection available"), (TransientError, NEVER)),
+    (pymysql.IntegrityError(1062, "Duplicate entry"), (ConflictError, NEVER)),
+    (pymysql.OperationalError(1064, "You have an error in your SQL syntax"), (RepositoryError, NEVER)),
+    (pymysql.MySQLError("no code"), (RepositoryError, NEVER)),
+    (KeyError("bug"), (None, NEVER)),
+])
+def test_translate_mysql_error_classifies_retries(error, expected):
+    assert translate_mysql_error(error) == expected
+
+def test_lost_connection_is_retried_only_for_idempotent_statements(monkeypatch):
+    monkeypatch.setattr("repositories.retry.time.sleep", lambda seconds: None)
+    lost = pymysql.OperationalError(2013, "Lost connection to MySQL server during query")
+    policy = RetryPolicy(attempts=3)
+    calls = []
+
+    def operation(uncertain):
+        calls.append(uncertain)
+        if len(calls) == 1:
+            raise lost
+        return "done"
+
+    assert policy.run(operation, translate_mysql_error, idempotent=True) == "done"
+    assert calls == [False, True]
+    calls.clear()
+    with pytest.raises(TransientError):
+        policy.run(operation, translate_mysql_error, idempotent=False)
+    assert calls == [False]
@@ -0,0 +1,82 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import threading
+
+import pytest
+
+from repositories.errors import NotFoundError
+from repositories.ranked_task_repository import RankedTaskRepository
+from services.task_service import TaskService
+from tests.conftest import add_task, due_in
+
+PRIORITIES = ("Low", "Medium", "High")
+
+def ids(tasks):
+    return [task.task_id for task in tasks]
+
+def random_writes(task_service, rng, count):
+    for _ in range(count):
+        open_ids = ids(task_service.list_tasks({"status": "Pending"}))
+        operation = rng.random()
+        try:
+            if operation < 0.4 or not open_ids:
+                add_task(task_service, priority=rng.choice(PRIORITIES), due_date=due_in(rng.randint(-5, 20)))
+            elif operation < 0.6:
+                task_service.mark_task_completed(rng.choice(open_ids))
+            elif operation < 0.8:
+                task_service.delete_task(rng.choice(open_ids))
+            else:
+                task_service.update_task_fields(rng.choice(open_ids), {"priority": rng.choice(PRIORITIES)})
+        except NotFoundError:
+            pass  # another writer deleted it first
+
+def test_next_tasks_match_the_wrapped_repository(repository):
+    ranked = TaskService(RankedTaskRepository(repository, refresh_interval=None))
+    plain = TaskService(repository)
+    rng = random.Random(7)
+    for _ in range(20):
+        add_task(ranked, priority=rng.choice(PRIORITIES), due_date=due_in(rng.randint(-5, 20)))
+    ranked.next_tasks(1)
+    for _ in range(10):
+        random_writes(ranked, rng, 10)
+        for filter_by in ({}, {"priority": "High"}, {"status": "Pending"}, {"status": "Completed"}):
+            assert ids(ranked.next_tasks(15, filter_by)) == ids(plain.next_tasks(15, filter_by))
+
+def test_versions_of_closed_tasks_are_not_kept(repository):
+    ranked = RankedTaskRepository(repository, refresh_interval=None)
+    task_service = TaskService(ranked)
+    task_service.next_tasks(1)
+    rng = random.Random(11)
+
+    def writer():
+        random_writes(task_service, random.Random(rng.random()), 30)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    writes = len(task_service.changes_since(0, 10_000))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(task_service.changes_since(0, 10_000)) - writes >= 60
+    # Every write has finished, so no re-read can be stale any more.
+    assert ranked._RankedTaskRepository__versions == {}
+    assert ids(task_service.next_tasks(50)) == ids(TaskService(repository).next_tasks(50))
+
+@pytest.mark.parametrize("filter_by, message", [
+    ({"priority": "Urgent"}, "Invalid priority 'Urgent'"),
+    ({"status": "Pending", "priority": "urgent"}, "Invalid priority 'urgent'"),
+    ({"status": "Done"}, "Invalid status 'Done'"),
+    ({"due_date": "soon"}, "Invalid isoformat string"),
+    ({"due_date": "2030-13-01"}, "month must be in 1..12"),
+])
+def test_invalid_filters_raise_the_same_value_error_with_or_without_the_index(repository, filter_by, message):
+    add_task(TaskService(repository))
+    ranked = RankedTaskRepository(repository)
+    ranked.next_tasks(1)
+    for target in (ranked, repository):
+        with pytest.raises(ValueError, match=message):
+            target.next_tasks(5, filter_by)
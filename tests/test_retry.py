@@ -0,0 +1,117 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+import random
+
+import pytest
+
+import cli.commands
+from repositories.errors import ConflictError, RepositoryError, TransientError
+from repositories.retry import ALWAYS, IF_IDEMPOTENT, NEVER, NO_RETRY, RetryPolicy
+
+class Flaky:
+    """Operation failing with the given exceptions in turn, then returning "done"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = []
+
+    def __call__(self, uncertain):
+        self.calls.append(uncertain)
+        if self.errors:
+            raise self.errors.pop(0)
+        return "done"
+
+def translate_as(retry, error_class=TransientError):
+    return lambda error: (error_class, retry)
+
+@pytest.fixture
+def policy(monkeypatch):
+    monkeypatch.setattr("repositories.retry.time.sleep", lambda seconds: None)
+    return RetryPolicy(attempts=3)
+
+def test_attempts_must_be_positive():
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=0)
+
+def test_always_retries_until_an_attempt_succeeds(policy):
+    operation = Flaky(OSError("deadlock"), OSError("deadlock"))
+    assert policy.run(operation, translate_as(ALWAYS), idempotent=False) == "done"
+    assert operation.calls == [False, False, False]
+
+def test_always_gives_up_after_the_attempt_count(policy):
+    operation = Flaky(*(OSError("deadlock") for _ in range(4)))
+    with pytest.raises(TransientError, match=r"Database error: deadlock \(gave up after 3 attempts\)") as raised:
+        policy.run(operation, translate_as(ALWAYS))
+    assert len(operation.calls) == 3
+    assert isinstance(raised.value.__cause__, OSError)
+
+def test_never_raises_the_translated_error_at_once(policy):
+    operation = Flaky(OSError("duplicate"))
+    with pytest.raises(ConflictError, match=r"^Database error: duplicate$"):
+        policy.run(operation, translate_as(NEVER, ConflictError))
+    assert len(operation.calls) == 1
+
+def test_if_idempotent_retries_idempotent_operations_as_uncertain(policy):
+    operation = Flaky(OSError("lost connection"))
+    assert policy.run(operation, translate_as(IF_IDEMPOTENT), idempotent=True) == "done"
+    assert operation.calls == [False, True]
+
+def test_if_idempotent_does_not_retry_other_operations(policy):
+    operation = Flaky(OSError("lost connection"))
+    with pytest.raises(TransientError):
+        policy.run(operation, translate_as(IF_IDEMPOTENT), idempotent=False)
+    assert len(operation.calls) == 1
+
+def test_uncertain_sticks_once_an_attempt_may_have_been_applied(policy):
+    operation = Flaky(OSError("lost connection"), OSError("deadlock"))
+    translate = lambda error: (TransientError, IF_IDEMPOTENT if "lost" in str(error) else ALWAYS)
+    assert policy.run(operation, translate) == "done"
+    assert operation.calls == [False, True, True]
+
+def test_errors_without_an_error_class_are_raised_unchanged(policy):
+    error = KeyError("bug")
+    with pytest.raises(KeyError) as raised:
+        policy.run(Flaky(error), translate_as(ALWAYS, None))
+    assert raised.value is error
+
+def test_no_retry_only_translates():
+    operation = Flaky(OSError("deadlock"))
+    with pytest.raises(TransientError, match=r"^Database error: deadlock$"):
+        NO_RETRY.run(operation, translate_as(ALWAYS))
+    assert len(operation.calls) == 1
+
+def test_next_attempt_returns_the_sleep_instead_of_sleeping():
+    policy = RetryPolicy(attempts=2, base_delay=0.1)
+    seconds, uncertain = policy.next_attempt(OSError("lost"), translate_as(IF_IDEMPOTENT), 1)
+    assert 0 <= seconds <= 0.1 and uncertain
+    with pytest.raises(TransientError, match="gave up after 2 attempts"):
+        policy.next_attempt(OSError("lost"), translate_as(IF_IDEMPOTENT), 2)
+
+def test_backoff_is_jittered_within_the_exponential_cap():
+    random.seed(7)
+    policy = RetryPolicy(attempts=10, base_delay=0.05, max_delay=1.0)
+    for attempt in range(1, 10):
+        cap = min(1.0, 0.05 * 2 ** (attempt - 1))
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+        # Full jitter spreads the sleeps over the whole range instead of clustering at the cap.
+        assert min(delays) < cap / 4 and max(delays) > cap * 3 / 4
+
+@pytest.mark.parametrize("error, status", [(TransientError("Database error: deadlock (gave up after 4 attempts)"), 75),
+                                           (RepositoryError("Database error: table is full"), 1)])
+def test_cli_exit_status_tells_temporary_failures_apart(tmp_path, monkeypatch, capsys, error, status):
+    def failing(session, args, stream):
+        raise error
+
+    monkeypatch.setenv("TASKS_DB_URL", "sqlite:///" + str(tmp_path / "tasks.db"))
+    monkeypatch.setattr(cli.commands, "command_summary", failing)
+    assert cli.commands.run(["summary"], io.StringIO()) == status
+    assert str(error) in capsys.readouterr().err
+
+def test_cli_exits_zero_on_success(tmp_path, monkeypatch):
+    monkeypatch.setenv("TASKS_DB_URL", "sqlite:///" + str(tmp_path / "tasks.db"))
+    assert cli.commands.run(["summary"], io.StringIO()) == 0
@@ -0,0 +1,193 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from repositories.errors import TransientError
+from services.scheduler import Deadline, DueDateScheduler, EscalateAlert
+from tests.conftest import add_task, due_in
+
+class Clock:
+    """Settable stand-in for datetime.now, starting at 09:00 today."""
+
+    def __init__(self):
+        self.now = datetime.combine(date.today(), time(9))
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, days: int = 0, hours: int = 0):
+        self.now += timedelta(days=days, hours=hours)
+
+def fired(deadlines):
+    return [(deadline.task.task_id, deadline.kind) for deadline in deadlines]
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+def test_transient_callback_failure_resumes_with_the_failing_callback(task_service, clock):
+    task_id = add_task(task_service, due_date=due_in(2))
+    recorded, attempts = [], []
+
+    def recorder(deadline):
+        recorded.append((deadline.task.task_id, deadline.kind))
+
+    def flaky(deadline):
+        attempts.append(deadline.key)
+        if len(attempts) == 1:
+            raise TransientError("webhook down")
+
+    scheduler = DueDateScheduler(task_service, [recorder, flaky], clock=clock)
+    assert scheduler.step() == []
+    clock.advance(days=1)
+    with pytest.raises(TransientError):
+        scheduler.step()
+    assert fired(scheduler.step()) == [(task_id, "due_soon")]
+    assert recorded == [(task_id, "due_soon")]
+    assert len(attempts) == 2
+    assert scheduler.step() == []
+
+def test_alerts_fire_once_at_their_time(task_service, clock):
+    soon = add_task(task_service, due_date=due_in(2))
+    later = add_task(task_service, due_date=due_in(4))
+    scheduler = DueDateScheduler(task_service, [], clock=clock)
+    assert scheduler.step() == []
+    clock.advance(days=1)
+    assert fired(scheduler.step()) == [(soon, "due_soon")]
+    assert scheduler.step() == []
+    clock.advance(days=2)
+    assert fired(scheduler.step()) == [(soon, "overdue"), (later, "due_soon")]
+    clock.advance(days=2)
+    assert fired(scheduler.step()) == [(later, "overdue")]
+
+def test_only_deadlines_within_the_horizon_are_loaded(task_service, clock):
+    for days in range(1, 40):
+        add_task(task_service, due_date=due_in(days))
+    scheduler = DueDateScheduler(task_service, [], clock=clock)
+    scheduler.step()
+    # Both alerts of the task due in two days and the overdue one of the task due tomorrow.
+    assert scheduler.pending == 3
+    clock.advance(days=10)
+    assert len(scheduler.step()) == 19
+    assert scheduler.pending == 4
+
+def test_tasks_added_or_rescheduled_later_come_from_the_change_feed(task_service, clock):
+    scheduler = DueDateScheduler(task_service, [], clock=clock)
+    far = add_task(task_service, due_date=due_in(30))
+    assert scheduler.step() == []
+    added = add_task(task_service, due_date=due_in(2))
+    task_service.update_task_fields(far, {"due_date": due_in(2)})
+    clock.advance(days=1)
+    assert fired(scheduler.step()) == [(far, "due_soon"), (added, "due_soon")]
+
+def test_completed_deleted_and_rescheduled_tasks_are_skipped(task_service, clock):
+    completed, deleted, moved, kept = (add_task(task_service, str(number), due_date=due_in(2)) for number in range(4))
+    scheduler = DueDateScheduler(task_service, [], clock=clock)
+    scheduler.step()
+    task_service.mark_task_completed(completed)
+    task_service.delete_task(deleted)
+    task_service.update_task_fields(moved, {"due_date": due_in(5)})
+    clock.advance(days=1)
+    assert fired(scheduler.step()) == [(kept, "due_soon")]
+    clock.advance(days=3)
+    assert fired(scheduler.step()) == [(kept, "overdue"), (moved, "due_soon")]
+
+def test_restart_fires_only_the_alerts_missed_while_down(task_service, clock, tmp_path):
+    checkpoint = str(tmp_path / "alerts.json")
+    first, second, third = (add_task(task_service, due_date=due_in(days)) for days in (2, 3, 6))
+    scheduler = DueDateScheduler(task_service, [], checkpoint, clock=clock)
+    scheduler.step()
+    clock.advance(days=1)
+    assert fired(scheduler.step()) == [(first, "due_soon")]
+
+    clock.advance(days=2)
+    restarted = DueDateScheduler(task_service, [], checkpoint, clock=clock)
+    assert fired(restarted.step()) == [(second, "due_soon"), (first, "overdue")]
+    again = DueDateScheduler(task_service, [], checkpoint, clock=clock)
+    assert again.step() == []
+    clock.advance(days=2)
+    assert fired(again.step()) == [(second, "overdue"), (third, "due_soon")]
+
+def test_without_checkpoint_alerts_before_the_start_are_not_fired(task_service, clock):
+    add_task(task_service, due_date=due_in(-3))
+    add_task(task_service, due_date=due_in(1))
+    assert DueDateScheduler(task_service, [], clock=clock).step() == []
+
+def test_callback_errors_are_reported_and_the_alert_counts_as_fired(task_service, clock, capsys):
+    task_id = add_task(task_service, due_date=due_in(2))
+    recorded = []
+
+    def broken(deadline):
+        raise RuntimeError("no route to host")
+
+    scheduler = DueDateScheduler(task_service, [broken, recorded.append], clock=clock)
+    scheduler.step()
+    clock.advance(days=1)
+    assert fired(scheduler.step()) == [(task_id, "due_soon")]
+    assert fired(recorded) == [(task_id, "due_soon")]
+    assert "no route to host" in capsys.readouterr().err
+    assert scheduler.step() == []
+
+def test_escalate_raises_overdue_tasks_to_high(task_service, clock):
+    overdue = add_task(task_service, due_date=due_in(0), priority="Low")
+    scheduler = DueDateScheduler(task_service, [EscalateAlert(task_service)], clock=clock)
+    scheduler.step()
+    clock.advance(days=1)
+    assert fired(scheduler.step()) == [(overdue, "overdue")]
+    assert task_service.get_task(overdue).priority == "High"
+    clock.advance(days=1)
+    assert scheduler.step() == []
+
+def deadline_of(task_service, task_id, kind="overdue"):
+    task = task_service.get_task(task_id)
+    return Deadline(kind, datetime.combine(task.due_date, time()) + timedelta(days=1), task)
+
+def test_escalate_retries_on_a_version_conflict(task_service):
+    task_id = add_task(task_service, due_date=due_in(-2), priority="Low")
+    deadline = deadline_of(task_service, task_id)
+    task_service.update_task_fields(task_id, {"title": "edited meanwhile"})
+    EscalateAlert(task_service)(deadline)
+    task = task_service.get_task(task_id)
+    assert (task.title, task.priority, task.version) == ("edited meanwhile", "High", 3)
+
+@pytest.mark.parametrize("change", [{"status": "Completed"}, {"due_date": due_in(5)}, {"priority": "High"}])
+def test_escalate_gives_up_when_the_conflicting_edit_settled_the_task(task_service, change):
+    task_id = add_task(task_service, due_date=due_in(-2), priority="Low")
+    deadline = deadline_of(task_service, task_id)
+    if "status" in change:
+        task_service.mark_task_completed(task_id)
+    else:
+        task_service.update_task_fields(task_id, change)
+    version = task_service.get_task(task_id).version
+    EscalateAlert(task_service)(deadline)
+    task = task_service.get_task(task_id)
+    assert task.version == version
+    assert task.priority == change.get("priority", "Low")
+
+def test_escalate_ignores_other_alert_kinds(task_service):
+    task_id = add_task(task_service, due_date=due_in(1), priority="Low")
+    EscalateAlert(task_service)(deadline_of(task_service, task_id, "due_soon"))
+    assert task_service.get_task(task_id).priority == "Low"
+
+def test_schedule_command_honors_the_output_format(tmp_path, monkeypatch):
+    import io
+    import json
+    from cli.commands import run
+
+    monkeypatch.setenv("TASKS_DB_URL", "sqlite:///" + str(tmp_path / "tasks.db"))
+    assert run(["add", "--title", "Report", "--due-date", due_in(1), "--priority", "Low"], io.StringIO()) == 0
+    checkpoint = tmp_path / "alerts.json"
+    checkpoint.write_text(json.dumps({"at": (datetime.now() - timedelta(days=3)).isoformat(), "task_id": 0, "kind": ""}))
+
+    output = io.StringIO()
+    assert run(["-o", "json", "schedule", "--once", "--checkpoint", str(checkpoint)], output) == 0
+    assert [(alert["task_id"], alert["kind"]) for alert in json.loads(output.getvalue())] == [(1, "due_soon")]
+    assert run(["-o", "csv", "schedule", "--once", "--checkpoint", str(checkpoint)], output) == 0
+    assert output.getvalue().endswith("key,kind,at,task_id,title,description,due_date,priority,status,creation_timestamp,version\n")
+    assert run(["-o", "table", "schedule"], io.StringIO()) == 1
+    assert run(["schedule", "--once"], io.StringIO()) == 1
@@ -0,0 +1,73 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from repositories.summary_task_repository import SummaryTaskRepository
+from repositories.task_repository_decorator import TaskRepositoryDecorator
+from services.task_service import TaskService
+from tests.conftest import add_task, due_in
+
+class Interleaving(TaskRepositoryDecorator):
+    """Counts the stats loads and runs a one-shot hook right after a task is read, as a concurrent writer would."""
+
+    def __init__(self, task_repository):
+        super().__init__(task_repository)
+        self.loads = 0
+        self.after_read = None
+
+    def get_task(self, task_id: int):
+        task = self._inner.get_task(task_id)
+        hook, self.after_read = self.after_read, None
+        if hook is not None:
+            hook()
+        return task
+
+    def get_stats(self, today=None):
+        self.loads += 1
+        return self._inner.get_stats(today)
+
+@pytest.fixture
+def summary(repository):
+    inner = Interleaving(repository)
+    summary = SummaryTaskRepository(inner, refresh_interval=None)
+    summary.get_stats()
+    return summary, inner
+
+def test_single_task_writes_adjust_the_counters_without_reloading(repository, summary):
+    summary, inner = summary
+    service = TaskService(summary)
+    first = add_task(service, due_date=due_in(3), priority="Low")
+    second = add_task(service, due_date=due_in(40))
+    summary.update_task_fields(first, {"priority": "High", "due_date": due_in(-1)})
+    summary.update_task_details(second, "Renamed", "", due_in(2), "Low")
+    summary.update_task_status(first, "Completed")
+    summary.delete_task(second)
+    assert summary.get_stats() == repository.get_stats()
+    assert inner.loads == 1
+
+@pytest.mark.parametrize("write", [
+    lambda summary, task_id: summary.update_task_status(task_id, "Completed"),
+    lambda summary, task_id: summary.update_task_fields(task_id, {"due_date": due_in(30)}),
+    lambda summary, task_id: summary.update_task_details(task_id, "Task", "", due_in(30), "Medium"),
+    lambda summary, task_id: summary.delete_task(task_id),
+])
+def test_write_overlapping_another_write_to_the_task_reloads_the_counters(repository, summary, write):
+    summary, inner = summary
+    task_id = add_task(TaskService(summary), due_date=due_in(3), priority="Low")
+    # The task changes after the write read its values and before it applies.
+    inner.after_read = lambda: summary.update_task_fields(task_id, {"priority": "High"})
+    write(summary, task_id)
+    assert summary.get_stats() == repository.get_stats()
+    assert inner.loads == 2
+
+def test_writes_to_other_tasks_keep_the_counters(repository, summary):
+    summary, inner = summary
+    service = TaskService(summary)
+    first, second = add_task(service, priority="Low"), add_task(service, priority="Low")
+    inner.after_read = lambda: summary.update_task_fields(second, {"priority": "High"})
+    summary.update_task_status(first, "Completed")
+    assert summary.get_stats() == repository.get_stats()
+    assert inner.loads == 1
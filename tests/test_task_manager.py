@@ -0,0 +1,108 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+pymysql = pytest.importorskip("pymysql")
+
+from repositories.errors import RepositoryError, TransientError
+from repositories.retry import RetryPolicy
+from repositories.task_manager import TaskManager
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.__connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, values=None):
+        self.__connection.statements.append(sql)
+        for prefix, error in self.__connection.failures.items():
+            if sql.startswith(prefix):
+                raise error
+        return 1
+
+class FakeConnection:
+    """Records the statements it receives and raises the error configured for a statement prefix."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.statements = []
+        self.committed = False
+        self.rolled_back = False
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self)
+
+    def begin(self):
+        self.statements.append("BEGIN")
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+        self.released = []
+
+    def acquire(self):
+        return self.connection
+
+    def release(self, connection, discard=False):
+        self.released.append(discard)
+
+    def close(self):
+        pass
+
+def manager_with(failures):
+    connection = FakeConnection(failures)
+    return TaskManager(FakePool(connection), RetryPolicy(attempts=1)), connection
+
+def test_deadlock_inside_savepoint_is_transient_without_rollback_to_savepoint():
+    manager, connection = manager_with({
+        "UPDATE tasks": pymysql.OperationalError(1213, "Deadlock found when trying to get lock"),
+        "ROLLBACK TO SAVEPOINT": pymysql.OperationalError(1305, "SAVEPOINT does not exist"),
+    })
+    with pytest.raises(TransientError):
+        with manager.transaction():
+            manager.update_status_bulk("Completed", task_ids=[1, 2])
+    assert not any(statement.startswith("ROLLBACK TO SAVEPOINT") for statement in connection.statements)
+    assert connection.rolled_back and not connection.committed
+
+def test_deadlock_caught_inside_transaction_still_aborts_it():
+    manager, connection = manager_with({"UPDATE tasks": pymysql.OperationalError(1205, "Lock wait timeout exceeded")})
+    with pytest.raises(TransientError, match="run again"):
+        with manager.transaction():
+            with pytest.raises(TransientError):
+                manager.update_status_bulk("Completed", task_ids=[1])
+    assert connection.rolled_back and not connection.committed
+
+def test_failed_rollback_to_savepoint_keeps_the_original_error():
+    manager, connection = manager_with({
+        "UPDATE tasks": pymysql.OperationalError(1064, "You have an error in your SQL syntax"),
+        "ROLLBACK TO SAVEPOINT": pymysql.OperationalError(1305, "SAVEPOINT does not exist"),
+    })
+    with pytest.raises(TransientError):
+        with manager.transaction():
+            with pytest.raises(RepositoryError, match="1064"):
+                manager.update_status_bulk("Completed", task_ids=[1])
+    # The savepoint could not undo the block, so the transaction must not commit.
+    assert connection.rolled_back and not connection.committed
+
+def test_error_inside_savepoint_rolls_back_to_it_and_commits_the_rest():
+    manager, connection = manager_with({"DELETE FROM tasks": pymysql.IntegrityError(1451, "foreign key")})
+    with manager.transaction():
+        manager.update_status_bulk("Completed", task_ids=[1])
+        with pytest.raises(RepositoryError):
+            manager.delete_bulk(task_ids=[2])
+    assert any(statement.startswith("ROLLBACK TO SAVEPOINT") for statement in connection.statements)
+    assert connection.committed and not connection.rolled_back
@@ -0,0 +1,105 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from tests.conftest import add_task, due_in
+
+def titles(task_service):
+    return sorted(task.title for task in task_service.list_tasks({}))
+
+def test_transaction_commits_when_the_block_ends(task_service):
+    with task_service.transaction():
+        add_task(task_service, "a")
+        add_task(task_service, "b")
+    assert titles(task_service) == ["a", "b"]
+
+def test_transaction_rolls_back_every_write_when_the_block_raises(task_service):
+    kept = add_task(task_service, "kept")
+    with pytest.raises(RuntimeError):
+        with task_service.transaction():
+            add_task(task_service, "added")
+            task_service.update_task_fields(kept, {"title": "renamed"})
+            task_service.mark_task_completed(kept)
+            raise RuntimeError("abort")
+    task = task_service.get_task(kept)
+    assert titles(task_service) == ["kept"]
+    assert (task.status, task.version) == ("Pending", 1)
+
+def test_rolled_back_delete_restores_the_task(task_service):
+    task_id = add_task(task_service, "doomed")
+    with pytest.raises(RuntimeError):
+        with task_service.transaction():
+            task_service.delete_task(task_id)
+            assert task_service.get_task(task_id) is None
+            raise RuntimeError("abort")
+    assert task_service.get_task(task_id).title == "doomed"
+    assert [task.task_id for task in task_service.list_tasks({"status": "Pending"})] == [task_id]
+
+def test_nested_block_that_raises_only_undoes_its_own_writes(task_service):
+    with task_service.transaction():
+        outer = add_task(task_service, "outer")
+        with pytest.raises(RuntimeError):
+            with task_service.transaction():
+                add_task(task_service, "inner")
+                task_service.update_task_fields(outer, {"title": "changed inside"})
+                raise RuntimeError("abort inner")
+        task_service.update_task_fields(outer, {"priority": "High"})
+    task = task_service.get_task(outer)
+    assert titles(task_service) == ["outer"]
+    assert (task.priority, task.version) == ("High", 2)
+
+def test_nested_block_is_rolled_back_with_the_outer_one(task_service):
+    with pytest.raises(RuntimeError):
+        with task_service.transaction():
+            add_task(task_service, "outer")
+            with task_service.transaction():
+                add_task(task_service, "inner")
+            raise RuntimeError("abort outer")
+    assert titles(task_service) == []
+
+def test_rollback_restores_claims_and_archived_tasks(task_service):
+    claimed_id = add_task(task_service, "claimed", priority="High")
+    archived_id = add_task(task_service, "old", due_date=due_in(-400), status="Completed")
+    held_id = add_task(task_service, "held", priority="Low")
+    assert [task.task_id for task in task_service.claim_tasks("worker-1", 1)] == [claimed_id]
+
+    with pytest.raises(RuntimeError):
+        with task_service.transaction():
+            assert task_service.release_claims("worker-1", [claimed_id]) == [claimed_id]
+            assert [task.task_id for task in task_service.claim_tasks("worker-2", 1)] == [held_id]
+            assert task_service.archive_tasks(due_in(-90)) == [archived_id]
+            raise RuntimeError("abort")
+
+    assert task_service.renew_claims("worker-1") == [claimed_id]
+    assert task_service.renew_claims("worker-2") == []
+    assert task_service.get_task(claimed_id).status == "In Progress"
+    assert task_service.get_task(held_id).status == "Pending"
+    assert task_service.get_task(archived_id).title == "old"
+    assert task_service.list_tasks({}, history=True)[1].task_id == archived_id
+    assert len(task_service.list_tasks({}, history=True)) == 3
+
+def test_rollback_of_a_nested_block_keeps_the_outer_archive(task_service):
+    first = add_task(task_service, "first", due_date=due_in(-400), status="Completed")
+    second = add_task(task_service, "second", due_date=due_in(-300), status="Completed")
+    with task_service.transaction():
+        assert task_service.archive_tasks(due_in(-90), limit=1) == [first]
+        with pytest.raises(RuntimeError):
+            with task_service.transaction():
+                assert task_service.archive_tasks(due_in(-90), limit=1) == [second]
+                raise RuntimeError("abort inner")
+    assert task_service.get_task(first) is None
+    assert task_service.get_task(first, history=True).title == "first"
+    assert task_service.get_task(second).title == "second"
+
+def test_rollback_restores_the_change_log(task_service):
+    add_task(task_service, "before")
+    cursor = task_service.changes_since(0)[-1].change_id
+    with pytest.raises(RuntimeError):
+        with task_service.transaction():
+            add_task(task_service, "rolled back")
+            raise RuntimeError("abort")
+    add_task(task_service, "after")
+    assert [change.task.title for change in task_service.changes_since(cursor)] == ["after"]
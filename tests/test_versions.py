@@ -0,0 +1,59 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import date
+
+import pytest
+
+from repositories.errors import NotFoundError, VersionConflictError
+from tests.conftest import add_task, due_in
+
+def snapshot(task):
+    return (task.title, task.description, task.due_date, task.priority, task.status, task.version)
+
+def test_new_tasks_start_at_version_one_and_every_write_bumps_it(task_service):
+    task_id = add_task(task_service)
+    assert task_service.get_task(task_id).version == 1
+    task_service.update_task_fields(task_id, {"title": "renamed"})
+    task_service.update_task_details(task_id, "again", "", due_in(3), "High")
+    task_service.mark_task_completed(task_id)
+    task_service.update_status_bulk("Pending", task_ids=[task_id])
+    task_service.update_details_bulk({"priority": "Low"}, task_ids=[task_id])
+    assert task_service.get_task(task_id).version == 6
+
+def test_partial_update_only_writes_the_given_fields(task_service):
+    task_id = task_service.create_task("Report", "Annual numbers", due_in(5), "Low").task_id
+    task_service.update_task_fields(task_id, {"priority": "High"}, expected_version=1)
+    assert snapshot(task_service.get_task(task_id)) == \
+        ("Report", "Annual numbers", date.fromisoformat(due_in(5)), "High", "Pending", 2)
+    task_service.update_task_fields(task_id, {"due_date": due_in(9), "description": ""})
+    assert snapshot(task_service.get_task(task_id)) == ("Report", "", date.fromisoformat(due_in(9)), "High", "Pending", 3)
+
+@pytest.mark.parametrize("update", [
+    lambda service, task_id, version: service.update_task_fields(task_id, {"title": "mine"}, version),
+    lambda service, task_id, version: service.update_task_details(task_id, "mine", "", due_in(3), "High", version),
+])
+def test_stale_expected_version_raises_and_leaves_the_task_alone(task_service, update):
+    task_id = add_task(task_service)
+    read = task_service.get_task(task_id)
+    task_service.update_task_fields(task_id, {"title": "theirs"}, read.version)
+    before = snapshot(task_service.get_task(task_id))
+    with pytest.raises(VersionConflictError) as raised:
+        update(task_service, task_id, read.version)
+    assert (raised.value.task_id, raised.value.expected_version, raised.value.current_version) == (task_id, 1, 2)
+    assert snapshot(task_service.get_task(task_id)) == before
+    update(task_service, task_id, 2)
+    assert snapshot(task_service.get_task(task_id))[0] == "mine"
+
+def test_conditional_update_of_a_missing_task_is_not_found(task_service):
+    with pytest.raises(NotFoundError):
+        task_service.update_task_fields(99, {"title": "ghost"}, expected_version=1)
+
+@pytest.mark.parametrize("changes", [{"status": "Completed"}, {"version": 7}, {}])
+def test_partial_update_rejects_fields_it_cannot_write(task_service, changes):
+    task_id = add_task(task_service)
+    with pytest.raises(ValueError):
+        task_service.update_task_fields(task_id, changes, expected_version=1)
+    assert task_service.get_task(task_id).version == 1